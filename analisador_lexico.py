@@ -1,16 +1,463 @@
-import re  
+import os
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+# Tipos de token e seus códigos inteiros (índice na tupla)
+TIPOS_TOKEN = (
+    'EOF', 'NUMERO', 'ID',
+    'OPERADOR_SOMA', 'OPERADOR_SUB', 'OPERADOR_MUL', 'OPERADOR_DIV', 'OPERADOR_ATRIB',
+    'DELIM_AP', 'DELIM_FP', 'DELIM_AC', 'DELIM_FC', 'VIRGULA', 'PONTO_VIRGULA',
+    'SE', 'SENAO', 'ENQUANTO', 'PARA', 'TIPO_INT', 'TIPO_FLOAT', 'RETORNO',
+)
+CODIGOS_TIPO = {tipo: codigo for codigo, tipo in enumerate(TIPOS_TOKEN)}
+
+(T_EOF, T_NUMERO, T_ID,
+ T_OPERADOR_SOMA, T_OPERADOR_SUB, T_OPERADOR_MUL, T_OPERADOR_DIV, T_OPERADOR_ATRIB,
+ T_DELIM_AP, T_DELIM_FP, T_DELIM_AC, T_DELIM_FC, T_VIRGULA, T_PONTO_VIRGULA,
+ T_SE, T_SENAO, T_ENQUANTO, T_PARA, T_TIPO_INT, T_TIPO_FLOAT, T_RETORNO) = range(len(TIPOS_TOKEN))
+
+class IndiceLinhas:
+    """
+    Offsets de início de cada linha do código fonte (str ou bytes). Permite
+    converter um offset em (linha, coluna) com uma busca binária só quando
+    necessário.
+    """
+    __slots__ = ('inicios',)
+
+    def __init__(self, fonte):
+        quebra = '\n' if isinstance(fonte, str) else b'\n'
+        self.inicios = array('q', [0])
+        self.inicios.extend(match.end() for match in re.finditer(quebra, fonte))
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def posicao(self, offset):
+        """Retorna (linha, coluna) de um offset, com linhas a partir de 1"""
+        linha = bisect_right(self.inicios, offset)
+        return linha, offset - self.inicios[linha - 1]
+
+class TabelaNomes:
+    """
+    Identificadores internados de uma compilação: cada nome distinto recebe
+    um id inteiro pequeno e é guardado como um único objeto str, reaproveitado
+    por todos os tokens e nós da árvore com aquele nome.
+    """
+    __slots__ = ('nomes', 'ids')
+
+    def __init__(self):
+        self.nomes = []  # id -> nome
+        self.ids = {}  # nome -> id
+
+    def internar(self, nome):
+        """Retorna o id do nome, registrando-o se ainda não existir"""
+        id_nome = self.ids.get(nome)
+        if id_nome is None:
+            id_nome = self.ids[nome] = len(self.nomes)
+            self.nomes.append(nome)
+        return id_nome
+
+    def nome(self, id_nome):
+        return self.nomes[id_nome]
+
+    def __len__(self):
+        return len(self.nomes)
+
 class Token:
-    def __init__(self, tipo, valor, linha, coluna):
+    """
+    Token com linha e coluna. Quando criado com `inicio` e `indice_linhas`
+    (como faz o analisador léxico), a linha e a coluna só são calculadas na
+    primeira vez em que alguém as pede. Tokens ID trazem o id do nome na
+    TabelaNomes do analisador léxico.
+    """
+    __slots__ = ('tipo', 'valor', 'inicio', 'indice_linhas', 'id_nome', '_linha', '_coluna')
+
+    def __init__(self, tipo, valor, linha=None, coluna=None, inicio=None, indice_linhas=None, id_nome=None):
         self.tipo = tipo
         self.valor = valor
-        self.linha = linha
-        self.coluna = coluna
-    
+        self.inicio = inicio
+        self.indice_linhas = indice_linhas
+        self.id_nome = id_nome
+        self._linha = linha
+        self._coluna = coluna
+
+    def _resolver_posicao(self):
+        self._linha, self._coluna = self.indice_linhas.posicao(self.inicio)
+
+    @property
+    def linha(self):
+        if self._linha is None:
+            self._resolver_posicao()
+        return self._linha
+
+    @property
+    def coluna(self):
+        if self._coluna is None:
+            self._resolver_posicao()
+        return self._coluna
+
+    @property
+    def codigo(self):
+        return CODIGOS_TIPO[self.tipo]
+
+    def __str__(self):
+        return f"Token({self.tipo}, '{self.valor}', linha={self.linha}, coluna={self.coluna})"
+
+class VisaoToken:
+    """Visão de um token guardado em um BufferTokens, com a mesma interface de Token"""
+    __slots__ = ('buffer', 'indice')
+
+    def __init__(self, buffer, indice):
+        self.buffer = buffer
+        self.indice = indice
+
+    @property
+    def codigo(self):
+        return self.buffer.codigos[self.indice]
+
+    @property
+    def tipo(self):
+        return TIPOS_TOKEN[self.buffer.codigos[self.indice]]
+
+    @property
+    def valor(self):
+        return self.buffer.valor(self.indice)
+
+    @property
+    def id_nome(self):
+        id_nome = self.buffer.ids_nome[self.indice]
+        return id_nome if id_nome >= 0 else None
+
+    @property
+    def linha(self):
+        return self.buffer.posicao(self.indice)[0]
+
+    @property
+    def coluna(self):
+        return self.buffer.posicao(self.indice)[1]
+
     def __str__(self):
         return f"Token({self.tipo}, '{self.valor}', linha={self.linha}, coluna={self.coluna})"
 
+class BufferTokens:
+    """
+    Tokens guardados em arrays paralelos: código do tipo, início e fim do
+    lexema no código fonte e id do nome (-1 se o token não é um ID). O valor
+    só é recortado do fonte, e a linha e a coluna só são calculadas, quando
+    alguém os pede.
+    """
+    def __init__(self, fonte, nomes=None):
+        self.fonte = fonte
+        self.nomes = nomes if nomes is not None else TabelaNomes()
+        self.codigos = array('B')
+        self.inicios = array('q')
+        self.fins = array('q')
+        self.ids_nome = array('i')
+        self._indice_linhas = None
+        self._abertura_pendente = None
+
+    @property
+    def indice_linhas(self):
+        if self._indice_linhas is None:
+            self._indice_linhas = IndiceLinhas(self.fonte)
+        return self._indice_linhas
+
+    @property
+    def abertura_pendente(self):
+        """
+        Índice do primeiro token '/' seguido de '*' (um '/*' sem '*/', que
+        virou divisão e multiplicação), ou -1. Calculado uma vez por buffer;
+        retokenizar já o passa pronto para o buffer novo
+        """
+        if self._abertura_pendente is None:
+            self._abertura_pendente = self.procurar_abertura(0)
+        return self._abertura_pendente
+
+    def procurar_abertura(self, offset):
+        """Índice do primeiro token '/' seguido de '*' a partir do offset, ou -1"""
+        abertura = self.fonte.find('/*', offset)
+        while abertura != -1:
+            indice = bisect_left(self.inicios, abertura)
+            if self.inicios[indice] == abertura and self.codigos[indice] == T_OPERADOR_DIV:
+                return indice
+            abertura = self.fonte.find('/*', abertura + 1)
+        return -1
+
+    def adicionar(self, codigo, inicio, fim, id_nome=-1):
+        self.codigos.append(codigo)
+        self.inicios.append(inicio)
+        self.fins.append(fim)
+        self.ids_nome.append(id_nome)
+
+    def valor(self, indice):
+        id_nome = self.ids_nome[indice]
+        if id_nome >= 0:
+            return self.nomes.nomes[id_nome]
+        return self.recortar(indice)
+
+    def recortar(self, indice):
+        """Texto do lexema recortado do fonte"""
+        return self.fonte[self.inicios[indice]:self.fins[indice]]
+
+    def posicao(self, indice):
+        """Retorna (linha, coluna) do token; o EOF fica sempre na coluna 0"""
+        linha, coluna = self.indice_linhas.posicao(self.inicios[indice])
+        if self.codigos[indice] == T_EOF:
+            coluna = 0
+        return linha, coluna
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += len(self.codigos)
+        if not 0 <= indice < len(self.codigos):
+            raise IndexError('índice de token fora do intervalo')
+        return VisaoToken(self, indice)
+
+    def __iter__(self):
+        for indice in range(len(self.codigos)):
+            yield VisaoToken(self, indice)
+
+class BufferTokensBytes(BufferTokens):
+    """
+    BufferTokens sobre bytes, bytearray, memoryview ou mmap com código em
+    UTF-8. Os offsets são em bytes; o valor de um token e a coluna (em
+    caracteres) só são decodificados quando alguém os pede.
+    """
+    def lexema(self, indice):
+        """Fatia do fonte com o lexema, sem cópia"""
+        return memoryview(self.fonte)[self.inicios[indice]:self.fins[indice]]
+
+    def recortar(self, indice):
+        return str(self.lexema(indice), 'utf-8')
+
+    def posicao(self, indice):
+        linha, coluna = super().posicao(indice)
+        if coluna:
+            inicio = self.inicios[indice]
+            prefixo = memoryview(self.fonte)[inicio - coluna:inicio]
+            coluna = len(str(prefixo, 'utf-8', 'replace'))
+        return linha, coluna
+
+    def procurar_abertura(self, offset):
+        """
+        Como em BufferTokens, mas pelos tokens: um memoryview não tem find.
+        O '/' de um '/*' aberto é seguido de um '*' colado a ele
+        """
+        codigos, inicios, fins = self.codigos, self.inicios, self.fins
+        for indice in range(bisect_left(inicios, offset), len(codigos) - 1):
+            if (codigos[indice] == T_OPERADOR_DIV and codigos[indice + 1] == T_OPERADOR_MUL
+                    and inicios[indice + 1] == fins[indice]):
+                return indice
+        return -1
+
+class JanelaTokens:
+    """
+    Lookahead limitado sobre qualquer iterador de tokens: guarda só o token
+    atual e os k seguintes, num buffer circular de k + 1 posições. Os tokens
+    já consumidos saem do buffer, então léxico e sintático podem rodar em
+    sequência com memória constante para os tokens.
+    """
+    __slots__ = ('iterador', 'buffer', 'tamanho', 'posicao', 'lidos')
+
+    def __init__(self, tokens, k=1):
+        self.iterador = iter(tokens)
+        self.tamanho = k + 1
+        self.buffer = [None] * self.tamanho
+        self.posicao = 0  # posição absoluta do token atual
+        self.lidos = 0  # quantos tokens já vieram do iterador
+
+    def peek(self, k=0):
+        """Token k posições à frente do atual (None se o iterador for vazio); após o fim repete o último"""
+        if not 0 <= k < self.tamanho:
+            raise IndexError(f"Lookahead {k} fora da janela (máximo {self.tamanho - 1})")
+        posicao = self.posicao + k
+        while self.lidos <= posicao:
+            token = next(self.iterador, None)
+            if token is None:
+                if not self.lidos:
+                    return None
+                token = self.buffer[(self.lidos - 1) % self.tamanho]
+            self.buffer[self.lidos % self.tamanho] = token
+            self.lidos += 1
+        return self.buffer[posicao % self.tamanho]
+
+    def __getitem__(self, posicao):
+        """Token na posição absoluta, que precisa estar dentro da janela"""
+        return self.peek(posicao - self.posicao)
+
+    def avancar(self):
+        """Consome o token atual e retorna o próximo"""
+        self.posicao += 1
+        return self.peek()
+
+_ASCII = frozenset(chr(c) for c in range(128))
+_CATEGORIAS = {
+    categoria: frozenset(c for c in _ASCII if re.match(padrao, c))
+    for categoria, padrao in (
+        (sre_parse.CATEGORY_DIGIT, r'\d'), (sre_parse.CATEGORY_NOT_DIGIT, r'\D'),
+        (sre_parse.CATEGORY_SPACE, r'\s'), (sre_parse.CATEGORY_NOT_SPACE, r'\S'),
+        (sre_parse.CATEGORY_WORD, r'\w'), (sre_parse.CATEGORY_NOT_WORD, r'\W'),
+    )
+}
+_REPETICOES = tuple(getattr(sre_parse, nome) for nome in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+                    if hasattr(sre_parse, nome))
+
+def _primeiros_caracteres(itens):
+    """
+    Caracteres ASCII que podem iniciar um casamento da regex já analisada
+    (na dúvida, um superconjunto) e se ela pode casar a string vazia
+    """
+    primeiros = set()
+    for op, av in itens:
+        conjunto, anulavel = _primeiros_item(op, av)
+        primeiros |= conjunto
+        if not anulavel:
+            return primeiros, False
+    return primeiros, True
+
+def _primeiros_item(op, av):
+    if op is sre_parse.LITERAL:
+        return {chr(av)} & _ASCII, False
+    if op is sre_parse.NOT_LITERAL:
+        return _ASCII - {chr(av)}, False
+    if op is sre_parse.ANY:
+        return set(_ASCII), False
+    if op is sre_parse.IN:
+        return _conjunto_classe(av), False
+    if op is sre_parse.BRANCH:
+        primeiros, anulavel = set(), False
+        for alternativa in av[1]:
+            conjunto, anulavel_alt = _primeiros_caracteres(alternativa)
+            primeiros |= conjunto
+            anulavel = anulavel or anulavel_alt
+        return primeiros, anulavel
+    if op is sre_parse.SUBPATTERN:
+        return _primeiros_caracteres(av[-1])
+    if op in _REPETICOES:
+        minimo, _, subpadrao = av
+        primeiros, anulavel = _primeiros_caracteres(subpadrao)
+        return primeiros, anulavel or minimo == 0
+    if op is sre_parse.AT:
+        return set(), True
+    # Construção desconhecida: assume que pode começar com qualquer coisa
+    return set(_ASCII), True
+
+def _conjunto_classe(itens):
+    conjunto = set()
+    negado = False
+    for op, av in itens:
+        if op is sre_parse.NEGATE:
+            negado = True
+        elif op is sre_parse.LITERAL:
+            conjunto |= {chr(av)} & _ASCII
+        elif op is sre_parse.RANGE:
+            conjunto.update(chr(c) for c in range(av[0], min(av[1], 127) + 1))
+        elif op is sre_parse.CATEGORY and av in _CATEGORIAS:
+            conjunto |= _CATEGORIAS[av]
+        else:
+            return set(_ASCII)
+    return _ASCII - conjunto if negado else conjunto
+
+class TabelaTransicao:
+    """
+    Motor de varredura alternativo à regex com alternação. Uma tabela
+    indexada pelo código do primeiro caractere diz quais padrões podem
+    começar ali: tokens de um caractere saem direto da tabela e os demais
+    usam uma regex com apenas os padrões candidatos daquele caractere.
+    Caracteres fora do ASCII caem na regex completa.
+    """
+    def __init__(self, padroes, palavras_reservadas, padrao_compilado):
+        self.palavras_reservadas = palavras_reservadas
+        self.casar_generico = padrao_compilado.match
+
+        candidatos = [[] for _ in range(128)]
+        for nome, padrao in padroes:
+            itens = sre_parse.parse(padrao)
+            primeiros, anulavel = _primeiros_caracteres(itens)
+            if anulavel:
+                primeiros = _ASCII
+            for c in primeiros:
+                candidatos[ord(c)].append((nome, padrao, itens))
+
+        regex_por_candidatos = {}
+        self.transicoes = []
+        for lista in candidatos:
+            if not lista:
+                self.transicoes.append(None)
+            elif len(lista) == 1 and len(lista[0][2]) == 1 and lista[0][2][0][0] is sre_parse.LITERAL:
+                # Token de um caractere só: a própria tabela dá o tipo
+                self.transicoes.append(lista[0][0])
+            elif len(lista) == 1:
+                # Um único candidato: o tipo já é conhecido, dispensa lastgroup
+                nome, padrao, _ = lista[0]
+                self.transicoes.append((nome, re.compile(padrao).match))
+            else:
+                chave = tuple(nome for nome, _, _ in lista)
+                if chave not in regex_por_candidatos:
+                    regex = '|'.join('(?P<%s>%s)' % (nome, padrao) for nome, padrao, _ in lista)
+                    regex_por_candidatos[chave] = re.compile(regex).match
+                self.transicoes.append(regex_por_candidatos[chave])
+
+    def varrer(self, fonte):
+        """Gera (tipo, inicio, fim) de cada token, sem espaços e comentários"""
+        transicoes = self.transicoes
+        casar_generico = self.casar_generico
+        palavras_reservadas = self.palavras_reservadas
+        tamanho = len(fonte)
+        pos = 0
+
+        while pos < tamanho:
+            codigo = ord(fonte[pos])
+            acao = transicoes[codigo] if codigo < 128 else casar_generico
+
+            if acao is None:
+                pos += 1
+                continue
+
+            if acao.__class__ is str:
+                yield acao, pos, pos + 1
+                pos += 1
+                continue
+
+            if acao.__class__ is tuple:
+                tipo, casar = acao
+                match = casar(fonte, pos)
+            else:
+                match = acao(fonte, pos)
+                tipo = match and match.lastgroup
+            if match is None:
+                pos += 1
+                continue
+
+            inicio = pos
+            pos = match.end()
+
+            if tipo == 'ESPACO' or tipo == 'COMENTARIO':
+                continue
+
+            if tipo == 'ID':
+                tipo = palavras_reservadas.get(match.group(), 'ID')
+
+            yield tipo, inicio, pos
+
 class AnalisadorLexico:
-    def __init__(self):
+    MOTORES = ('regex', 'tabela')
+
+    def __init__(self, motor='regex'):
+        if motor not in self.MOTORES:
+            raise ValueError(f"Motor de varredura desconhecido: {motor}")
+        self.motor = motor
+
         #expressoes regulares
         self.padroes = [
             ('NUMERO', r'\d+(\.\d+)?'),
@@ -18,6 +465,7 @@ class AnalisadorLexico:
             ('OPERADOR_SOMA', r'\+'),
             ('OPERADOR_SUB', r'-'),
             ('OPERADOR_MUL', r'\*'),
+            ('COMENTARIO', r'//.*|/\*[\s\S]*?\*/'),  # Antes da divisão, senão '//' vira dois '/'
             ('OPERADOR_DIV', r'/'),  # Adicionado operador de divisão
             ('OPERADOR_ATRIB', r'='),
             ('DELIM_AP', r'\('),
@@ -27,10 +475,10 @@ class AnalisadorLexico:
             ('VIRGULA', r','),  # Adicionado vírgula
             ('PONTO_VIRGULA', r';'),
             ('ESPACO', r'\s+'),  
-            ('COMENTARIO', r'//.*|/\*[\s\S]*?\*/'),
         ]
         self.regex = '|'.join('(?P<%s>%s)' % (nome, padrao) for nome, padrao in self.padroes)
         self.padrao_compilado = re.compile(self.regex)
+        self.padrao_bytes = re.compile(self.regex.encode())
 
         self.palavras_reservadas = {
             'if': 'SE',
@@ -41,41 +489,346 @@ class AnalisadorLexico:
             'float': 'TIPO_FLOAT',
             'return': 'RETORNO',
         }
-    
+        self.tabela = None
+        if motor == 'tabela':
+            self.tabela = TabelaTransicao(self.padroes, self.palavras_reservadas, self.padrao_compilado)
+
+        # Nomes da compilação: todo ID tokenizado por este analisador é internado aqui
+        self.nomes = TabelaNomes()
+
     def tokenizar(self, codigo_fonte):
+        # Os tokens guardam só o offset; linha e coluna saem do índice de
+        # linhas quando alguém as pede
+        indice_linhas = IndiceLinhas(codigo_fonte)
+        nomes = self.nomes
+
+        if self.motor == 'tabela':
+            tokens = []
+            for tipo, inicio, fim in self.tabela.varrer(codigo_fonte):
+                valor = codigo_fonte[inicio:fim]
+                id_nome = None
+                if tipo == 'ID':
+                    id_nome = nomes.internar(valor)
+                    valor = nomes.nomes[id_nome]
+                tokens.append(Token(tipo, valor, inicio=inicio, indice_linhas=indice_linhas, id_nome=id_nome))
+            tokens.append(Token('EOF', '', len(indice_linhas), 0))
+            return tokens
+
         tokens = []
-        linha = 1
-        coluna_inicio = 0
 
         for match in self.padrao_compilado.finditer(codigo_fonte):
             tipo = match.lastgroup
-            valor = match.group()
-            coluna = match.start() - coluna_inicio
 
-            if tipo == 'ESPACO':
-                novas_linhas = valor.count('\n')
-                if novas_linhas > 0:
-                    linha += novas_linhas
-                    coluna_inicio = match.start() + valor.rfind('\n') + 1
+            if tipo == 'ESPACO' or tipo == 'COMENTARIO':
                 continue
             
-            if tipo == 'COMENTARIO':
-                novas_linhas = valor.count('\n')
-                if novas_linhas > 0:
-                    linha += novas_linhas
-                    coluna_inicio = match.start() + valor.rfind('\n') + 1
-                continue
-            
-            if tipo == 'ID' and valor in self.palavras_reservadas:
-                tipo = self.palavras_reservadas[valor]
+            valor = match.group()
+            id_nome = None
+            if tipo == 'ID':
+                if valor in self.palavras_reservadas:
+                    tipo = self.palavras_reservadas[valor]
+                else:
+                    id_nome = nomes.internar(valor)
+                    valor = nomes.nomes[id_nome]
    
-            token = Token(tipo, valor, linha, coluna)
+            token = Token(tipo, valor, inicio=match.start(), indice_linhas=indice_linhas, id_nome=id_nome)
             tokens.append(token)
  
-        tokens.append(Token('EOF', '', linha, 0))
+        tokens.append(Token('EOF', '', len(indice_linhas), 0))
         
         return tokens
 
+    def tokenizar_buffer(self, codigo_fonte):
+        """Tokeniza para um BufferTokens em vez de uma lista de objetos Token"""
+        buffer = BufferTokens(codigo_fonte, self.nomes)
+        adicionar = buffer.adicionar
+        palavras_reservadas = self.palavras_reservadas
+        codigos_tipo = CODIGOS_TIPO
+        internar = self.nomes.internar
+
+        if self.motor == 'tabela':
+            for tipo, inicio, fim in self.tabela.varrer(codigo_fonte):
+                if tipo == 'ID':
+                    adicionar(T_ID, inicio, fim, internar(codigo_fonte[inicio:fim]))
+                else:
+                    adicionar(codigos_tipo[tipo], inicio, fim)
+        else:
+            for match in self.padrao_compilado.finditer(codigo_fonte):
+                tipo = match.lastgroup
+
+                if tipo == 'ESPACO' or tipo == 'COMENTARIO':
+                    continue
+
+                if tipo == 'ID':
+                    valor = match.group()
+                    tipo = palavras_reservadas.get(valor)
+                    if tipo is None:
+                        adicionar(T_ID, match.start(), match.end(), internar(valor))
+                        continue
+
+                adicionar(codigos_tipo[tipo], match.start(), match.end())
+
+        adicionar(T_EOF, len(codigo_fonte), len(codigo_fonte))
+
+        return buffer
+
+    def tokenizar_bytes(self, dados):
+        """
+        Tokeniza bytes, memoryview ou um mmap do arquivo (UTF-8) sem
+        decodificá-lo, usando os padrões compilados para bytes. Retorna um
+        BufferTokensBytes, que mantém uma referência a `dados`: um mmap
+        precisa continuar aberto enquanto os tokens forem usados. Os IDs
+        são decodificados uma vez por nome distinto, ao serem internados.
+        Sempre usa o motor de regex.
+
+        Só ASCII: nos padrões de bytes, \\d e \\s casam apenas dígitos e
+        espaços ASCII. Um dígito Unicode (como '٣'), que o caminho de str
+        aceita em NUMERO, aqui é ignorado como qualquer caractere
+        desconhecido. Os tokens só coincidem com os de tokenizar_buffer
+        quando o código fora dos comentários é ASCII.
+
+        O resultado não pode ser passado para retokenizar (ValueError):
+        depois de uma edição, tokenize os bytes novos outra vez.
+        """
+        buffer = BufferTokensBytes(dados, self.nomes)
+        adicionar = buffer.adicionar
+        codigos_tipo = CODIGOS_TIPO
+        # Palavras reservadas e nomes já vistos, indexados pelos bytes do
+        # lexema: cada nome distinto só é decodificado uma vez
+        palavras_bytes = {palavra.encode(): tipo for palavra, tipo in self.palavras_reservadas.items()}
+        ids_bytes = {}
+        internar = self.nomes.internar
+
+        for match in self.padrao_bytes.finditer(dados):
+            tipo = match.lastgroup
+
+            if tipo == 'ESPACO' or tipo == 'COMENTARIO':
+                continue
+
+            inicio, fim = match.span()
+            if tipo == 'ID':
+                lexema = match.group()
+                tipo = palavras_bytes.get(lexema)
+                if tipo is None:
+                    id_nome = ids_bytes.get(lexema)
+                    if id_nome is None:
+                        id_nome = ids_bytes[lexema] = internar(lexema.decode('ascii'))
+                    adicionar(T_ID, inicio, fim, id_nome)
+                    continue
+
+            adicionar(codigos_tipo[tipo], inicio, fim)
+
+        adicionar(T_EOF, len(dados), len(dados))
+
+        return buffer
+
+    def retokenizar(self, buffer, inicio, removidos, inseridos):
+        """
+        Atualiza os tokens de um BufferTokens após uma edição do texto: em
+        `inicio`, `removidos` caracteres foram trocados por `inseridos`.
+        Só a região afetada é varrida de novo; assim que um token novo cai
+        no mesmo ponto de um token antigo, o resto é reaproveitado com os
+        offsets deslocados. Retorna um novo BufferTokens.
+
+        Só para buffers de str: um BufferTokensBytes (de tokenizar_bytes)
+        tem offsets em bytes e pode estar sobre um mmap somente leitura, e
+        é recusado com ValueError.
+        """
+        if isinstance(buffer, BufferTokensBytes):
+            raise ValueError("retokenizar não aceita buffers de bytes: tokenize os dados editados com tokenizar_bytes")
+        fonte = buffer.fonte
+        nova_fonte = fonte[:inicio] + inseridos + fonte[inicio + removidos:]
+        delta = len(inseridos) - removidos
+        fim_edicao = inicio + len(inseridos)  # Fim da região editada no texto novo
+        inicios, fins = buffer.inicios, buffer.fins
+
+        # Recomeça no último token que termina antes da edição com folga de um
+        # caractere, pois '12' + '.5' ou 'ab' + 'c' mudam o token anterior
+        reinicio = bisect_left(fins, inicio - 1) - 1
+
+        # Um '/*' que virou '/' e '*' por falta de '*/' pode virar comentário
+        # se a edição inserir o fechamento: recomeça nele. Só o primeiro
+        # importa, pois depois dele não há '*/' e nenhum outro '/*' fecha
+        abertura = buffer.abertura_pendente
+        if 0 <= abertura <= reinicio:
+            reinicio = abertura - 1
+
+        novo = BufferTokens(nova_fonte, buffer.nomes)
+        novo.codigos = buffer.codigos[:reinicio + 1]
+        novo.inicios = inicios[:reinicio + 1]
+        novo.fins = fins[:reinicio + 1]
+        novo.ids_nome = buffer.ids_nome[:reinicio + 1]
+        internar = buffer.nomes.internar
+        pos = fins[reinicio] if reinicio >= 0 else 0
+
+        adicionar = novo.adicionar
+        palavras_reservadas = self.palavras_reservadas
+        antigo = reinicio + 1  # Candidato a ressincronização no buffer antigo
+        novo._abertura_pendente = -1  # O prefixo reaproveitado não tem nenhuma
+
+        for match in self.padrao_compilado.finditer(nova_fonte, pos):
+            tipo = match.lastgroup
+            comeco = match.start()
+
+            if comeco >= fim_edicao:
+                # Texto intacto daqui em diante: se um token antigo começava
+                # no mesmo ponto, os tokens seguintes são os mesmos
+                while inicios[antigo] + delta < comeco:
+                    antigo += 1
+                if inicios[antigo] + delta == comeco and tipo != 'ESPACO' and tipo != 'COMENTARIO':
+                    deslocamento = len(novo.codigos) - antigo
+                    novo.codigos.extend(buffer.codigos[antigo:])
+                    novo.inicios.extend(i + delta for i in inicios[antigo:])
+                    novo.fins.extend(f + delta for f in fins[antigo:])
+                    novo.ids_nome.extend(buffer.ids_nome[antigo:])
+                    if novo._abertura_pendente < 0:
+                        if abertura >= antigo:
+                            novo._abertura_pendente = abertura + deslocamento
+                        elif abertura >= 0:
+                            # A edição desfez a abertura pendente: a próxima, se houver, está no resto
+                            novo._abertura_pendente = novo.procurar_abertura(comeco)
+                    return novo
+
+            if tipo == 'ESPACO' or tipo == 'COMENTARIO':
+                continue
+
+            if tipo == 'ID':
+                valor = match.group()
+                tipo = palavras_reservadas.get(valor)
+                if tipo is None:
+                    adicionar(T_ID, comeco, match.end(), internar(valor))
+                    continue
+            elif tipo == 'OPERADOR_DIV' and novo._abertura_pendente < 0 and nova_fonte.startswith('*', comeco + 1):
+                novo._abertura_pendente = len(novo.codigos)
+
+            adicionar(CODIGOS_TIPO[tipo], comeco, match.end())
+
+        adicionar(T_EOF, len(nova_fonte), len(nova_fonte))
+
+        return novo
+
+    def tokenizar_stream(self, arquivo, tamanho_bloco=65536):
+        """
+        Gera os tokens de um arquivo aos poucos, lendo-o em blocos de
+        tamanho_bloco caracteres. Só mantém em memória o trecho ainda não
+        consumido, então o uso de memória não depende do tamanho da entrada.
+        """
+        buffer = ''
+        base = 0  # Offset absoluto do início do buffer
+        pos = 0
+        linha = 1
+        coluna_inicio = 0
+        fim_arquivo = False
+
+        while True:
+            match = self.padrao_compilado.search(buffer, pos)
+
+            # Um lexema que encosta no fim do buffer pode continuar no próximo
+            # bloco (ID, número como '12.' + '5', '//' sem quebra de linha).
+            # Um '/' seguido de '*' é um comentário de bloco ainda não fechado.
+            if not fim_arquivo and (
+                match is None
+                or match.end() > len(buffer) - 2
+                or (match.lastgroup == 'OPERADOR_DIV' and buffer.startswith('*', match.end()))
+            ):
+                bloco = arquivo.read(tamanho_bloco)
+                if not bloco:
+                    fim_arquivo = True
+                buffer = buffer[pos:] + bloco
+                base += pos
+                pos = 0
+                continue
+
+            if match is None:
+                break
+
+            tipo = match.lastgroup
+            valor = match.group()
+            inicio = base + match.start()
+            coluna = inicio - coluna_inicio
+            pos = match.end()
+
+            if tipo == 'ESPACO' or tipo == 'COMENTARIO':
+                novas_linhas = valor.count('\n')
+                if novas_linhas > 0:
+                    linha += novas_linhas
+                    coluna_inicio = inicio + valor.rfind('\n') + 1
+                continue
+
+            id_nome = None
+            if tipo == 'ID':
+                if valor in self.palavras_reservadas:
+                    tipo = self.palavras_reservadas[valor]
+                else:
+                    id_nome = self.nomes.internar(valor)
+                    valor = self.nomes.nomes[id_nome]
+
+            yield Token(tipo, valor, linha, coluna, id_nome=id_nome)
+
+        yield Token('EOF', '', linha, 0)
+
+    def tokenizar_paralelo(self, codigo_fonte, processos=None, tamanho_minimo=1 << 20):
+        """
+        Tokeniza para um BufferTokens dividindo o fonte em trechos que são
+        analisados em paralelo num ProcessPoolExecutor. Fontes menores que
+        tamanho_minimo caracteres são analisados no próprio processo.
+        """
+        processos = processos or os.cpu_count() or 1
+        if processos == 1 or len(codigo_fonte) < tamanho_minimo:
+            return self.tokenizar_buffer(codigo_fonte)
+
+        cortes = self._pontos_de_corte(codigo_fonte, processos)
+        trechos = [(self.motor, codigo_fonte[inicio:fim]) for inicio, fim in zip(cortes, cortes[1:])]
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(_tokenizar_trecho, trechos))
+
+        buffer = BufferTokens(codigo_fonte, self.nomes)
+        for inicio, (codigos, inicios, fins, ids_nome, nomes) in zip(cortes, partes):
+            n = len(codigos) - 1  # Descarta o EOF de cada trecho
+            buffer.codigos.extend(codigos[:n])
+            buffer.inicios.extend(i + inicio for i in inicios[:n])
+            buffer.fins.extend(f + inicio for f in fins[:n])
+            # Cada processo tem sua própria tabela de nomes: traduz os ids
+            ids_globais = [self.nomes.internar(nome) for nome in nomes]
+            buffer.ids_nome.extend(ids_globais[i] if i >= 0 else -1 for i in ids_nome[:n])
+        buffer.adicionar(T_EOF, len(codigo_fonte), len(codigo_fonte))
+
+        return buffer
+
+    def _pontos_de_corte(self, codigo_fonte, partes):
+        """
+        Offsets onde o fonte pode ser dividido: logo após uma quebra de linha
+        que não está dentro de um comentário de bloco. Os comentários são
+        achados por uma varredura só com o padrão de comentário, que casa
+        exatamente as mesmas regiões que o analisador completo.
+        """
+        comentario = re.compile(dict(self.padroes)['COMENTARIO'])
+        inicios_bloco, fins_bloco = [], []
+        for match in comentario.finditer(codigo_fonte):
+            if codigo_fonte.find('\n', match.start(), match.end()) != -1:
+                inicios_bloco.append(match.start())
+                fins_bloco.append(match.end())
+
+        cortes = [0]
+        for parte in range(1, partes):
+            pos = codigo_fonte.find('\n', max(len(codigo_fonte) * parte // partes, cortes[-1]))
+            while pos != -1:
+                indice = bisect_right(inicios_bloco, pos) - 1
+                if indice < 0 or fins_bloco[indice] <= pos:
+                    break
+                pos = codigo_fonte.find('\n', fins_bloco[indice])
+            if pos == -1:
+                break
+            cortes.append(pos + 1)
+        cortes.append(len(codigo_fonte))
+        return cortes
+
+def _tokenizar_trecho(argumentos):
+    """Executado nos processos de tokenizar_paralelo"""
+    motor, trecho = argumentos
+    buffer = AnalisadorLexico(motor).tokenizar_buffer(trecho)
+    return buffer.codigos, buffer.inicios, buffer.fins, buffer.ids_nome, buffer.nomes.nomes
+
 if __name__ == '__main__':
     codigo = """
     int soma(int a, int b) {
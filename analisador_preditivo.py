@@ -0,0 +1,290 @@
+from analisador_lexico import TIPOS_TOKEN, CODIGOS_TIPO, T_EOF, T_ID, T_NUMERO, T_TIPO_INT, T_TIPO_FLOAT
+from analisador_sintatico import (AnalisadorSintatico, OPERADORES_BINARIOS, NoPrograma, NoFuncao,
+                                  NoParametro, NoBloco, NoDeclaracao, NoAtribuicao, NoRetorno, NoSe,
+                                  NoEnquanto, NoPara, NoExpressao, NoNumero, NoIdentificador,
+                                  NoChamadaFuncao)
+
+# Gramática da linguagem: terminais são nomes de TIPOS_TOKEN, não terminais
+# são minúsculos, 'ε' é a produção vazia e '@nome' é uma ação semântica
+# (método acao_nome do parser), que monta nós na pilha de valores.
+# As regras das expressões saem de OPERADORES_BINARIOS (regras_expressao).
+GRAMATICA = """
+programa -> @lista funcoes @programa
+funcoes -> funcao @anexar funcoes | ε
+funcao -> tipo ID DELIM_AP @lista parametros DELIM_FP bloco @funcao
+parametros -> parametro @anexar mais_parametros | ε
+mais_parametros -> VIRGULA parametro @anexar mais_parametros | ε
+parametro -> tipo ID @parametro
+tipo -> TIPO_INT | TIPO_FLOAT
+bloco -> DELIM_AC @lista comandos DELIM_FC @bloco
+comandos -> comando @anexar comandos | ε
+comando -> declaracao PONTO_VIRGULA
+         | retorno PONTO_VIRGULA
+         | se
+         | enquanto
+         | para
+         | ID comando_id PONTO_VIRGULA
+         | fator_sem_id {caudas} PONTO_VIRGULA
+comando_id -> OPERADOR_ATRIB expressao @atribuicao | sufixo_id {caudas}
+declaracao -> tipo ID inicializador @declaracao
+inicializador -> OPERADOR_ATRIB expressao | @nenhum
+retorno -> RETORNO expressao @retorno
+se -> SE DELIM_AP expressao DELIM_FP bloco senao @se
+senao -> SENAO bloco | @nenhum
+enquanto -> ENQUANTO DELIM_AP expressao DELIM_FP bloco @enquanto
+para -> PARA DELIM_AP inicializacao PONTO_VIRGULA expressao PONTO_VIRGULA expressao DELIM_FP bloco @para
+inicializacao -> declaracao | ID OPERADOR_ATRIB expressao @atribuicao
+{expressoes}
+fator -> fator_sem_id | ID sufixo_id
+fator_sem_id -> NUMERO @numero | DELIM_AP expressao DELIM_FP
+sufixo_id -> DELIM_AP @lista argumentos DELIM_FP @chamada | @identificador
+argumentos -> expressao @anexar mais_argumentos | ε
+mais_argumentos -> VIRGULA expressao @anexar mais_argumentos | ε
+"""
+
+def regras_expressao():
+    """Regras das expressões, um nível por precedência de OPERADORES_BINARIOS; retorna (regras, caudas)"""
+    niveis = sorted({precedencia for precedencia, _ in OPERADORES_BINARIOS.values()})
+    nomes = ['expressao'] + [f"nivel_{precedencia}" for precedencia in niveis[1:]] + ['fator']
+    regras = []
+    for i, precedencia in enumerate(niveis):
+        operadores = [TIPOS_TOKEN[codigo] for codigo, (p, _) in OPERADORES_BINARIOS.items() if p == precedencia]
+        regras.append(f"{nomes[i]} -> {nomes[i + 1]} cauda_{precedencia}")
+        alternativas = [f"{op} {nomes[i + 1]} @binaria cauda_{precedencia}" for op in operadores]
+        regras.append(f"cauda_{precedencia} -> {' | '.join(alternativas)} | ε")
+    # Depois de um fator, as caudas continuam a expressão do nível mais forte ao mais fraco
+    caudas = ' '.join(f"cauda_{precedencia}" for precedencia in reversed(niveis))
+    return '\n'.join(regras), caudas
+
+def ler_gramatica(texto):
+    """Lê o texto da gramática: {não terminal: [produção, ...]}, cada produção uma tupla de símbolos"""
+    regras, caudas = regras_expressao()
+    texto = texto.replace('{expressoes}', regras).replace('{caudas}', caudas)
+
+    gramatica = {}
+    atual = None
+    for linha in texto.strip().splitlines():
+        linha = linha.strip()
+        if '->' in linha:
+            atual, linha = (parte.strip() for parte in linha.split('->', 1))
+            gramatica.setdefault(atual, [])
+        elif linha.startswith('|'):
+            linha = linha[1:]
+        for alternativa in linha.split('|'):
+            simbolos = []
+            for simbolo in alternativa.split():
+                if simbolo == 'ε':
+                    continue
+                if simbolo in CODIGOS_TIPO:
+                    simbolo = CODIGOS_TIPO[simbolo]
+                simbolos.append(simbolo)
+            gramatica[atual].append(tuple(simbolos))
+    return gramatica
+
+def e_terminal(simbolo):
+    return type(simbolo) is int
+
+def e_acao(simbolo):
+    return type(simbolo) is str and simbolo.startswith('@')
+
+def first_sequencia(simbolos, first):
+    """FIRST de uma sequência de símbolos; None no conjunto representa ε"""
+    resultado = set()
+    for simbolo in simbolos:
+        if e_acao(simbolo):
+            continue
+        if e_terminal(simbolo):
+            resultado.add(simbolo)
+            return resultado
+        resultado |= first[simbolo] - {None}
+        if None not in first[simbolo]:
+            return resultado
+    resultado.add(None)
+    return resultado
+
+def conjuntos_first(gramatica):
+    """Conjuntos FIRST de cada não terminal (ponto fixo)"""
+    first = {nao_terminal: set() for nao_terminal in gramatica}
+    mudou = True
+    while mudou:
+        mudou = False
+        for nao_terminal, producoes in gramatica.items():
+            for producao in producoes:
+                novos = first_sequencia(producao, first) - first[nao_terminal]
+                if novos:
+                    first[nao_terminal] |= novos
+                    mudou = True
+    return first
+
+def conjuntos_follow(gramatica, first, inicial='programa'):
+    """Conjuntos FOLLOW de cada não terminal (ponto fixo); o fim da entrada é T_EOF"""
+    follow = {nao_terminal: set() for nao_terminal in gramatica}
+    follow[inicial].add(T_EOF)
+    mudou = True
+    while mudou:
+        mudou = False
+        for nao_terminal, producoes in gramatica.items():
+            for producao in producoes:
+                for i, simbolo in enumerate(producao):
+                    if e_terminal(simbolo) or e_acao(simbolo):
+                        continue
+                    resto = first_sequencia(producao[i + 1:], first)
+                    novos = resto - {None}
+                    if None in resto:
+                        novos |= follow[nao_terminal]
+                    novos -= follow[simbolo]
+                    if novos:
+                        follow[simbolo] |= novos
+                        mudou = True
+    return follow
+
+def construir_tabela(gramatica, first, follow):
+    """
+    Tabela preditiva {não terminal: {código do token: produção}}. Cada
+    produção é guardada invertida, pronta para ser empilhada, e com as
+    ações já resolvidas para os métodos de AnalisadorPreditivo.
+    """
+    tabela = {}
+    for nao_terminal, producoes in gramatica.items():
+        linha = tabela[nao_terminal] = {}
+        for producao in producoes:
+            previstos = first_sequencia(producao, first)
+            if None in previstos:
+                previstos = (previstos - {None}) | follow[nao_terminal]
+
+            empilhar = tuple(
+                getattr(AnalisadorPreditivo, 'acao_' + simbolo[1:]) if e_acao(simbolo) else simbolo
+                for simbolo in reversed(producao)
+            )
+            for codigo in previstos:
+                if codigo in linha:
+                    raise ValueError(f"Gramática não é LL(1): conflito em {nao_terminal} com {TIPOS_TOKEN[codigo]}")
+                linha[codigo] = empilhar
+    return tabela
+
+# Valor empilhado por terminais que não são ID nem NUMERO (os demais não empilham nada)
+VALOR_TERMINAL = {T_TIPO_INT: 'int', T_TIPO_FLOAT: 'float'}
+VALOR_TERMINAL.update({codigo: simbolo for codigo, (_, simbolo) in OPERADORES_BINARIOS.items()})
+
+class AnalisadorPreditivo(AnalisadorSintatico):
+    """
+    Parser LL(1) dirigido por tabela: a cada não terminal, uma consulta a
+    TABELA[não terminal][token atual] escolhe a produção. Símbolos a derivar
+    e valores ficam em pilhas explícitas, e as ações @nome montam os mesmos
+    nós No* que o parser descendente recursivo.
+    """
+    def __init__(self, tokens, nomes=None, arena=False):
+        super().__init__(tokens, nomes, arena=arena)
+
+    def programa(self):
+        pilha = ['programa']  # símbolos a derivar, topo no fim
+        valores = []
+        tabela = TABELA
+
+        while pilha:
+            simbolo = pilha.pop()
+
+            if type(simbolo) is int:
+                if self.codigo_atual != simbolo:
+                    self.consumir(simbolo)
+                if simbolo == T_ID:
+                    valores.append(self.consumir_nome())
+                    continue
+                if simbolo == T_NUMERO:
+                    valores.append(self.consumir(T_NUMERO).valor)
+                    continue
+                if simbolo in VALOR_TERMINAL:
+                    valores.append(VALOR_TERMINAL[simbolo])
+                self.avancar()
+
+            elif type(simbolo) is str:
+                producao = tabela[simbolo].get(self.codigo_atual)
+                if producao is None:
+                    esperados = ', '.join(sorted(f"'{TIPOS_TOKEN[codigo]}'" for codigo in tabela[simbolo]))
+                    self.erro(f"Esperado um de {esperados} em {simbolo}, encontrado "
+                              f"'{TIPOS_TOKEN[self.codigo_atual] if self.codigo_atual is not None else 'EOF'}'")
+                pilha.extend(producao)
+
+            else:
+                simbolo(self, valores)
+
+        return valores.pop()
+
+    # Ações semânticas: desempilham os valores da produção e empilham o nó
+
+    def acao_lista(self, valores):
+        valores.append([])
+
+    def acao_anexar(self, valores):
+        item = valores.pop()
+        valores[-1].append(item)
+
+    def acao_nenhum(self, valores):
+        valores.append(None)
+
+    def acao_programa(self, valores):
+        valores.append(self.novo_no(NoPrograma, valores.pop(), self.nomes))
+
+    def acao_funcao(self, valores):
+        corpo = valores.pop()
+        parametros = valores.pop()
+        nome, id_nome = valores.pop()
+        valores[-1] = self.novo_no(NoFuncao, valores[-1], nome, parametros, corpo, id_nome)
+
+    def acao_parametro(self, valores):
+        nome, id_nome = valores.pop()
+        valores[-1] = self.novo_no(NoParametro, valores[-1], nome, id_nome)
+
+    def acao_bloco(self, valores):
+        valores[-1] = self.novo_no(NoBloco, valores[-1])
+
+    def acao_declaracao(self, valores):
+        valor = valores.pop()
+        nome, id_nome = valores.pop()
+        valores[-1] = self.novo_no(NoDeclaracao, valores[-1], nome, valor, id_nome)
+
+    def acao_atribuicao(self, valores):
+        valor = valores.pop()
+        nome, id_nome = valores[-1]
+        valores[-1] = self.novo_no(NoAtribuicao, nome, valor, id_nome)
+
+    def acao_retorno(self, valores):
+        valores[-1] = self.novo_no(NoRetorno, valores[-1])
+
+    def acao_se(self, valores):
+        bloco_senao = valores.pop()
+        bloco_se = valores.pop()
+        valores[-1] = self.novo_no(NoSe, valores[-1], bloco_se, bloco_senao)
+
+    def acao_enquanto(self, valores):
+        bloco = valores.pop()
+        valores[-1] = self.novo_no(NoEnquanto, valores[-1], bloco)
+
+    def acao_para(self, valores):
+        bloco = valores.pop()
+        incremento = valores.pop()
+        condicao = valores.pop()
+        valores[-1] = self.novo_no(NoPara, valores[-1], condicao, incremento, bloco)
+
+    def acao_binaria(self, valores):
+        direita = valores.pop()
+        operador = valores.pop()
+        valores[-1] = self.novo_no(NoExpressao, operador, valores[-1], direita)
+
+    def acao_numero(self, valores):
+        valores[-1] = self.novo_no(NoNumero, valores[-1])
+
+    def acao_identificador(self, valores):
+        nome, id_nome = valores[-1]
+        valores[-1] = self.novo_no(NoIdentificador, nome, id_nome)
+
+    def acao_chamada(self, valores):
+        argumentos = valores.pop()
+        nome, id_nome = valores[-1]
+        valores[-1] = self.novo_no(NoChamadaFuncao, nome, argumentos, id_nome)
+
+# Calculados uma vez, na importação do módulo
+GRAMATICA_LL1 = ler_gramatica(GRAMATICA)
+FIRST = conjuntos_first(GRAMATICA_LL1)
+FOLLOW = conjuntos_follow(GRAMATICA_LL1, FIRST)
+TABELA = construir_tabela(GRAMATICA_LL1, FIRST, FOLLOW)
@@ -1,86 +1,190 @@
+from analisador_lexico import TabelaNomes
+from analisador_sintatico import (Visitante, NoDeclaracao, NoAtribuicao, NoRetorno, NoSe, NoEnquanto, NoPara,
+                                  NoBloco, NoExpressao, NoNumero, NoIdentificador, NoChamadaFuncao)
+
 class ErroSemantico(Exception):
     def __init__(self, mensagem):
         self.mensagem = mensagem
         super().__init__(mensagem)
 
 class Simbolo:
+    __slots__ = ('nome', 'tipo', 'categoria', 'escopo', 'parametros', 'usado', 'declarado')
+    
     def __init__(self, nome, tipo, categoria, escopo=None, parametros=None):
         self.nome = nome
         self.tipo = tipo  # 'int', 'float'
         self.categoria = categoria  # 'variavel', 'funcao', 'parametro'
-        self.escopo = escopo
+        self.escopo = escopo  # número do escopo onde foi declarado
         self.parametros = parametros or []  # Para funções
         self.usado = False
         self.declarado = True
 
 class TabelaSimbolos:
+    """
+    Tabela de símbolos com uma pilha de ligações por nome: a última ligação
+    de cada chave é a visível, então a busca é O(1) qualquer que seja a
+    profundidade. Cada escopo aberto só guarda onde começam suas declarações
+    em declarados, e sair dele desfaz exatamente essas ligações.
+    """
     def __init__(self):
-        self.pilha_escopos = [{}]  # Pilha de escopos (global primeiro)
-        self.escopo_atual = 0
+        self.ligacoes = {}  # chave -> pilha de símbolos ativos (o último é o visível)
+        self.declarados = []  # chaves declaradas nos escopos abertos, em ordem
+        self.marcas = [0]  # início de cada escopo aberto em declarados (global primeiro)
+        self.escopos = [0]  # número de cada escopo aberto (global = 0)
         self.contador_escopo = 0
     
+    @property
+    def escopo_atual(self):
+        """Número do escopo mais interno aberto"""
+        return self.escopos[-1]
+    
     def entrar_escopo(self):
         """Entra em um novo escopo"""
-        self.pilha_escopos.append({})
         self.contador_escopo += 1
-        self.escopo_atual = self.contador_escopo
+        self.escopos.append(self.contador_escopo)
+        self.marcas.append(len(self.declarados))
     
     def sair_escopo(self):
-        """Sai do escopo atual"""
-        if len(self.pilha_escopos) > 1:
-            self.pilha_escopos.pop()
-            self.escopo_atual -= 1
-    
-    def declarar_simbolo(self, nome, tipo, categoria, parametros=None):
-        """Declara um novo símbolo no escopo atual"""
-        if nome in self.pilha_escopos[-1]:
+        """Sai do escopo atual, desfazendo as ligações declaradas nele"""
+        if len(self.escopos) > 1:
+            self.escopos.pop()
+            inicio = self.marcas.pop()
+            declarados, ligacoes = self.declarados, self.ligacoes
+            while len(declarados) > inicio:
+                chave = declarados.pop()
+                pilha = ligacoes[chave]
+                pilha.pop()
+                if not pilha:
+                    del ligacoes[chave]
+    
+    def declarar_simbolo(self, nome, tipo, categoria, parametros=None, chave=None):
+        """Declara um novo símbolo no escopo atual (chave: id do nome, ou o próprio nome)"""
+        if chave is None:
+            chave = nome
+        pilha = self.ligacoes.get(chave)
+        if pilha and pilha[-1].escopo == self.escopos[-1]:
             raise ErroSemantico(f"Símbolo '{nome}' já declarado no escopo atual")
         
-        simbolo = Simbolo(nome, tipo, categoria, self.escopo_atual, parametros)
-        self.pilha_escopos[-1][nome] = simbolo
+        simbolo = Simbolo(nome, tipo, categoria, self.escopos[-1], parametros)
+        if pilha:
+            pilha.append(simbolo)
+        else:
+            self.ligacoes[chave] = [simbolo]
+        self.declarados.append(chave)
         return simbolo
     
-    def buscar_simbolo(self, nome):
-        """Busca um símbolo em todos os escopos (do mais interno ao mais externo)"""
-        for escopo in reversed(self.pilha_escopos):
-            if nome in escopo:
-                escopo[nome].usado = True
-                return escopo[nome]
-        return None
+    def buscar_simbolo(self, chave):
+        """Busca o símbolo visível (o declarado no escopo mais interno) em O(1)"""
+        pilha = self.ligacoes.get(chave)
+        if not pilha:
+            return None
+        simbolo = pilha[-1]
+        simbolo.usado = True
+        return simbolo
+    
+    def simbolos_escopo(self, profundidade):
+        """Símbolos declarados no escopo aberto de dada profundidade (0 = global), por chave"""
+        inicio = self.marcas[profundidade]
+        fim = self.marcas[profundidade + 1] if profundidade + 1 < len(self.marcas) else len(self.declarados)
+        numero = self.escopos[profundidade]
+        return {chave: next(simbolo for simbolo in self.ligacoes[chave] if simbolo.escopo == numero)
+                for chave in self.declarados[inicio:fim]}
     
     def obter_simbolos_escopo_atual(self):
         """Retorna todos os símbolos do escopo atual"""
-        return self.pilha_escopos[-1]
+        return self.simbolos_escopo(len(self.escopos) - 1)
+
+class Anotacoes:
+    """
+    Resultado da análise semântica, em tabelas laterais indexadas pelo nó
+    (objeto ou visão da arena), para a geração de código e as fases
+    seguintes não resolverem tudo de novo
+    """
+    __slots__ = ('tipos', 'simbolos', 'retorna', 'constantes')
+    
+    def __init__(self):
+        self.tipos = {}  # nó de expressão -> tipo ('int', 'float', ou None se inválido)
+        self.simbolos = {}  # nó com nome (declaração, parâmetro, função, uso) -> Simbolo
+        self.retorna = {}  # NoBloco -> se todo caminho pelo bloco termina em return
+        self.constantes = {}  # expressão -> valor conhecido em tempo de compilação (OtimizadorConstantes)
+    
+    def tipo(self, no):
+        """Tipo anotado da expressão (None se desconhecido)"""
+        return self.tipos.get(no)
 
-class AnalisadorSemantico:
+class AnalisadorSemantico(Visitante):
+    DESPACHO = {
+        'comando': {
+            NoDeclaracao: 'analisar_declaracao',
+            NoAtribuicao: 'analisar_atribuicao',
+            NoRetorno: 'analisar_retorno',
+            NoSe: 'analisar_se',
+            NoEnquanto: 'analisar_enquanto',
+            NoPara: 'analisar_para',
+            NoBloco: 'analisar_bloco_aninhado',
+            NoExpressao: 'analisar_expressao',
+            object: 'ignorar_comando',
+        },
+        # Passos do percurso de expressões: (nó, filhos já analisados, símbolo, pilha, tipos)
+        'expressao': {
+            NoNumero: 'passo_numero',
+            NoIdentificador: 'passo_identificador',
+            NoChamadaFuncao: 'passo_chamada_funcao',
+            NoExpressao: 'passo_operacao',
+            object: 'passo_desconhecido',
+        },
+    }
+    
     def __init__(self):
         self.tabela_simbolos = TabelaSimbolos()
         self.funcao_atual = None
         self.erros = []
+        self.nomes = TabelaNomes()
+        self.anotacoes = Anotacoes()
+    
+    def chave(self, no):
+        """Id do nome do nó na tabela de nomes (interna o nome se o nó não tiver id)"""
+        if no.id_nome is not None:
+            return no.id_nome
+        return self.nomes.internar(no.nome)
     
     def erro(self, mensagem):
-        """Registra um erro semântico"""
+        """Registra um erro semântico; a análise continua para reportar os demais"""
         self.erros.append(mensagem)
-        raise ErroSemantico(mensagem)
     
-    def analisar(self, arvore):
-        """Ponto de entrada da análise semântica"""
+    def declarar(self, no, tipo, categoria, parametros=None):
+        """
+        Declara o nome do nó e anota o símbolo criado; a redeclaração é
+        registrada como erro em vez de interromper a análise
+        """
         try:
-            self.analisar_programa(arvore)
-            
-            # Verifica se há função main
-            main_func = self.tabela_simbolos.buscar_simbolo('main')
-            if not main_func:
-                self.erro("Função 'main' não encontrada")
-            elif main_func.tipo != 'int':
-                self.erro("Função 'main' deve retornar 'int'")
-            
-            print("✅ Análise semântica concluída com sucesso!")
-            return True
-            
+            simbolo = self.tabela_simbolos.declarar_simbolo(no.nome, tipo, categoria, parametros, self.chave(no))
         except ErroSemantico as e:
-            print(f"❌ Erro semântico: {e.mensagem}")
+            self.erro(e.mensagem)
+            return None
+        self.anotacoes.simbolos[no] = simbolo
+        return simbolo
+    
+    def analisar(self, arvore):
+        """Ponto de entrada da análise semântica: reporta todos os erros de uma vez"""
+        if arvore.nomes is not None:
+            self.nomes = arvore.nomes
+        self.analisar_programa(arvore)
+        
+        # Verifica se há função main
+        main_func = self.tabela_simbolos.buscar_simbolo(self.nomes.internar('main'))
+        if not main_func:
+            self.erro("Função 'main' não encontrada")
+        elif main_func.tipo != 'int':
+            self.erro("Função 'main' deve retornar 'int'")
+        
+        if self.erros:
+            for mensagem in self.erros:
+                print(f"❌ Erro semântico: {mensagem}")
             return False
+        
+        print("✅ Análise semântica concluída com sucesso!")
+        return True
     
     def analisar_programa(self, no):
         """Analisa o programa (lista de funções)"""
@@ -90,12 +194,7 @@ class AnalisadorSemantico:
             if funcao.parametros:
                 tipos_parametros = [param.tipo for param in funcao.parametros]
             
-            self.tabela_simbolos.declarar_simbolo(
-                funcao.nome, 
-                funcao.tipo_retorno, 
-                'funcao', 
-                tipos_parametros
-            )
+            self.declarar(funcao, funcao.tipo_retorno, 'funcao', tipos_parametros)
         
         # Segunda passada: analisa o corpo das funções
         for funcao in no.funcoes:
@@ -108,11 +207,7 @@ class AnalisadorSemantico:
         
         # Declara os parâmetros no escopo da função
         for param in no.parametros:
-            self.tabela_simbolos.declarar_simbolo(
-                param.nome, 
-                param.tipo, 
-                'parametro'
-            )
+            self.declarar(param, param.tipo, 'parametro')
         
         # Analisa o corpo da função
         self.analisar_bloco(no.corpo)
@@ -125,49 +220,41 @@ class AnalisadorSemantico:
         self.funcao_atual = None
     
     def tem_return(self, bloco):
-        """Verifica se um bloco tem pelo menos um comando return"""
-        from analisador_sintatico import NoRetorno, NoSe, NoEnquanto, NoPara, NoBloco
-        
-        for comando in bloco.comandos:
+        """Verifica se um bloco (já analisado) tem pelo menos um comando return"""
+        return self.anotacoes.retorna.get(bloco, False)
+    
+    def analisar_bloco(self, no):
+        """Analisa um bloco de comandos e anota se ele sempre retorna"""
+        for comando in no.comandos:
+            self.analisar_comando(comando)
+        self.anotacoes.retorna[no] = self.bloco_retorna(no)
+    
+    def bloco_retorna(self, no):
+        """Se o bloco tem um return, direto ou em if/else (com os dois blocos retornando) ou bloco aninhado"""
+        retorna = self.anotacoes.retorna  # os blocos internos já foram anotados
+        for comando in no.comandos:
             if isinstance(comando, NoRetorno):
                 return True
             elif isinstance(comando, NoSe):
-                # Se tem else, verifica se ambos os blocos têm return
-                if comando.bloco_senao and self.tem_return(comando.bloco_se) and self.tem_return(comando.bloco_senao):
+                if comando.bloco_senao and retorna.get(comando.bloco_se) and retorna.get(comando.bloco_senao):
                     return True
             elif isinstance(comando, NoBloco):
-                if self.tem_return(comando):
+                if retorna.get(comando):
                     return True
         return False
     
-    def analisar_bloco(self, no):
-        """Analisa um bloco de comandos"""
-        for comando in no.comandos:
-            self.analisar_comando(comando)
-    
     def analisar_comando(self, no):
-        """Analisa um comando"""
-        from analisador_sintatico import (NoDeclaracao, NoAtribuicao, NoRetorno, 
-                                        NoSe, NoEnquanto, NoPara, NoBloco, NoExpressao)
-        
-        if isinstance(no, NoDeclaracao):
-            self.analisar_declaracao(no)
-        elif isinstance(no, NoAtribuicao):
-            self.analisar_atribuicao(no)
-        elif isinstance(no, NoRetorno):
-            self.analisar_retorno(no)
-        elif isinstance(no, NoSe):
-            self.analisar_se(no)
-        elif isinstance(no, NoEnquanto):
-            self.analisar_enquanto(no)
-        elif isinstance(no, NoPara):
-            self.analisar_para(no)
-        elif isinstance(no, NoBloco):
-            self.tabela_simbolos.entrar_escopo()
-            self.analisar_bloco(no)
-            self.tabela_simbolos.sair_escopo()
-        elif isinstance(no, NoExpressao):
-            self.analisar_expressao(no)
+        """Analisa um comando (despacho pela classe do nó)"""
+        self.despacho_comando[type(no)](self, no)
+    
+    def analisar_bloco_aninhado(self, no):
+        """Bloco usado como comando: abre um escopo próprio"""
+        self.tabela_simbolos.entrar_escopo()
+        self.analisar_bloco(no)
+        self.tabela_simbolos.sair_escopo()
+    
+    def ignorar_comando(self, no):
+        """Expressões sem operador (número, identificador, chamada) usadas como comando não são analisadas"""
     
     def analisar_declaracao(self, no):
         """Analisa uma declaração de variável"""
@@ -176,7 +263,7 @@ class AnalisadorSemantico:
             self.erro(f"Tipo inválido: {no.tipo}")
         
         # Declara a variável
-        self.tabela_simbolos.declarar_simbolo(no.nome, no.tipo, 'variavel')
+        self.declarar(no, no.tipo, 'variavel')
         
         # Se há inicialização, analisa a expressão
         if no.valor:
@@ -190,18 +277,20 @@ class AnalisadorSemantico:
     def analisar_atribuicao(self, no):
         """Analisa uma atribuição"""
         # Verifica se a variável foi declarada
-        simbolo = self.tabela_simbolos.buscar_simbolo(no.nome)
+        simbolo = self.tabela_simbolos.buscar_simbolo(self.chave(no))
         if not simbolo:
             self.erro(f"Variável '{no.nome}' não declarada")
-        
-        if simbolo.categoria != 'variavel' and simbolo.categoria != 'parametro':
+        elif simbolo.categoria != 'variavel' and simbolo.categoria != 'parametro':
             self.erro(f"'{no.nome}' não é uma variável")
+            simbolo = None
+        else:
+            self.anotacoes.simbolos[no] = simbolo
         
         # Analisa a expressão do valor
         tipo_valor = self.analisar_expressao(no.valor)
         
         # Verifica compatibilidade de tipos
-        if not self.tipos_compativeis(simbolo.tipo, tipo_valor):
+        if simbolo and not self.tipos_compativeis(simbolo.tipo, tipo_valor):
             self.erro(f"Tipo incompatível na atribuição: "
                      f"esperado '{simbolo.tipo}', encontrado '{tipo_valor}'")
     
@@ -209,6 +298,7 @@ class AnalisadorSemantico:
         """Analisa um comando return"""
         if not self.funcao_atual:
             self.erro("Comando 'return' fora de função")
+            return
         
         tipo_retorno = self.analisar_expressao(no.valor)
         
@@ -217,13 +307,14 @@ class AnalisadorSemantico:
             self.erro(f"Tipo de retorno incompatível: "
                      f"esperado '{self.funcao_atual.tipo_retorno}', encontrado '{tipo_retorno}'")
     
+    def verificar_condicao(self, tipo_condicao):
+        """A condição deve ser de um tipo que pode ser avaliado como booleano"""
+        if tipo_condicao is not None and tipo_condicao not in ['int', 'float']:
+            self.erro(f"Condição deve ser do tipo 'int' ou 'float', encontrado '{tipo_condicao}'")
+    
     def analisar_se(self, no):
         """Analisa um comando if"""
-        tipo_condicao = self.analisar_expressao(no.condicao)
-        
-        # A condição deve ser de um tipo que pode ser avaliado como booleano
-        if tipo_condicao not in ['int', 'float']:
-            self.erro(f"Condição deve ser do tipo 'int' ou 'float', encontrado '{tipo_condicao}'")
+        self.verificar_condicao(self.analisar_expressao(no.condicao))
         
         # Analisa os blocos
         self.tabela_simbolos.entrar_escopo()
@@ -237,10 +328,7 @@ class AnalisadorSemantico:
     
     def analisar_enquanto(self, no):
         """Analisa um comando while"""
-        tipo_condicao = self.analisar_expressao(no.condicao)
-        
-        if tipo_condicao not in ['int', 'float']:
-            self.erro(f"Condição deve ser do tipo 'int' ou 'float', encontrado '{tipo_condicao}'")
+        self.verificar_condicao(self.analisar_expressao(no.condicao))
         
         self.tabela_simbolos.entrar_escopo()
         self.analisar_bloco(no.bloco)
@@ -254,9 +342,7 @@ class AnalisadorSemantico:
         self.analisar_comando(no.inicializacao)
         
         # Analisa condição
-        tipo_condicao = self.analisar_expressao(no.condicao)
-        if tipo_condicao not in ['int', 'float']:
-            self.erro(f"Condição deve ser do tipo 'int' ou 'float', encontrado '{tipo_condicao}'")
+        self.verificar_condicao(self.analisar_expressao(no.condicao))
         
         # Analisa incremento
         self.analisar_expressao(no.incremento)
@@ -267,86 +353,138 @@ class AnalisadorSemantico:
         self.tabela_simbolos.sair_escopo()
     
     def analisar_expressao(self, no):
-        """Analisa uma expressão e retorna seu tipo"""
-        from analisador_sintatico import (NoExpressao, NoNumero, NoIdentificador, NoChamadaFuncao)
+        """Analisa uma expressão e retorna seu tipo (pós-ordem com pilha explícita, sem recursão)"""
+        despacho = self.despacho_expressao
+        tipos = []  # tipos das subexpressões já analisadas
+        pilha = [(no, 0, None)]  # (nó, filhos já analisados, símbolo da função chamada)
+        
+        while pilha:
+            no, feitos, simbolo = pilha.pop()
+            despacho[type(no)](self, no, feitos, simbolo, pilha, tipos)
+        
+        return tipos.pop()
+    
+    def passo_numero(self, no, feitos, simbolo, pilha, tipos):
+        # Determina o tipo do número
+        tipo = self.anotacoes.tipos[no] = 'float' if '.' in str(no.valor) else 'int'
+        tipos.append(tipo)
+    
+    def passo_identificador(self, no, feitos, simbolo, pilha, tipos):
+        tipo = self.anotacoes.tipos[no] = self.analisar_identificador(no)
+        tipos.append(tipo)
+    
+    def passo_chamada_funcao(self, no, feitos, simbolo, pilha, tipos):
+        if feitos == 0:
+            simbolo = self.analisar_chamada_funcao(no)
+        else:
+            self.analisar_argumento(no, simbolo, feitos - 1, tipos.pop())
+        
+        if feitos < len(no.argumentos):
+            pilha.append((no, feitos + 1, simbolo))
+            pilha.append((no.argumentos[feitos], 0, None))
+        else:
+            tipo = self.anotacoes.tipos[no] = simbolo.tipo if simbolo else None
+            tipos.append(tipo)
+    
+    def passo_operacao(self, no, feitos, simbolo, pilha, tipos):
+        filhos = (no.esquerda, no.direita) if no.direita else (no.esquerda,)
+        if feitos < len(filhos):
+            pilha.append((no, feitos + 1, None))
+            pilha.append((filhos[feitos], 0, None))
+        elif no.direita:  # Operação binária
+            tipo_dir = tipos.pop()
+            tipo = self.anotacoes.tipos[no] = self.tipo_operacao_binaria(no, tipos.pop(), tipo_dir)
+            tipos.append(tipo)
+        else:  # Operação unária
+            tipo = self.anotacoes.tipos[no] = self.tipo_operacao_unaria(no, tipos.pop())
+            tipos.append(tipo)
+    
+    def passo_desconhecido(self, no, feitos, simbolo, pilha, tipos):
+        self.erro(f"Tipo de expressão desconhecido: {type(no)}")
+        tipos.append(None)
+    
+    def analisar_identificador(self, no):
+        """Analisa o uso de uma variável e retorna seu tipo (None se o uso for inválido)"""
+        simbolo = self.tabela_simbolos.buscar_simbolo(self.chave(no))
+        if not simbolo:
+            self.erro(f"Variável '{no.nome}' não declarada")
+            return None
         
-        if isinstance(no, NoNumero):
-            # Determina o tipo do número
-            if '.' in str(no.valor):
+        if simbolo.categoria == 'funcao':
+            self.erro(f"'{no.nome}' é uma função, não uma variável")
+            return None
+        
+        self.anotacoes.simbolos[no] = simbolo
+        return simbolo.tipo
+    
+    def tipo_operacao_binaria(self, no, tipo_esq, tipo_dir):
+        """Verifica uma operação binária e retorna o tipo do resultado (None se desconhecido)"""
+        # Operando com erro já reportado: não gera erros em cascata
+        if tipo_esq is None or tipo_dir is None:
+            return None
+        
+        # Verifica se os tipos são compatíveis para a operação
+        if no.operador in ['+', '-', '*', '/']:
+            if tipo_esq not in ['int', 'float'] or tipo_dir not in ['int', 'float']:
+                self.erro(f"Operação aritmética inválida entre '{tipo_esq}' e '{tipo_dir}'")
+                return None
+            
+            # Retorna o tipo mais "forte" (float > int)
+            if tipo_esq == 'float' or tipo_dir == 'float':
                 return 'float'
             else:
                 return 'int'
         
-        elif isinstance(no, NoIdentificador):
-            simbolo = self.tabela_simbolos.buscar_simbolo(no.nome)
-            if not simbolo:
-                self.erro(f"Variável '{no.nome}' não declarada")
-            
-            if simbolo.categoria == 'funcao':
-                self.erro(f"'{no.nome}' é uma função, não uma variável")
-            
-            return simbolo.tipo
-        
-        elif isinstance(no, NoChamadaFuncao):
-            return self.analisar_chamada_funcao(no)
-        
-        elif isinstance(no, NoExpressao):
-            if no.direita:  # Operação binária
-                tipo_esq = self.analisar_expressao(no.esquerda)
-                tipo_dir = self.analisar_expressao(no.direita)
-                
-                # Verifica se os tipos são compatíveis para a operação
-                if no.operador in ['+', '-', '*', '/']:
-                    if tipo_esq not in ['int', 'float'] or tipo_dir not in ['int', 'float']:
-                        self.erro(f"Operação aritmética inválida entre '{tipo_esq}' e '{tipo_dir}'")
-                    
-                    # Retorna o tipo mais "forte" (float > int)
-                    if tipo_esq == 'float' or tipo_dir == 'float':
-                        return 'float'
-                    else:
-                        return 'int'
-                
-                else:
-                    self.erro(f"Operador desconhecido: {no.operador}")
-            
-            else:  # Operação unária
-                tipo_expr = self.analisar_expressao(no.esquerda)
-                
-                if no.operador in ['+', '-']:
-                    if tipo_expr not in ['int', 'float']:
-                        self.erro(f"Operação unária inválida com tipo '{tipo_expr}'")
-                    return tipo_expr
-                else:
-                    self.erro(f"Operador unário desconhecido: {no.operador}")
-        
         else:
-            self.erro(f"Tipo de expressão desconhecido: {type(no)}")
+            self.erro(f"Operador desconhecido: {no.operador}")
+            return None
+    
+    def tipo_operacao_unaria(self, no, tipo_expr):
+        """Verifica uma operação unária e retorna o tipo do resultado (None se desconhecido)"""
+        if tipo_expr is None:
+            return None
+        if no.operador in ['+', '-']:
+            if tipo_expr not in ['int', 'float']:
+                self.erro(f"Operação unária inválida com tipo '{tipo_expr}'")
+                return None
+            return tipo_expr
+        else:
+            self.erro(f"Operador unário desconhecido: {no.operador}")
+            return None
     
     def analisar_chamada_funcao(self, no):
-        """Analisa uma chamada de função"""
-        simbolo = self.tabela_simbolos.buscar_simbolo(no.nome)
+        """Verifica a função chamada e o número de argumentos; retorna o símbolo da função (ou None)"""
+        simbolo = self.tabela_simbolos.buscar_simbolo(self.chave(no))
         if not simbolo:
             self.erro(f"Função '{no.nome}' não declarada")
+            return None
         
         if simbolo.categoria != 'funcao':
             self.erro(f"'{no.nome}' não é uma função")
+            return None
+        
+        self.anotacoes.simbolos[no] = simbolo
         
         # Verifica número de argumentos
         if len(no.argumentos) != len(simbolo.parametros):
             self.erro(f"Função '{no.nome}' espera {len(simbolo.parametros)} argumentos, "
                      f"mas {len(no.argumentos)} foram fornecidos")
         
-        # Verifica tipos dos argumentos
-        for i, (arg, tipo_esperado) in enumerate(zip(no.argumentos, simbolo.parametros)):
-            tipo_arg = self.analisar_expressao(arg)
-            if not self.tipos_compativeis(tipo_esperado, tipo_arg):
-                self.erro(f"Argumento {i+1} da função '{no.nome}': "
-                         f"esperado '{tipo_esperado}', encontrado '{tipo_arg}'")
-        
-        return simbolo.tipo
+        return simbolo
+    
+    def analisar_argumento(self, no, simbolo, i, tipo_arg):
+        """Verifica o tipo do i-ésimo argumento de uma chamada"""
+        if simbolo is None or i >= len(simbolo.parametros):
+            return  # função inválida ou argumento a mais, já reportados
+        tipo_esperado = simbolo.parametros[i]
+        if not self.tipos_compativeis(tipo_esperado, tipo_arg):
+            self.erro(f"Argumento {i+1} da função '{no.nome}': "
+                     f"esperado '{tipo_esperado}', encontrado '{tipo_arg}'")
     
     def tipos_compativeis(self, tipo1, tipo2):
-        """Verifica se dois tipos são compatíveis"""
+        """Verifica se dois tipos são compatíveis (None é um tipo desconhecido, com erro já reportado)"""
+        if tipo1 is None or tipo2 is None:
+            return True
         # Por enquanto, apenas tipos exatamente iguais são compatíveis
         # Pode ser expandido para permitir conversões implícitas
         return tipo1 == tipo2
@@ -354,9 +492,10 @@ class AnalisadorSemantico:
     def imprimir_tabela_simbolos(self):
         """Imprime a tabela de símbolos para debug"""
         print("\n=== TABELA DE SÍMBOLOS ===")
-        for i, escopo in enumerate(self.tabela_simbolos.pilha_escopos):
-            print(f"Escopo {i}:")
-            for nome, simbolo in escopo.items():
-                print(f"  {nome}: {simbolo.tipo} ({simbolo.categoria})")
+        tabela = self.tabela_simbolos
+        for i, numero in enumerate(tabela.escopos):
+            print(f"Escopo {numero}:")
+            for simbolo in tabela.simbolos_escopo(i).values():
+                print(f"  {simbolo.nome}: {simbolo.tipo} ({simbolo.categoria})")
                 if simbolo.parametros:
                     print(f"    Parâmetros: {simbolo.parametros}")
\ No newline at end of file
@@ -1,33 +1,87 @@
+from array import array
+
+from analisador_lexico import (BufferTokens, JanelaTokens, TabelaNomes, TIPOS_TOKEN, T_EOF, T_NUMERO, T_ID,
+                               T_OPERADOR_SOMA, T_OPERADOR_SUB, T_OPERADOR_MUL, T_OPERADOR_DIV, T_OPERADOR_ATRIB,
+                               T_DELIM_AP, T_DELIM_FP, T_DELIM_AC, T_DELIM_FC, T_VIRGULA,
+                               T_PONTO_VIRGULA, T_SE, T_SENAO, T_ENQUANTO, T_PARA,
+                               T_TIPO_INT, T_TIPO_FLOAT, T_RETORNO)
+
+# Operadores binários: código do token -> (precedência, símbolo no nó).
+# Maior precedência liga mais forte; todos são associativos à esquerda.
+# Um novo operador (ex.: comparações) só precisa de uma entrada aqui.
+OPERADORES_BINARIOS = {
+    T_OPERADOR_SOMA: (10, '+'),
+    T_OPERADOR_SUB: (10, '-'),
+    T_OPERADOR_MUL: (20, '*'),
+    T_OPERADOR_DIV: (20, '/'),
+}
+
 class No:
     """Classe base para nós da árvore sintática"""
-    pass
+    __slots__ = ()
 
 class NoPrograma(No):
-    def __init__(self, funcoes):
+    __slots__ = ('funcoes', 'nomes')
+    
+    def __init__(self, funcoes, nomes=None):
         self.funcoes = funcoes
+        self.nomes = nomes  # TabelaNomes com os ids usados pelos nós
     
     def __str__(self):
         return f"Programa({len(self.funcoes)} funções)"
 
 class NoFuncao(No):
-    def __init__(self, tipo_retorno, nome, parametros, corpo):
+    __slots__ = ('tipo_retorno', 'nome', 'parametros', 'corpo', 'id_nome')
+    
+    def __init__(self, tipo_retorno, nome, parametros, corpo, id_nome=None):
         self.tipo_retorno = tipo_retorno
         self.nome = nome
         self.parametros = parametros
         self.corpo = corpo
+        self.id_nome = id_nome
     
     def __str__(self):
         return f"Função({self.tipo_retorno} {self.nome})"
 
+class NoFuncaoAdiada(NoFuncao):
+    """NoFuncao do modo esqueleto: o corpo (tokens inicio_corpo..fim_corpo) só é analisado no primeiro acesso"""
+    __slots__ = ('analisador', 'inicio_corpo', 'fim_corpo', 'corpo_analisado')
+    
+    def __init__(self, tipo_retorno, nome, parametros, analisador, inicio_corpo, fim_corpo, id_nome=None):
+        self.tipo_retorno = tipo_retorno
+        self.nome = nome
+        self.parametros = parametros
+        self.id_nome = id_nome
+        self.analisador = analisador
+        self.inicio_corpo = inicio_corpo
+        self.fim_corpo = fim_corpo
+        self.corpo_analisado = None
+    
+    @property
+    def corpo(self):
+        if self.corpo_analisado is None:
+            self.corpo_analisado = self.analisador.analisar_corpo(self.inicio_corpo)
+        return self.corpo_analisado
+    
+    @corpo.setter
+    def corpo(self, corpo):
+        # Passos que trocam o corpo (funcao.corpo = ...) funcionam como em NoFuncao
+        self.corpo_analisado = corpo
+
 class NoParametro(No):
-    def __init__(self, tipo, nome):
+    __slots__ = ('tipo', 'nome', 'id_nome')
+    
+    def __init__(self, tipo, nome, id_nome=None):
         self.tipo = tipo
         self.nome = nome
+        self.id_nome = id_nome
     
     def __str__(self):
         return f"Parâmetro({self.tipo} {self.nome})"
 
 class NoBloco(No):
+    __slots__ = ('comandos',)
+    
     def __init__(self, comandos):
         self.comandos = comandos
     
@@ -35,23 +89,31 @@ class NoBloco(No):
         return f"Bloco({len(self.comandos)} comandos)"
 
 class NoDeclaracao(No):
-    def __init__(self, tipo, nome, valor=None):
+    __slots__ = ('tipo', 'nome', 'valor', 'id_nome')
+    
+    def __init__(self, tipo, nome, valor=None, id_nome=None):
         self.tipo = tipo
         self.nome = nome
         self.valor = valor
+        self.id_nome = id_nome
     
     def __str__(self):
         return f"Declaração({self.tipo} {self.nome})"
 
 class NoAtribuicao(No):
-    def __init__(self, nome, valor):
+    __slots__ = ('nome', 'valor', 'id_nome')
+    
+    def __init__(self, nome, valor, id_nome=None):
         self.nome = nome
         self.valor = valor
+        self.id_nome = id_nome
     
     def __str__(self):
         return f"Atribuição({self.nome} = ...)"
 
 class NoRetorno(No):
+    __slots__ = ('valor',)
+    
     def __init__(self, valor):
         self.valor = valor
     
@@ -59,6 +121,8 @@ class NoRetorno(No):
         return "Retorno(...)"
 
 class NoSe(No):
+    __slots__ = ('condicao', 'bloco_se', 'bloco_senao')
+    
     def __init__(self, condicao, bloco_se, bloco_senao=None):
         self.condicao = condicao
         self.bloco_se = bloco_se
@@ -68,6 +132,8 @@ class NoSe(No):
         return "Se(...)"
 
 class NoEnquanto(No):
+    __slots__ = ('condicao', 'bloco')
+    
     def __init__(self, condicao, bloco):
         self.condicao = condicao
         self.bloco = bloco
@@ -76,6 +142,8 @@ class NoEnquanto(No):
         return "Enquanto(...)"
 
 class NoPara(No):
+    __slots__ = ('inicializacao', 'condicao', 'incremento', 'bloco')
+    
     def __init__(self, inicializacao, condicao, incremento, bloco):
         self.inicializacao = inicializacao
         self.condicao = condicao
@@ -86,6 +154,8 @@ class NoPara(No):
         return "Para(...)"
 
 class NoExpressao(No):
+    __slots__ = ('operador', 'esquerda', 'direita')
+    
     def __init__(self, operador, esquerda, direita=None):
         self.operador = operador
         self.esquerda = esquerda
@@ -97,6 +167,8 @@ class NoExpressao(No):
         return f"Expressão({self.operador} {self.esquerda})"
 
 class NoNumero(No):
+    __slots__ = ('valor',)
+    
     def __init__(self, valor):
         self.valor = valor
     
@@ -104,20 +176,190 @@ class NoNumero(No):
         return f"Número({self.valor})"
 
 class NoIdentificador(No):
-    def __init__(self, nome):
+    __slots__ = ('nome', 'id_nome')
+    
+    def __init__(self, nome, id_nome=None):
         self.nome = nome
+        self.id_nome = id_nome
     
     def __str__(self):
         return f"ID({self.nome})"
 
 class NoChamadaFuncao(No):
-    def __init__(self, nome, argumentos):
+    __slots__ = ('nome', 'argumentos', 'id_nome')
+    
+    def __init__(self, nome, argumentos, id_nome=None):
         self.nome = nome
         self.argumentos = argumentos
+        self.id_nome = id_nome
     
     def __str__(self):
         return f"Chamada({self.nome})"
 
+def construir_no(classe, *valores):
+    """Construtor de nós do modo objeto: uma instância da classe"""
+    return classe(*valores)
+
+# Campos de cada classe de nó no modo arena, na ordem do construtor:
+# 'no' (índice de outro nó, -1 = None), 'lista' (nós em sequência em
+# ArenaArvore.listas), 'texto' (string internada), 'id' (id do nome),
+# 'nome' (não guardado: vem do id) e 'tabela' (a TabelaNomes da arena)
+CAMPOS_ARENA = {
+    NoPrograma: (('funcoes', 'lista'), ('nomes', 'tabela')),
+    NoFuncao: (('tipo_retorno', 'texto'), ('nome', 'nome'), ('parametros', 'lista'),
+               ('corpo', 'no'), ('id_nome', 'id')),
+    NoParametro: (('tipo', 'texto'), ('nome', 'nome'), ('id_nome', 'id')),
+    NoBloco: (('comandos', 'lista'),),
+    NoDeclaracao: (('tipo', 'texto'), ('nome', 'nome'), ('valor', 'no'), ('id_nome', 'id')),
+    NoAtribuicao: (('nome', 'nome'), ('valor', 'no'), ('id_nome', 'id')),
+    NoRetorno: (('valor', 'no'),),
+    NoSe: (('condicao', 'no'), ('bloco_se', 'no'), ('bloco_senao', 'no')),
+    NoEnquanto: (('condicao', 'no'), ('bloco', 'no')),
+    NoPara: (('inicializacao', 'no'), ('condicao', 'no'), ('incremento', 'no'), ('bloco', 'no')),
+    NoExpressao: (('operador', 'texto'), ('esquerda', 'no'), ('direita', 'no')),
+    NoNumero: (('valor', 'texto'),),
+    NoIdentificador: (('nome', 'nome'), ('id_nome', 'id')),
+    NoChamadaFuncao: (('nome', 'nome'), ('argumentos', 'lista'), ('id_nome', 'id')),
+}
+CLASSES_ARENA = tuple(CAMPOS_ARENA)
+CODIGOS_ARENA = {classe: codigo for codigo, classe in enumerate(CLASSES_ARENA)}
+
+class ArenaArvore:
+    """
+    Árvore sintática em arrays paralelos: o nó i é da classe
+    CLASSES_ARENA[tipos[i]] e guarda seus campos inteiros em campos[k][i].
+    Nós se referem uns aos outros por índice, e as fases seguintes os
+    percorrem por visões (subclasses das classes de nó) criadas sob demanda.
+    """
+    LARGURA = 4  # máximo de campos guardados por nó (NoFuncao e NoPara)
+    
+    def __init__(self, nomes):
+        self.nomes = nomes
+        self.tipos = array('B')
+        self.campos = [array('i') for _ in range(self.LARGURA)]
+        self.listas = array('i')  # cada lista: tamanho seguido dos índices
+        self.textos = []
+        self.ids_texto = {}
+    
+    def __len__(self):
+        return len(self.tipos)
+    
+    def adicionar(self, classe, *valores):
+        """Acrescenta um nó (mesmos argumentos do construtor da classe) e retorna seu índice"""
+        indice = len(self.tipos)
+        self.tipos.append(CODIGOS_ARENA[classe])
+        
+        guardados = []
+        for (_, tipo), valor in zip(CAMPOS_ARENA[classe], valores + (None,) * 4):
+            if tipo == 'no' or tipo == 'id':
+                guardados.append(-1 if valor is None else valor)
+            elif tipo == 'lista':
+                guardados.append(len(self.listas))
+                self.listas.append(len(valor))
+                self.listas.extend(valor)
+            elif tipo == 'texto':
+                id_texto = self.ids_texto.get(valor)
+                if id_texto is None:
+                    id_texto = self.ids_texto[valor] = len(self.textos)
+                    self.textos.append(valor)
+                guardados.append(id_texto)
+        
+        guardados += [-1] * (self.LARGURA - len(guardados))
+        for campo, valor in zip(self.campos, guardados):
+            campo.append(valor)
+        return indice
+    
+    def no(self, indice):
+        """Visão do nó de índice dado (None para -1)"""
+        if indice < 0:
+            return None
+        return VISOES_ARENA[self.tipos[indice]](self, indice)
+    
+    def lista(self, inicio):
+        """Índices dos nós da lista que começa em inicio"""
+        return self.listas[inicio + 1:inicio + 1 + self.listas[inicio]]
+
+class VisaoNo:
+    """Base das visões sobre a arena: um nó é o par (arena, índice)"""
+    __slots__ = ()
+    
+    def __init__(self, arena, indice):
+        self.arena = arena
+        self.indice = indice
+    
+    def __eq__(self, outro):
+        return isinstance(outro, VisaoNo) and self.arena is outro.arena and self.indice == outro.indice
+    
+    def __hash__(self):
+        return self.indice
+
+def criar_visao(classe):
+    """Subclasse de classe cujos atributos são propriedades lidas da arena"""
+    guardados = [(campo, tipo) for campo, tipo in CAMPOS_ARENA[classe] if tipo not in ('nome', 'tabela')]
+    k_id = [tipo for _, tipo in guardados].index('id') if ('id_nome', 'id') in guardados else None
+    
+    atributos = {'__slots__': ('arena', 'indice')}
+    for k, (campo, tipo) in enumerate(guardados):
+        atributos[campo] = property(ler_campo(tipo, k))
+    for campo, tipo in CAMPOS_ARENA[classe]:
+        if tipo == 'nome':
+            atributos[campo] = property(ler_campo('nome', k_id))
+        elif tipo == 'tabela':
+            atributos[campo] = property(lambda self: self.arena.nomes)
+    return type(classe.__name__ + 'Arena', (VisaoNo, classe), atributos)
+
+def ler_campo(tipo, k):
+    """Leitor do k-ésimo campo guardado de um nó da arena"""
+    if tipo == 'no':
+        return lambda self: self.arena.no(self.arena.campos[k][self.indice])
+    if tipo == 'lista':
+        return lambda self: [self.arena.no(i) for i in self.arena.lista(self.arena.campos[k][self.indice])]
+    if tipo == 'texto':
+        return lambda self: self.arena.textos[self.arena.campos[k][self.indice]]
+    if tipo == 'nome':
+        return lambda self: self.arena.nomes.nomes[self.arena.campos[k][self.indice]]
+    return lambda self: None if self.arena.campos[k][self.indice] < 0 else self.arena.campos[k][self.indice]
+
+VISOES_ARENA = tuple(criar_visao(classe) for classe in CLASSES_ARENA)
+
+class TabelaDespacho(dict):
+    """
+    Classe do nó -> função do visitante. Uma classe sem entrada própria
+    (visão da arena, NoFuncaoAdiada, ...) herda a da classe mais próxima na
+    MRO, resolvida na primeira consulta e guardada na tabela
+    """
+    __slots__ = ('metodos',)
+    
+    def __init__(self, metodos):
+        super().__init__()
+        self.metodos = metodos
+    
+    def __missing__(self, classe):
+        for base in classe.__mro__:
+            if base in self.metodos:
+                funcao = self[classe] = self.metodos[base]
+                return funcao
+        raise TypeError(f"Nenhum método para nós da classe {classe.__name__}")
+
+class Visitante:
+    """
+    Base dos percursos da árvore com despacho pela classe do nó. Cada
+    subclasse declara em DESPACHO as suas tabelas, {nome: {classe: nome do
+    método}}; elas são montadas uma vez, na criação da subclasse, e ficam em
+    despacho_<nome>. Despachar custa uma consulta a dicionário por nó:
+    self.despacho_comando[type(no)](self, no)
+    """
+    DESPACHO = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for nome, metodos in cls.DESPACHO.items():
+            tabela = TabelaDespacho({classe: getattr(cls, metodo) for classe, metodo in metodos.items()})
+            for classe in CLASSES_ARENA + VISOES_ARENA + (NoFuncaoAdiada,):
+                if any(base in tabela.metodos for base in classe.__mro__):
+                    tabela[classe]
+            setattr(cls, 'despacho_' + nome, tabela)
+
 class ErroSintatico(Exception):
     def __init__(self, mensagem, token=None):
         self.mensagem = mensagem
@@ -125,85 +367,278 @@ class ErroSintatico(Exception):
         super().__init__(mensagem)
 
 class AnalisadorSintatico:
-    def __init__(self, tokens):
+    LOOKAHEAD = 1  # tokens além do atual que a gramática precisa espiar
+    
+    def __init__(self, tokens, nomes=None, iterativo=False, arena=False, esqueleto=False):
         self.tokens = tokens
+        # Os ids de Token avulsos só valem com a tabela que os gerou
+        self.confiar_ids = nomes is not None
         self.posicao = 0
-        self.token_atual = self.tokens[0] if tokens else None
+        self.erros = []  # mensagens de todos os erros sintáticos encontrados
+        
+        # O parser decide tudo pelos códigos inteiros dos tokens, e os nós
+        # recebem o nome internado e o id dele na tabela de nomes
+        if isinstance(tokens, BufferTokens):
+            self.codigos = tokens.codigos
+            self.ids_nome = tokens.ids_nome
+            self.nomes = tokens.nomes
+            self.codigo_atual = self.codigos[0] if tokens else None
+        elif isinstance(tokens, (list, tuple)):
+            self.codigos = array('B', [token.codigo for token in tokens])
+            self.nomes = nomes if nomes is not None else TabelaNomes()
+            self.ids_nome = array('i', [
+                self.id_do_token(token) if codigo == T_ID else -1
+                for token, codigo in zip(tokens, self.codigos)
+            ])
+            self.codigo_atual = self.codigos[0] if tokens else None
+        else:
+            # Qualquer outro iterável (ex.: tokenizar_stream) é lido por uma
+            # JanelaTokens com LOOKAHEAD tokens à frente, sem materializar a lista
+            self.tokens = JanelaTokens(tokens, self.LOOKAHEAD)
+            self.nomes = nomes if nomes is not None else TabelaNomes()
+            self.avancar = self.avancar_janela
+            self.espiar = self.espiar_janela
+            self.consumir_nome = self.consumir_nome_janela
+            primeiro = self.tokens.peek()
+            self.codigo_atual = primeiro.codigo if primeiro is not None else T_EOF
+        
+        # Modo esqueleto: funcao() guarda a assinatura e pula o corpo casando
+        # chaves; o corpo é analisado quando alguém acessar NoFuncao.corpo
+        self.esqueleto = esqueleto
+        self.codigos_bytes = None
+        if esqueleto and (arena or isinstance(self.tokens, JanelaTokens)):
+            raise ValueError("O modo esqueleto precisa de tokens com acesso aleatório (BufferTokens, lista "
+                             "ou tupla) e não combina com o modo arena")
+        
+        # Modo arena: os nós vão para arrays paralelos e o resultado é uma visão
+        self.arena = ArenaArvore(self.nomes) if arena else None
+        self.novo_no = self.arena.adicionar if arena else construir_no
+        
+        # Modo iterativo: blocos e expressões com pilhas explícitas, então a
+        # profundidade de aninhamento não depende da pilha do interpretador
+        self.iterativo = iterativo
+        if iterativo:
+            self.bloco = self.bloco_iterativo
+            self.expressao = self.expressao_iterativa
+
+    @property
+    def token_atual(self):
+        return self.tokens[self.posicao] if self.tokens else None
     
     def erro(self, mensagem):
-        if self.token_atual:
+        token_atual = self.token_atual
+        if token_atual:
             raise ErroSintatico(
-                f"Erro sintático na linha {self.token_atual.linha}, coluna {self.token_atual.coluna}: {mensagem}. "
-                f"Token encontrado: {self.token_atual.tipo} '{self.token_atual.valor}'",
-                self.token_atual
+                f"Erro sintático na linha {token_atual.linha}, coluna {token_atual.coluna}: {mensagem}. "
+                f"Token encontrado: {token_atual.tipo} '{token_atual.valor}'",
+                token_atual
             )
         else:
             raise ErroSintatico(f"Erro sintático: {mensagem}")
     
     def avancar(self):
         """Avança para o próximo token"""
-        if self.posicao < len(self.tokens) - 1:
+        if self.posicao < len(self.codigos) - 1:
             self.posicao += 1
-            self.token_atual = self.tokens[self.posicao]
-        return self.token_atual
+            self.codigo_atual = self.codigos[self.posicao]
+    
+    def espiar(self, k=1):
+        """Código do token k posições à frente, sem consumir (T_EOF além do fim)"""
+        posicao = self.posicao + k
+        return self.codigos[posicao] if posicao < len(self.codigos) else T_EOF
     
     def consumir(self, tipo_esperado):
         """Consome um token do tipo esperado"""
-        if self.token_atual.tipo != tipo_esperado:
-            self.erro(f"Esperado '{tipo_esperado}', encontrado '{self.token_atual.tipo}'")
+        if self.codigo_atual != tipo_esperado:
+            self.erro(f"Esperado '{TIPOS_TOKEN[tipo_esperado]}', encontrado '{TIPOS_TOKEN[self.codigo_atual]}'")
         
-        token = self.token_atual
+        token = self.tokens[self.posicao]
         self.avancar()
         return token
     
+    def consumir_nome(self):
+        """Consome um ID e retorna (nome internado, id do nome)"""
+        if self.codigo_atual != T_ID:
+            self.erro(f"Esperado 'ID', encontrado '{TIPOS_TOKEN[self.codigo_atual]}'")
+        
+        id_nome = self.ids_nome[self.posicao]
+        self.avancar()
+        return self.nomes.nomes[id_nome], id_nome
+    
+    def id_do_token(self, token):
+        """Id do nome de um token ID na tabela do parser"""
+        if self.confiar_ids and token.id_nome is not None:
+            return token.id_nome
+        return self.nomes.internar(token.valor)
+    
+    def avancar_janela(self):
+        """avancar() sobre a JanelaTokens: após o fim ela repete o último token"""
+        self.posicao += 1
+        self.codigo_atual = self.tokens.avancar().codigo
+    
+    def espiar_janela(self, k=1):
+        """espiar() sobre a JanelaTokens (k até LOOKAHEAD)"""
+        return self.tokens.peek(k).codigo
+    
+    def consumir_nome_janela(self):
+        """consumir_nome() sobre a JanelaTokens"""
+        if self.codigo_atual != T_ID:
+            self.erro(f"Esperado 'ID', encontrado '{TIPOS_TOKEN[self.codigo_atual]}'")
+        
+        id_nome = self.id_do_token(self.tokens.peek())
+        self.avancar()
+        return self.nomes.nomes[id_nome], id_nome
+    
     def verificar(self, tipo):
-        """Verifica se o token atual é do tipo especificado"""
-        return self.token_atual.tipo == tipo
+        """Verifica se o token atual é do tipo especificado (código inteiro)"""
+        return self.codigo_atual == tipo
     
     def analisar(self):
-        """Ponto de entrada da análise sintática"""
+        """Ponto de entrada da análise sintática (reporta todos os erros, e não só o primeiro)"""
         try:
             programa = self.programa()
-            if not self.verificar('EOF'):
+            if not self.verificar(T_EOF):
                 self.erro("Código após o fim do programa")
-            return programa
         except ErroSintatico as e:
-            print(f"ERRO SINTÁTICO: {e.mensagem}")
+            self.registrar_erro(e)
+        
+        if self.erros:
+            for mensagem in self.erros:
+                print(f"ERRO SINTÁTICO: {mensagem}")
             return None
+        if self.arena is not None:
+            return self.arena.no(programa)
+        return programa
+    
+    def registrar_erro(self, erro):
+        """Guarda o erro para o relatório final; a análise continua após sincronizar"""
+        self.erros.append(erro.mensagem)
+    
+    def sincronizar(self):
+        """
+        Recuperação em modo pânico dentro de um bloco: descarta o comando com
+        erro até depois do ';' ou do bloco '{...}' (e de um else) que o
+        encerram, ou até antes do '}' que fecha o bloco atual
+        """
+        profundidade = 0
+        while self.codigo_atual != T_EOF:
+            codigo = self.codigo_atual
+            if codigo == T_DELIM_FC:
+                if profundidade == 0:
+                    return
+                profundidade -= 1
+                if profundidade == 0:
+                    self.avancar()
+                    if self.codigo_atual != T_SENAO:
+                        return
+                    continue
+            elif codigo == T_DELIM_AC:
+                profundidade += 1
+            elif codigo == T_PONTO_VIRGULA and profundidade == 0:
+                self.avancar()
+                return
+            self.avancar()
+    
+    def sincronizar_funcao(self):
+        """Recuperação de erro fora dos blocos: descarta o resto da função, até o '}' do corpo"""
+        while self.codigo_atual not in (T_EOF, T_DELIM_AC, T_DELIM_FC):
+            self.avancar()
+        if self.codigo_atual == T_DELIM_FC:
+            self.avancar()  # '}' sobrando fora de qualquer função
+        else:
+            self.sincronizar()
     
     def programa(self):
         """programa -> funcao+"""
         funcoes = []
         
-        while not self.verificar('EOF'):
-            funcao = self.funcao()
-            funcoes.append(funcao)
+        while not self.verificar(T_EOF):
+            try:
+                funcoes.append(self.funcao())
+            except ErroSintatico as e:
+                self.registrar_erro(e)
+                self.sincronizar_funcao()
         
-        return NoPrograma(funcoes)
+        return self.novo_no(NoPrograma, funcoes, self.nomes)
     
     def funcao(self):
         """funcao -> tipo ID '(' parametros? ')' bloco"""
         tipo_retorno = self.tipo()
-        nome = self.consumir('ID')
+        nome, id_nome = self.consumir_nome()
         
-        self.consumir('DELIM_AP')  # '('
+        self.consumir(T_DELIM_AP)  # '('
         
         parametros = []
-        if not self.verificar('DELIM_FP'):  # se não é ')'
+        if not self.verificar(T_DELIM_FP):  # se não é ')'
             parametros = self.parametros()
         
-        self.consumir('DELIM_FP')  # ')'
+        self.consumir(T_DELIM_FP)  # ')'
+        
+        if self.esqueleto:
+            inicio, fim = self.pular_bloco()
+            return NoFuncaoAdiada(tipo_retorno.valor, nome, parametros, self, inicio, fim, id_nome)
+        
         corpo = self.bloco()
         
-        return NoFuncao(tipo_retorno.valor, nome.valor, parametros, corpo)
+        return self.novo_no(NoFuncao, tipo_retorno.valor, nome, parametros, corpo, id_nome)
+    
+    def pular_bloco(self):
+        """
+        Pula um bloco '{' ... '}' sem analisá-lo, casando as chaves com
+        buscas nos bytes dos códigos; retorna as posições das duas chaves
+        """
+        if self.codigo_atual != T_DELIM_AC:
+            self.consumir(T_DELIM_AC)
+        if self.codigos_bytes is None:
+            self.codigos_bytes = self.codigos.tobytes()
+        codigos = self.codigos_bytes
+        abre, fecha = bytes([T_DELIM_AC]), bytes([T_DELIM_FC])
+        
+        inicio = self.posicao
+        proxima_abre = codigos.find(abre, inicio + 1)
+        profundidade = 1
+        i = inicio + 1
+        while profundidade:
+            proxima_fecha = codigos.find(fecha, i)
+            if proxima_fecha < 0:
+                # Sem '}' correspondente: o erro aponta o EOF, como em bloco()
+                self.posicao = len(self.codigos) - 1
+                self.codigo_atual = self.codigos[self.posicao]
+                self.consumir(T_DELIM_FC)
+            if 0 <= proxima_abre < proxima_fecha:
+                profundidade += 1
+                i = proxima_abre + 1
+                proxima_abre = codigos.find(abre, i)
+            else:
+                profundidade -= 1
+                i = proxima_fecha + 1
+        
+        self.posicao = i - 1
+        self.codigo_atual = T_DELIM_FC
+        self.avancar()
+        return inicio, i - 1
+    
+    def analisar_corpo(self, inicio):
+        """Analisa o bloco que começa no token inicio (corpo adiado pelo modo esqueleto)"""
+        posicao, codigo_atual = self.posicao, self.codigo_atual
+        erros = len(self.erros)
+        self.posicao = inicio
+        self.codigo_atual = self.codigos[inicio]
+        try:
+            corpo = self.bloco()
+        finally:
+            self.posicao, self.codigo_atual = posicao, codigo_atual
+        if len(self.erros) > erros:
+            raise ErroSintatico(self.erros[erros])
+        return corpo
     
     def parametros(self):
         """parametros -> parametro (',' parametro)*"""
         params = []
         params.append(self.parametro())
         
-        while self.verificar('VIRGULA'):
-            self.consumir('VIRGULA')
+        while self.verificar(T_VIRGULA):
+            self.consumir(T_VIRGULA)
             params.append(self.parametro())
         
         return params
@@ -211,313 +646,462 @@ class AnalisadorSintatico:
     def parametro(self):
         """parametro -> tipo ID"""
         tipo = self.tipo()
-        nome = self.consumir('ID')
-        return NoParametro(tipo.valor, nome.valor)
+        nome, id_nome = self.consumir_nome()
+        return self.novo_no(NoParametro, tipo.valor, nome, id_nome)
     
     def tipo(self):
         """tipo -> 'int' | 'float'"""
-        if self.verificar('TIPO_INT'):
-            return self.consumir('TIPO_INT')
-        elif self.verificar('TIPO_FLOAT'):
-            return self.consumir('TIPO_FLOAT')
+        if self.verificar(T_TIPO_INT):
+            return self.consumir(T_TIPO_INT)
+        elif self.verificar(T_TIPO_FLOAT):
+            return self.consumir(T_TIPO_FLOAT)
         else:
             self.erro("Esperado tipo (int ou float)")
     
     def bloco(self):
         """bloco -> '{' comando* '}'"""
-        self.consumir('DELIM_AC')  # '{'
+        self.consumir(T_DELIM_AC)  # '{'
         
         comandos = []
-        while not self.verificar('DELIM_FC'):  # enquanto não é '}'
-            comando = self.comando()
-            comandos.append(comando)
+        while not self.verificar(T_DELIM_FC):  # enquanto não é '}'
+            if self.verificar(T_EOF):
+                break  # consumir abaixo reporta o '}' que falta
+            try:
+                comandos.append(self.comando())
+            except ErroSintatico as e:
+                if self.verificar(T_EOF):
+                    raise  # '}' faltando: um só erro, reportado por programa
+                self.registrar_erro(e)
+                self.sincronizar()
         
-        self.consumir('DELIM_FC')  # '}'
-        return NoBloco(comandos)
+        self.consumir(T_DELIM_FC)  # '}'
+        return self.novo_no(NoBloco, comandos)
+    
+    def bloco_iterativo(self):
+        """
+        bloco sem recursão: cada bloco aberto por if/while/for vira uma
+        entrada (comandos, ao_fechar) na pilha, e ao_fechar recebe o NoBloco
+        quando o '}' correspondente é consumido
+        """
+        self.consumir(T_DELIM_AC)  # '{'
+        pilha = [([], None)]
+        
+        while True:
+            comandos, ao_fechar = pilha[-1]
+            codigo = self.codigo_atual
+            
+            if codigo == T_EOF:
+                self.consumir(T_DELIM_FC)  # '}' faltando
+            
+            try:
+                if codigo == T_DELIM_FC:
+                    self.avancar()
+                    pilha.pop()
+                    if ao_fechar is None:
+                        return self.novo_no(NoBloco, comandos)
+                    ao_fechar(self.novo_no(NoBloco, comandos))
+                    continue
+                
+                if codigo == T_SE:
+                    condicao = self.cabecalho_se()
+                    ao_fechar = self.fechar_se(pilha, comandos, condicao)
+                elif codigo == T_ENQUANTO:
+                    condicao = self.cabecalho_enquanto()
+                    ao_fechar = lambda bloco, destino=comandos, condicao=condicao: \
+                        destino.append(self.novo_no(NoEnquanto, condicao, bloco))
+                elif codigo == T_PARA:
+                    cabecalho = self.cabecalho_para()
+                    ao_fechar = lambda bloco, destino=comandos, cabecalho=cabecalho: \
+                        destino.append(self.novo_no(NoPara, *cabecalho, bloco))
+                else:
+                    comandos.append(self.comando())
+                    continue
+                
+                self.consumir(T_DELIM_AC)
+                pilha.append(([], ao_fechar))
+            except ErroSintatico as e:
+                self.registrar_erro(e)
+                self.sincronizar()
+    
+    def fechar_se(self, pilha, destino, condicao):
+        """Retorna o ao_fechar do bloco do if, que abre o bloco do else se houver"""
+        def fechar(bloco_se):
+            if self.verificar(T_SENAO):
+                self.consumir(T_SENAO)
+                self.consumir(T_DELIM_AC)
+                pilha.append(([], lambda bloco_senao: destino.append(self.novo_no(NoSe, condicao, bloco_se, bloco_senao))))
+            else:
+                destino.append(self.novo_no(NoSe, condicao, bloco_se, None))
+        return fechar
     
     def comando(self):
         """
         comando -> declaracao ';' 
-                | atribuicao ';'
+                | atribuicao ';'   (ID '=' decide pela espiada de 1 token)
                 | retorno ';'
                 | se
                 | enquanto
                 | para
                 | expressao ';'
         """
-        if self.verificar('TIPO_INT') or self.verificar('TIPO_FLOAT'):
+        if self.verificar(T_TIPO_INT) or self.verificar(T_TIPO_FLOAT):
             cmd = self.declaracao()
-            self.consumir('PONTO_VIRGULA')
+            self.consumir(T_PONTO_VIRGULA)
             return cmd
-        elif self.verificar('RETORNO'):
+        elif self.verificar(T_RETORNO):
             cmd = self.retorno()
-            self.consumir('PONTO_VIRGULA')
+            self.consumir(T_PONTO_VIRGULA)
             return cmd
-        elif self.verificar('SE'):
+        elif self.verificar(T_SE):
             return self.se()
-        elif self.verificar('ENQUANTO'):
+        elif self.verificar(T_ENQUANTO):
             return self.enquanto()
-        elif self.verificar('PARA'):
+        elif self.verificar(T_PARA):
             return self.para()
-        elif self.verificar('ID'):
-            # Pode ser atribuição ou expressão
-            # Salvamos a posição para backtrack se necessário
-            pos_atual = self.posicao
-            try:
-                # Tenta analisar como atribuição
-                nome = self.consumir('ID')
-                if self.verificar('OPERADOR_ATRIB'):
-                    self.consumir('OPERADOR_ATRIB')
-                    valor = self.expressao()
-                    self.consumir('PONTO_VIRGULA')
-                    return NoAtribuicao(nome.valor, valor)
-                else:
-                    # Volta e trata como expressão
-                    self.posicao = pos_atual
-                    self.token_atual = self.tokens[self.posicao]
-                    expr = self.expressao()
-                    self.consumir('PONTO_VIRGULA')
-                    return expr
-            except:
-                # Se der erro, volta e tenta como expressão
-                self.posicao = pos_atual
-                self.token_atual = self.tokens[self.posicao]
-                expr = self.expressao()
-                self.consumir('PONTO_VIRGULA')
-                return expr
+        elif self.verificar(T_ID) and self.espiar() == T_OPERADOR_ATRIB:
+            # ID seguido de '=' é atribuição; qualquer outro ID inicia expressão
+            cmd = self.atribuicao()
+            self.consumir(T_PONTO_VIRGULA)
+            return cmd
         else:
             # Tenta como expressão
             expr = self.expressao()
-            self.consumir('PONTO_VIRGULA')
+            self.consumir(T_PONTO_VIRGULA)
             return expr
     
     def declaracao(self):
         """declaracao -> tipo ID ('=' expressao)?"""
         tipo = self.tipo()
-        nome = self.consumir('ID')
+        nome, id_nome = self.consumir_nome()
         
         valor = None
-        if self.verificar('OPERADOR_ATRIB'):
-            self.consumir('OPERADOR_ATRIB')
+        if self.verificar(T_OPERADOR_ATRIB):
+            self.consumir(T_OPERADOR_ATRIB)
             valor = self.expressao()
         
-        return NoDeclaracao(tipo.valor, nome.valor, valor)
+        return self.novo_no(NoDeclaracao, tipo.valor, nome, valor, id_nome)
+    
+    def atribuicao(self):
+        """atribuicao -> ID '=' expressao"""
+        nome, id_nome = self.consumir_nome()
+        self.consumir(T_OPERADOR_ATRIB)
+        valor = self.expressao()
+        return self.novo_no(NoAtribuicao, nome, valor, id_nome)
     
     def retorno(self):
         """retorno -> 'return' expressao"""
-        self.consumir('RETORNO')
+        self.consumir(T_RETORNO)
         valor = self.expressao()
-        return NoRetorno(valor)
+        return self.novo_no(NoRetorno, valor)
     
     def se(self):
         """se -> 'if' '(' expressao ')' bloco ('else' bloco)?"""
-        self.consumir('SE')
-        self.consumir('DELIM_AP')
-        condicao = self.expressao()
-        self.consumir('DELIM_FP')
+        condicao = self.cabecalho_se()
         bloco_se = self.bloco()
         
         bloco_senao = None
-        if self.verificar('SENAO'):
-            self.consumir('SENAO')
+        if self.verificar(T_SENAO):
+            self.consumir(T_SENAO)
             bloco_senao = self.bloco()
         
-        return NoSe(condicao, bloco_se, bloco_senao)
+        return self.novo_no(NoSe, condicao, bloco_se, bloco_senao)
+    
+    def cabecalho_se(self):
+        """'if' '(' expressao ')' -> condição"""
+        self.consumir(T_SE)
+        self.consumir(T_DELIM_AP)
+        condicao = self.expressao()
+        self.consumir(T_DELIM_FP)
+        return condicao
     
     def enquanto(self):
         """enquanto -> 'while' '(' expressao ')' bloco"""
-        self.consumir('ENQUANTO')
-        self.consumir('DELIM_AP')
-        condicao = self.expressao()
-        self.consumir('DELIM_FP')
+        condicao = self.cabecalho_enquanto()
         bloco = self.bloco()
         
-        return NoEnquanto(condicao, bloco)
+        return self.novo_no(NoEnquanto, condicao, bloco)
+    
+    def cabecalho_enquanto(self):
+        """'while' '(' expressao ')' -> condição"""
+        self.consumir(T_ENQUANTO)
+        self.consumir(T_DELIM_AP)
+        condicao = self.expressao()
+        self.consumir(T_DELIM_FP)
+        return condicao
     
     def para(self):
         """para -> 'for' '(' comando expressao ';' expressao ')' bloco"""
-        self.consumir('PARA')
-        self.consumir('DELIM_AP')
+        inicializacao, condicao, incremento = self.cabecalho_para()
+        bloco = self.bloco()
+        
+        return self.novo_no(NoPara, inicializacao, condicao, incremento, bloco)
+    
+    def cabecalho_para(self):
+        """'for' '(' comando expressao ';' expressao ')' -> (inicialização, condição, incremento)"""
+        self.consumir(T_PARA)
+        self.consumir(T_DELIM_AP)
         
         # Inicialização (pode ser declaração ou atribuição)
-        if self.verificar('TIPO_INT') or self.verificar('TIPO_FLOAT'):
+        if self.verificar(T_TIPO_INT) or self.verificar(T_TIPO_FLOAT):
             inicializacao = self.declaracao()
         else:
-            nome = self.consumir('ID')
-            self.consumir('OPERADOR_ATRIB')
-            valor = self.expressao()
-            inicializacao = NoAtribuicao(nome.valor, valor)
+            inicializacao = self.atribuicao()
         
-        self.consumir('PONTO_VIRGULA')
+        self.consumir(T_PONTO_VIRGULA)
         condicao = self.expressao()
-        self.consumir('PONTO_VIRGULA')
+        self.consumir(T_PONTO_VIRGULA)
         incremento = self.expressao()
-        self.consumir('DELIM_FP')
-        bloco = self.bloco()
-        
-        return NoPara(inicializacao, condicao, incremento, bloco)
+        self.consumir(T_DELIM_FP)
+        return inicializacao, condicao, incremento
     
-    def expressao(self):
-        """expressao -> termo (('+' | '-') termo)*"""
-        no = self.termo()
-        
-        while self.verificar('OPERADOR_SOMA') or self.verificar('OPERADOR_SUB'):
-            operador = self.token_atual.valor
-            self.avancar()
-            direita = self.termo()
-            no = NoExpressao(operador, no, direita)
-        
-        return no
+    def expressao(self, precedencia_minima=0):
+        """expressao -> fator (op_binario fator)*, agrupada por OPERADORES_BINARIOS"""
+        return self.expressao_binaria(self.fator(), precedencia_minima)
     
-    def termo(self):
-        """termo -> fator ('*' fator)*"""
-        no = self.fator()
-        
-        while self.verificar('OPERADOR_MUL'):
-            operador = self.token_atual.valor
+    def expressao_binaria(self, esquerda, precedencia_minima):
+        """
+        Precedence climbing: só recursa quando o próximo operador liga mais
+        forte que o atual, então cadeias do mesmo nível não aprofundam a pilha
+        """
+        operador = OPERADORES_BINARIOS.get(self.codigo_atual)
+        while operador is not None and operador[0] >= precedencia_minima:
+            precedencia, simbolo = operador
             self.avancar()
             direita = self.fator()
-            no = NoExpressao(operador, no, direita)
+            
+            proximo = OPERADORES_BINARIOS.get(self.codigo_atual)
+            while proximo is not None and proximo[0] > precedencia:
+                direita = self.expressao_binaria(direita, proximo[0])
+                proximo = OPERADORES_BINARIOS.get(self.codigo_atual)
+            
+            esquerda = self.novo_no(NoExpressao, simbolo, esquerda, direita)
+            operador = proximo
         
-        return no
+        return esquerda
+    
+    def expressao_iterativa(self):
+        """
+        Mesma gramática de expressao(), sem recursão (shunting-yard): os
+        operadores pendentes ficam em uma pilha, junto com marcadores de
+        '(' (None) e de chamadas abertas ([nome, id_nome, argumentos])
+        """
+        operandos = []
+        pilha = []
+        
+        while True:
+            # Espera um operando
+            codigo = self.codigo_atual
+            if codigo == T_NUMERO:
+                operandos.append(self.novo_no(NoNumero, self.consumir(T_NUMERO).valor))
+            elif codigo == T_ID and self.espiar() == T_DELIM_AP:
+                nome, id_nome = self.consumir_nome()
+                self.avancar()  # '('
+                if self.codigo_atual != T_DELIM_FP:
+                    pilha.append([nome, id_nome, []])
+                    continue
+                self.avancar()  # ')'
+                operandos.append(self.novo_no(NoChamadaFuncao, nome, [], id_nome))
+            elif codigo == T_ID:
+                operandos.append(self.novo_no(NoIdentificador, *self.consumir_nome()))
+            elif codigo == T_DELIM_AP:
+                self.avancar()
+                pilha.append(None)
+                continue
+            else:
+                self.erro("Esperado número, identificador ou '('")
+            
+            # Espera um operador, ou o fechamento de '(' / chamada
+            while True:
+                operador = OPERADORES_BINARIOS.get(self.codigo_atual)
+                if operador is not None:
+                    self.reduzir(operandos, pilha, operador[0])
+                    pilha.append(operador)
+                    self.avancar()
+                    break
+                
+                self.reduzir(operandos, pilha, 0)
+                if not pilha:
+                    return operandos.pop()
+                
+                aberto = pilha[-1]
+                if aberto is not None and self.codigo_atual == T_VIRGULA:
+                    aberto[2].append(operandos.pop())
+                    self.avancar()
+                    break
+                
+                self.consumir(T_DELIM_FP)
+                pilha.pop()
+                if aberto is not None:
+                    nome, id_nome, argumentos = aberto
+                    argumentos.append(operandos.pop())
+                    operandos.append(self.novo_no(NoChamadaFuncao, nome, argumentos, id_nome))
+    
+    def reduzir(self, operandos, pilha, precedencia_minima):
+        """Monta os nós dos operadores pendentes que ligam com pelo menos precedencia_minima"""
+        while pilha and type(pilha[-1]) is tuple and pilha[-1][0] >= precedencia_minima:
+            direita = operandos.pop()
+            operandos[-1] = self.novo_no(NoExpressao, pilha.pop()[1], operandos[-1], direita)
     
     def fator(self):
         """fator -> NUMERO | chamada_funcao | ID | '(' expressao ')'"""
-        if self.verificar('NUMERO'):
-            token = self.consumir('NUMERO')
-            return NoNumero(token.valor)
-        elif self.verificar('ID'):
+        if self.verificar(T_NUMERO):
+            token = self.consumir(T_NUMERO)
+            return self.novo_no(NoNumero, token.valor)
+        elif self.verificar(T_ID):
             # Verifica se é uma chamada de função (ID seguido de '(')
-            if self.posicao + 1 < len(self.tokens) and self.tokens[self.posicao + 1].tipo == 'DELIM_AP':
+            if self.espiar() == T_DELIM_AP:
                 return self.chamada_funcao()
             else:
-                token = self.consumir('ID')
-                return NoIdentificador(token.valor)
-        elif self.verificar('DELIM_AP'):
-            self.consumir('DELIM_AP')
+                nome, id_nome = self.consumir_nome()
+                return self.novo_no(NoIdentificador, nome, id_nome)
+        elif self.verificar(T_DELIM_AP):
+            self.consumir(T_DELIM_AP)
             no = self.expressao()
-            self.consumir('DELIM_FP')
+            self.consumir(T_DELIM_FP)
             return no
         else:
             self.erro("Esperado número, identificador ou '('")
     
     def chamada_funcao(self):
         """chamada_funcao -> ID '(' argumentos? ')'"""
-        nome = self.consumir('ID')
-        self.consumir('DELIM_AP')
+        nome, id_nome = self.consumir_nome()
+        self.consumir(T_DELIM_AP)
         
         argumentos = []
-        if not self.verificar('DELIM_FP'):  # se não é ')'
+        if not self.verificar(T_DELIM_FP):  # se não é ')'
             argumentos = self.argumentos()
         
-        self.consumir('DELIM_FP')
-        return NoChamadaFuncao(nome.valor, argumentos)
+        self.consumir(T_DELIM_FP)
+        return self.novo_no(NoChamadaFuncao, nome, argumentos, id_nome)
     
     def argumentos(self):
         """argumentos -> expressao (',' expressao)*"""
         args = []
         args.append(self.expressao())
         
-        while self.verificar('VIRGULA'):
-            self.consumir('VIRGULA')
+        while self.verificar(T_VIRGULA):
+            self.consumir(T_VIRGULA)
             args.append(self.expressao())
         
         return args
 
-def imprimir_arvore(no, nivel=0):
-    """Função auxiliar para imprimir a árvore sintática"""
-    indentacao = "  " * nivel
+class ImpressoraArvore(Visitante):
+    """Imprime a árvore sintática: cada método imprime a linha do nó e retorna os filhos a visitar"""
+    DESPACHO = {
+        'no': {
+            NoPrograma: 'imprimir_programa',
+            NoFuncao: 'imprimir_funcao',
+            NoParametro: 'imprimir_parametro',
+            NoBloco: 'imprimir_bloco',
+            NoDeclaracao: 'imprimir_declaracao',
+            NoAtribuicao: 'imprimir_atribuicao',
+            NoRetorno: 'imprimir_retorno',
+            NoSe: 'imprimir_se',
+            NoEnquanto: 'imprimir_enquanto',
+            NoPara: 'imprimir_para',
+            NoExpressao: 'imprimir_expressao',
+            NoNumero: 'imprimir_numero',
+            NoIdentificador: 'imprimir_identificador',
+            NoChamadaFuncao: 'imprimir_chamada_funcao',
+            object: 'imprimir_outro',
+        },
+    }
     
-    if isinstance(no, NoPrograma):
+    def imprimir(self, no, nivel=0):
+        """Percorre a árvore com pilha explícita, sem recursão"""
+        # Itens da pilha: (nó, nível) a visitar, ou (linha, None) já formatada
+        despacho = self.despacho_no
+        pilha = [(no, nivel)]
+        
+        while pilha:
+            no, nivel = pilha.pop()
+            if nivel is None:
+                print(no)
+                continue
+            
+            filhos = despacho[type(no)](self, no, "  " * nivel, nivel)  # visitados na ordem da lista
+            if filhos:
+                pilha.extend(reversed(filhos))
+    
+    def imprimir_programa(self, no, indentacao, nivel):
         print(f"{indentacao}PROGRAMA")
-        for funcao in no.funcoes:
-            imprimir_arvore(funcao, nivel + 1)
+        return [(funcao, nivel + 1) for funcao in no.funcoes]
     
-    elif isinstance(no, NoFuncao):
+    def imprimir_funcao(self, no, indentacao, nivel):
         print(f"{indentacao}FUNÇÃO: {no.tipo_retorno} {no.nome}")
+        filhos = []
         if no.parametros:
-            print(f"{indentacao}  PARÂMETROS:")
-            for param in no.parametros:
-                imprimir_arvore(param, nivel + 2)
-        print(f"{indentacao}  CORPO:")
-        imprimir_arvore(no.corpo, nivel + 2)
+            filhos.append((f"{indentacao}  PARÂMETROS:", None))
+            filhos.extend((param, nivel + 2) for param in no.parametros)
+        filhos.append((f"{indentacao}  CORPO:", None))
+        filhos.append((no.corpo, nivel + 2))
+        return filhos
     
-    elif isinstance(no, NoParametro):
+    def imprimir_parametro(self, no, indentacao, nivel):
         print(f"{indentacao}PARÂMETRO: {no.tipo} {no.nome}")
     
-    elif isinstance(no, NoBloco):
+    def imprimir_bloco(self, no, indentacao, nivel):
         print(f"{indentacao}BLOCO")
-        for comando in no.comandos:
-            imprimir_arvore(comando, nivel + 1)
+        return [(comando, nivel + 1) for comando in no.comandos]
     
-    elif isinstance(no, NoDeclaracao):
+    def imprimir_declaracao(self, no, indentacao, nivel):
         if no.valor:
             print(f"{indentacao}DECLARAÇÃO: {no.tipo} {no.nome} =")
-            imprimir_arvore(no.valor, nivel + 1)
-        else:
-            print(f"{indentacao}DECLARAÇÃO: {no.tipo} {no.nome}")
+            return [(no.valor, nivel + 1)]
+        print(f"{indentacao}DECLARAÇÃO: {no.tipo} {no.nome}")
     
-    elif isinstance(no, NoAtribuicao):
+    def imprimir_atribuicao(self, no, indentacao, nivel):
         print(f"{indentacao}ATRIBUIÇÃO: {no.nome} =")
-        imprimir_arvore(no.valor, nivel + 1)
+        return [(no.valor, nivel + 1)]
     
-    elif isinstance(no, NoRetorno):
+    def imprimir_retorno(self, no, indentacao, nivel):
         print(f"{indentacao}RETORNO")
-        imprimir_arvore(no.valor, nivel + 1)
+        return [(no.valor, nivel + 1)]
     
-    elif isinstance(no, NoSe):
+    def imprimir_se(self, no, indentacao, nivel):
         print(f"{indentacao}SE")
-        print(f"{indentacao}  CONDIÇÃO:")
-        imprimir_arvore(no.condicao, nivel + 2)
-        print(f"{indentacao}  ENTÃO:")
-        imprimir_arvore(no.bloco_se, nivel + 2)
+        filhos = [(f"{indentacao}  CONDIÇÃO:", None), (no.condicao, nivel + 2),
+                  (f"{indentacao}  ENTÃO:", None), (no.bloco_se, nivel + 2)]
         if no.bloco_senao:
-            print(f"{indentacao}  SENÃO:")
-            imprimir_arvore(no.bloco_senao, nivel + 2)
+            filhos += [(f"{indentacao}  SENÃO:", None), (no.bloco_senao, nivel + 2)]
+        return filhos
     
-    elif isinstance(no, NoEnquanto):
+    def imprimir_enquanto(self, no, indentacao, nivel):
         print(f"{indentacao}ENQUANTO")
-        print(f"{indentacao}  CONDIÇÃO:")
-        imprimir_arvore(no.condicao, nivel + 2)
-        print(f"{indentacao}  CORPO:")
-        imprimir_arvore(no.bloco, nivel + 2)
+        return [(f"{indentacao}  CONDIÇÃO:", None), (no.condicao, nivel + 2),
+                (f"{indentacao}  CORPO:", None), (no.bloco, nivel + 2)]
     
-    elif isinstance(no, NoPara):
+    def imprimir_para(self, no, indentacao, nivel):
         print(f"{indentacao}PARA")
-        print(f"{indentacao}  INICIALIZAÇÃO:")
-        imprimir_arvore(no.inicializacao, nivel + 2)
-        print(f"{indentacao}  CONDIÇÃO:")
-        imprimir_arvore(no.condicao, nivel + 2)
-        print(f"{indentacao}  INCREMENTO:")
-        imprimir_arvore(no.incremento, nivel + 2)
-        print(f"{indentacao}  CORPO:")
-        imprimir_arvore(no.bloco, nivel + 2)
-    
-    elif isinstance(no, NoExpressao):
+        return [(f"{indentacao}  INICIALIZAÇÃO:", None), (no.inicializacao, nivel + 2),
+                (f"{indentacao}  CONDIÇÃO:", None), (no.condicao, nivel + 2),
+                (f"{indentacao}  INCREMENTO:", None), (no.incremento, nivel + 2),
+                (f"{indentacao}  CORPO:", None), (no.bloco, nivel + 2)]
+    
+    def imprimir_expressao(self, no, indentacao, nivel):
+        print(f"{indentacao}EXPRESSÃO: {no.operador}")
         if no.direita:
-            print(f"{indentacao}EXPRESSÃO: {no.operador}")
-            imprimir_arvore(no.esquerda, nivel + 1)
-            imprimir_arvore(no.direita, nivel + 1)
-        else:
-            print(f"{indentacao}EXPRESSÃO: {no.operador}")
-            imprimir_arvore(no.esquerda, nivel + 1)
+            return [(no.esquerda, nivel + 1), (no.direita, nivel + 1)]
+        return [(no.esquerda, nivel + 1)]
     
-    elif isinstance(no, NoNumero):
+    def imprimir_numero(self, no, indentacao, nivel):
         print(f"{indentacao}NÚMERO: {no.valor}")
     
-    elif isinstance(no, NoIdentificador):
+    def imprimir_identificador(self, no, indentacao, nivel):
         print(f"{indentacao}ID: {no.nome}")
     
-    elif isinstance(no, NoChamadaFuncao):
+    def imprimir_chamada_funcao(self, no, indentacao, nivel):
         print(f"{indentacao}CHAMADA: {no.nome}")
         if no.argumentos:
-            print(f"{indentacao}  ARGUMENTOS:")
-            for arg in no.argumentos:
-                imprimir_arvore(arg, nivel + 2)
+            return [(f"{indentacao}  ARGUMENTOS:", None)] + [(arg, nivel + 2) for arg in no.argumentos]
     
-    else:
+    def imprimir_outro(self, no, indentacao, nivel):
         print(f"{indentacao}{str(no)}")
 
+def imprimir_arvore(no, nivel=0):
+    """Função auxiliar para imprimir a árvore sintática (pilha explícita, sem recursão)"""
+    ImpressoraArvore().imprimir(no, nivel)
+
 if __name__ == '__main__':
     from analisador_lexico import AnalisadorLexico
     
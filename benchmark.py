@@ -0,0 +1,471 @@
+"""
+Benchmarks do compilador.
+
+Uso: python benchmark.py [nome ...]
+Sem argumentos, roda todos os benchmarks registrados em BENCHMARKS.
+"""
+import contextlib
+import gc
+import io
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico, imprimir_arvore
+from analisador_preditivo import AnalisadorPreditivo
+from analisador_semantico import AnalisadorSemantico
+from gerador_codigo import GeradorCodigo
+from gerador_registradores import GeradorRegistradores
+from codigo_intermediario import EmissorNASM
+from otimizador import OtimizadorConstantes
+
+MODELO_FUNCAO = """
+// Função gerada número {n}
+int funcao_{n}(int a, int b) {{
+    int resultado = a * {n} + b;
+    float taxa = 3.25;
+    /* comentário de bloco
+       com mais de uma linha */
+    while (a) {{
+        resultado = resultado + (a - 1) * b;
+        a = a - 1;
+    }}
+    if (b) {{
+        resultado = resultado / 2;
+    }} else {{
+        resultado = funcao_{n}(b, a) + 1;
+    }}
+    return resultado;
+}}
+"""
+
+MODELO_ATRIBUICOES = """
+int funcao_{n}(int a, int b) {{
+    int x = a;
+    int y = b;
+    x = x + y * {n};
+    y = x - a;
+    a = (x + y) * b;
+    b = a - {n};
+    x = funcao_{n}(y, a);
+    funcao_{n}(x, y + {n});
+    y = y + x;
+    y * (x - {n});
+    return x;
+}}
+"""
+
+MODELO_CONSTANTES = """
+int funcao_{n}(int a) {{
+    int largura = 8;
+    int altura = largura * 2 + {n};
+    int area = largura * altura;
+    float escala = 1.5 * 2;
+    if (a) {{
+        area = area + a;
+    }}
+    while (a) {{
+        a = a - 1;
+        altura = altura + largura / 2;
+    }}
+    return area / 4 + altura - largura;
+}}
+"""
+
+MODELO_CHAMADAS = """
+int fatorial_{n}(int n) {{
+    if (n) {{
+        return n * fatorial_{n}(n - 1);
+    }}
+    return 1;
+}}
+int combina_{n}(int a, int b, int c) {{
+    return fatorial_{n}(a) + combina_{n}(b, fatorial_{n}(c), a - 1) / 2;
+}}
+"""
+
+# Blocos irmãos e laços com variáveis próprias: escopos disjuntos no mesmo quadro
+MODELO_QUADROS = """
+int quadro_{n}(int a, int b) {{
+    int total = 0;
+    if (a) {{
+        int x = a * 2;
+        int y = x + b;
+        total = x + y;
+    }} else {{
+        int z = b * 3;
+        float w = 1.5;
+        total = z;
+    }}
+    for (int i = 0; i; i - 1) {{
+        int passo = i + a;
+        total = total + passo;
+    }}
+    while (b) {{
+        int resto = b - 1;
+        b = resto;
+        total = total + quadro_{n}(resto, a) * 2;
+    }}
+    return total;
+}}
+"""
+
+def gerar_expressao(operandos):
+    """Cadeia longa de operandos misturando os níveis de precedência"""
+    operadores = ('+', '*', '-', '*', '+')
+    partes = ['a']
+    for i in range(1, operandos):
+        partes.append(operadores[i % len(operadores)])
+        partes.append('(b - 1)' if i % 7 == 0 else ('b' if i % 2 else str(i)))
+    return ' '.join(partes)
+
+def gerar_fonte(funcoes=2000):
+    """Gera um código fonte grande com a sintaxe suportada pelo compilador"""
+    return ''.join(MODELO_FUNCAO.format(n=n) for n in range(funcoes))
+
+def medir(funcao, *args, repeticoes=5):
+    """Retorna o menor tempo (em segundos) de repeticoes execuções"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def imprimir_linha(nome, segundos, referencia=None, unidades=None):
+    linha = f"  {nome:<32} {segundos * 1000:10.1f} ms"
+    if unidades:
+        linha += f" {unidades / segundos / 1e6:8.2f} M/s"
+    if referencia:
+        linha += f"   {referencia / segundos:5.2f}x"
+    print(linha)
+
+def bench_motores():
+    """Motor de varredura: regex com alternação x tabela de transição"""
+    fonte = gerar_fonte()
+    print(f"Fonte: {len(fonte)} caracteres (vazão em M caracteres/s)")
+
+    referencia = None
+    for motor in AnalisadorLexico.MOTORES:
+        analisador = AnalisadorLexico(motor)
+        for metodo in ('tokenizar', 'tokenizar_buffer'):
+            segundos = medir(getattr(analisador, metodo), fonte)
+            referencia = referencia or segundos
+            imprimir_linha(f"{motor}.{metodo}", segundos, referencia, len(fonte))
+
+def bench_paralelo():
+    """Tokenização paralela: escala com o número de processos"""
+    fonte = gerar_fonte(8000)
+    analisador = AnalisadorLexico()
+    nucleos = os.cpu_count() or 1
+    print(f"Fonte: {len(fonte)} caracteres, {nucleos} núcleo(s) disponível(is)")
+
+    referencia = medir(analisador.tokenizar_buffer, fonte, repeticoes=3)
+    imprimir_linha("serial (tokenizar_buffer)", referencia, referencia, len(fonte))
+    processos = 1
+    while processos <= max(nucleos, 2):
+        segundos = medir(analisador.tokenizar_paralelo, fonte, processos, 0, repeticoes=3)
+        imprimir_linha(f"paralelo, {processos} processo(s)", segundos, referencia, len(fonte))
+        processos *= 2
+
+def bench_atribuicoes():
+    """Análise sintática de código dominado por atribuições"""
+    fonte = ''.join(MODELO_ATRIBUICOES.format(n=n) for n in range(4000))
+    analisador = AnalisadorLexico()
+    tokens = analisador.tokenizar_buffer(fonte)
+    print(f"Fonte: {len(tokens)} tokens (vazão em M tokens/s)")
+
+    segundos = medir(lambda: AnalisadorSintatico(tokens).analisar())
+    imprimir_linha("AnalisadorSintatico.analisar", segundos, unidades=len(tokens))
+
+def bench_expressoes():
+    """Análise sintática de cadeias longas de operandos"""
+    corpo = ''.join(f"    a = {gerar_expressao(200)};\n" for _ in range(50))
+    fonte = ''.join(f"int funcao_{n}(int a, int b) {{\n{corpo}    return a;\n}}\n" for n in range(10))
+    tokens = AnalisadorLexico().tokenizar_buffer(fonte)
+    print(f"Fonte: {len(tokens)} tokens (vazão em M tokens/s)")
+
+    segundos = medir(lambda: AnalisadorSintatico(tokens).analisar())
+    imprimir_linha("AnalisadorSintatico.analisar", segundos, unidades=len(tokens))
+
+def bench_aninhamento():
+    """Parser recursivo x iterativo, em código normal e em parênteses aninhados"""
+    casos = [
+        ("fonte gerada", gerar_fonte()),
+        ("300 parênteses", f"int main() {{ return {'(' * 300}1{')' * 300}; }}"),
+        ("50000 parênteses", f"int main() {{ return {'(' * 50000}1{')' * 50000}; }}"),
+    ]
+    for descricao, fonte in casos:
+        tokens = AnalisadorLexico().tokenizar_buffer(fonte)
+        referencia = None
+        for iterativo in (False, True):
+            nome = f"{descricao}, {'iterativo' if iterativo else 'recursivo'}"
+            try:
+                segundos = medir(lambda: AnalisadorSintatico(tokens, iterativo=iterativo).programa())
+            except RecursionError:
+                print(f"  {nome:<32}  RecursionError")
+                continue
+            referencia = referencia or segundos
+            imprimir_linha(nome, segundos, referencia, len(tokens))
+
+def medir_memoria(funcao, *args, pico=False):
+    """Retorna (resultado, bytes alocados e ainda vivos após a chamada, ou o pico durante ela)"""
+    gc.collect()
+    tracemalloc.start()
+    resultado = funcao(*args)
+    gc.collect()
+    vivos, maximo = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, maximo if pico else vivos
+
+def bench_memoria():
+    """Memória da árvore sintática e percurso das fases seguintes: objetos x arena"""
+    fonte = gerar_fonte() + "int main() { return funcao_1(1, 2); }"
+    tokens = AnalisadorLexico().tokenizar_buffer(fonte)
+    print(f"Fonte: {len(tokens)} tokens")
+
+    def fases(arvore):
+        semantico = AnalisadorSemantico()
+        with contextlib.redirect_stdout(io.StringIO()):
+            semantico.analisar(arvore)
+        GeradorCodigo().gerar(arvore, semantico.anotacoes)
+
+    referencia = None
+    for arena in (False, True):
+        modo = 'arena' if arena else 'objetos'
+        arvore, alocados = medir_memoria(lambda: AnalisadorSintatico(tokens, arena=arena).analisar())
+        print(f"  árvore ({modo}): {alocados / 1e6:.1f} MB, {alocados / len(tokens):.1f} bytes/token")
+        segundos = medir(fases, arvore, repeticoes=3)
+        referencia = referencia or segundos
+        imprimir_linha(f"semântica + código ({modo})", segundos, referencia)
+
+def bench_janela():
+    """Léxico + sintático: lista completa de tokens x stream com lookahead limitado"""
+    fonte = gerar_fonte()
+    print(f"Fonte: {len(fonte)} caracteres (pico de memória inclui a árvore)")
+
+    def com_lista():
+        return AnalisadorSintatico(AnalisadorLexico().tokenizar(fonte)).analisar()
+
+    def com_buffer():
+        return AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+
+    def com_janela():
+        analisador = AnalisadorLexico()
+        tokens = analisador.tokenizar_stream(io.StringIO(fonte))
+        return AnalisadorSintatico(tokens, nomes=analisador.nomes).analisar()
+
+    for nome, funcao in (("tokenizar (lista)", com_lista), ("tokenizar_buffer", com_buffer),
+                         ("tokenizar_stream (janela)", com_janela)):
+        _, maximo = medir_memoria(funcao, pico=True)
+        segundos = medir(funcao, repeticoes=3)
+        print(f"  {nome:<32} {segundos * 1000:10.1f} ms   pico {maximo / 1e6:6.1f} MB")
+
+def bench_esqueleto():
+    """Listar assinaturas: análise completa x modo esqueleto (corpos adiados)"""
+    fonte = gerar_fonte()
+    tokens = AnalisadorLexico().tokenizar_buffer(fonte)
+    print(f"Fonte: {len(tokens)} tokens (vazão em M tokens/s)")
+
+    def assinaturas(esqueleto):
+        arvore = AnalisadorSintatico(tokens, esqueleto=esqueleto).analisar()
+        return [(funcao.tipo_retorno, funcao.nome, [p.tipo for p in funcao.parametros])
+                for funcao in arvore.funcoes]
+
+    referencia = None
+    for esqueleto in (False, True):
+        segundos = medir(assinaturas, esqueleto)
+        referencia = referencia or segundos
+        imprimir_linha("esqueleto" if esqueleto else "análise completa", segundos, referencia, len(tokens))
+
+def bench_preditivo():
+    """Parser descendente recursivo escrito à mão x LL(1) dirigido por tabela"""
+    fonte = gerar_fonte()
+    tokens = AnalisadorLexico().tokenizar_buffer(fonte)
+    print(f"Fonte: {len(tokens)} tokens (vazão em M tokens/s)")
+
+    referencia = None
+    for nome, classe in (("AnalisadorSintatico", AnalisadorSintatico), ("AnalisadorPreditivo", AnalisadorPreditivo)):
+        segundos = medir(lambda: classe(tokens).analisar())
+        referencia = referencia or segundos
+        imprimir_linha(nome, segundos, referencia, len(tokens))
+
+def bench_visitante():
+    """Percursos de uma árvore grande: impressão, semântica e geração de código"""
+    fonte = gerar_fonte(4000) + "int main() { return funcao_1(1, 2); }"
+    tokens = AnalisadorLexico().tokenizar_buffer(fonte)
+    arvore = AnalisadorSintatico(tokens).analisar()
+    print(f"Fonte: {len(tokens)} tokens")
+
+    def imprimir():
+        with contextlib.redirect_stdout(io.StringIO()):
+            imprimir_arvore(arvore)
+
+    def semantica():
+        semantico = AnalisadorSemantico()
+        with contextlib.redirect_stdout(io.StringIO()):
+            semantico.analisar(arvore)
+        return semantico.anotacoes
+
+    anotacoes = semantica()
+    for nome, funcao in (("imprimir_arvore", imprimir), ("AnalisadorSemantico", semantica),
+                         ("GeradorCodigo", lambda: GeradorCodigo().gerar(arvore, anotacoes))):
+        imprimir_linha(nome, medir(funcao, repeticoes=3), unidades=len(tokens))
+
+def bench_escopos():
+    """Análise semântica com uso de variáveis externas dentro de blocos profundamente aninhados"""
+    profundidade = 100
+    corpo = "    x = x + a * b - x;\n" * 20
+    for nivel in range(profundidade):
+        corpo = f"    if (a) {{\n    int v{nivel} = {nivel};\n{corpo}    }}\n"
+    fonte = ''.join(f"int funcao_{n}(int a, int b) {{\n    int x = b;\n{corpo}    return x;\n}}\n" for n in range(20))
+    fonte += "int main() { return funcao_1(1, 2); }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    print(f"20 funções com {profundidade} níveis de aninhamento e 100 usos de nomes externos no mais interno")
+
+    def semantica():
+        with contextlib.redirect_stdout(io.StringIO()):
+            AnalisadorSemantico().analisar(arvore)
+
+    imprimir_linha("AnalisadorSemantico", medir(semantica))
+
+def contar_instrucoes(codigo):
+    """Instruções do assembly gerado (linhas indentadas que não são comentário)"""
+    return sum(1 for linha in codigo.split('\n') if linha.startswith('    ') and not linha.lstrip().startswith(';'))
+
+def bench_constantes():
+    """Dobramento e propagação de constantes: instruções geradas e custo do passo"""
+    fonte = ''.join(MODELO_CONSTANTES.format(n=n) for n in range(2000))
+    fonte += "int main() { return funcao_1(1); }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+
+    def compilar(otimizar):
+        semantico = AnalisadorSemantico()
+        with contextlib.redirect_stdout(io.StringIO()):
+            semantico.analisar(arvore)
+        if otimizar:
+            OtimizadorConstantes(semantico.anotacoes).otimizar(arvore)
+        return GeradorCodigo().gerar(arvore, semantico.anotacoes)
+
+    referencia = None
+    for otimizar in (False, True):
+        instrucoes = contar_instrucoes(compilar(otimizar))
+        referencia = referencia or instrucoes
+        segundos = medir(compilar, otimizar, repeticoes=3)
+        nome = "com OtimizadorConstantes" if otimizar else "sem otimização"
+        print(f"  {nome:<32} {segundos * 1000:10.1f} ms   {instrucoes:8d} instruções ({instrucoes / referencia:.0%})")
+
+def contar_acessos_memoria(codigo):
+    """Instruções que leem ou escrevem memória: operando [...] (menos lea), push e pop"""
+    total = 0
+    for linha in codigo.split('\n'):
+        instrucao = linha.lstrip()
+        if instrucao.startswith(('push ', 'pop ')) or ('[' in instrucao and not instrucao.startswith('lea ')):
+            total += 1
+    return total
+
+def bench_registradores():
+    """Backend de pilha vs. código intermediário (temporários na pilha e em registradores): instruções, acessos à memória e tempo"""
+    fonte = gerar_fonte(2000) + "int main() { return funcao_1(1, 2); }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        semantico.analisar(arvore)
+
+    for gerador in (GeradorCodigo, EmissorNASM, GeradorRegistradores):
+        codigo = gerador().gerar(arvore, semantico.anotacoes)
+        segundos = medir(lambda: gerador().gerar(arvore, semantico.anotacoes), repeticoes=3)
+        print(f"  {gerador.__name__:<32} {segundos * 1000:10.1f} ms   {contar_instrucoes(codigo):8d} instruções"
+              f"   {contar_acessos_memoria(codigo):8d} acessos à memória")
+
+def bench_peephole():
+    """Otimizador peephole no backend de pilha: instruções, tempo e aplicações de cada regra"""
+    fonte = gerar_fonte(2000) + "int main() { return funcao_1(1, 2); }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        semantico.analisar(arvore)
+
+    referencia = None
+    for peephole in (False, True):
+        gerador = GeradorCodigo(peephole=peephole)
+        instrucoes = contar_instrucoes(gerador.gerar(arvore, semantico.anotacoes))
+        referencia = referencia or instrucoes
+        segundos = medir(lambda: GeradorCodigo(peephole=peephole).gerar(arvore, semantico.anotacoes), repeticoes=3)
+        nome = "com peephole" if peephole else "sem peephole"
+        print(f"  {nome:<32} {segundos * 1000:10.1f} ms   {instrucoes:8d} instruções ({instrucoes / referencia:.0%})")
+    for regra, aplicacoes in gerador.peephole.contadores.items():
+        print(f"    {regra:<30} {aplicacoes:8d}")
+
+def bench_chamadas():
+    """Salvamento de registradores em chamadas no backend de pilha: instruções e push/pop por chamada"""
+    fonte = ''.join(MODELO_CHAMADAS.format(n=n) for n in range(2000))
+    fonte += "int main() { return combina_1(3, 2, 1); }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        semantico.analisar(arvore)
+
+    for peephole in (False, True):
+        codigo = GeradorCodigo(peephole=peephole).gerar(arvore, semantico.anotacoes)
+        linhas = [linha.strip() for linha in codigo.split('\n')]
+        chamadas = sum(1 for linha in linhas if linha.startswith('call '))
+        pilha = sum(1 for linha in linhas if linha.startswith(('push ', 'pop ')))
+        instrucoes = contar_instrucoes(codigo)
+        nome = "com peephole" if peephole else "sem peephole"
+        print(f"  {nome:<32} {chamadas:6d} chamadas   {instrucoes / chamadas:6.1f} instruções"
+              f"   {pilha / chamadas:5.1f} push/pop por chamada")
+
+def bench_quadros():
+    """Reuso de slots entre escopos disjuntos no backend de pilha: bytes de quadro por função e chamadas alinhadas"""
+    fonte = ''.join(MODELO_QUADROS.format(n=n) for n in range(2000))
+    fonte += "int main() { return quadro_1(3, 2); }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        semantico.analisar(arvore)
+
+    # Sem reuso, cada parâmetro e cada declaração da função ganhava o seu slot de 8 bytes
+    slots = len(re.findall(r'\b(?:int|float) \w+\s*[=;,)]', fonte))
+    funcoes = fonte.count('int quadro_')
+    codigo = GeradorCodigo().gerar(arvore, semantico.anotacoes)
+    linhas = [linha.strip() for linha in codigo.split('\n')]
+    quadros = sum(int(linha.split(',')[1]) for i, linha in enumerate(linhas)
+                  if linha.startswith('sub rsp,') and linhas[i - 1] == 'mov rbp, rsp')
+    ajustes = sum(1 for i, linha in enumerate(linhas) if linha.startswith('call ') and linhas[i - 1] == 'sub rsp, 8')
+    chamadas = sum(1 for linha in linhas if linha.startswith('call '))
+    print(f"  {'um slot por declaração':<32} {8 * slots / funcoes:8.1f} bytes de quadro por função")
+    print(f"  {'slots reusados entre escopos':<32} {quadros / funcoes:8.1f} bytes de quadro por função")
+    print(f"  {chamadas} chamadas, {ajustes} com rsp ajustado em 8 para ficar alinhado")
+
+BENCHMARKS = {
+    'motores': bench_motores,
+    'paralelo': bench_paralelo,
+    'atribuicoes': bench_atribuicoes,
+    'expressoes': bench_expressoes,
+    'aninhamento': bench_aninhamento,
+    'memoria': bench_memoria,
+    'janela': bench_janela,
+    'esqueleto': bench_esqueleto,
+    'preditivo': bench_preditivo,
+    'visitante': bench_visitante,
+    'escopos': bench_escopos,
+    'constantes': bench_constantes,
+    'registradores': bench_registradores,
+    'peephole': bench_peephole,
+    'chamadas': bench_chamadas,
+    'quadros': bench_quadros,
+}
+
+if __name__ == '__main__':
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        if nome not in BENCHMARKS:
+            print(f"Benchmark desconhecido: {nome}. Disponíveis: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        print(f"=== {nome}: {BENCHMARKS[nome].__doc__} ===")
+        BENCHMARKS[nome]()
+        print()
@@ -0,0 +1,684 @@
+"""
+Código intermediário de três endereços entre a árvore e o assembly.
+
+Cada função vira um grafo de fluxo de controle (CFG) de blocos básicos:
+sequências de instruções sem desvios no meio, terminadas por um salto,
+um desvio condicional ou um retorno. Os operandos são temporários
+(Temporario: um por variável local e um por resultado intermediário) ou
+constantes (int/float do Python). str() de um programa, função, bloco ou
+instrução dá o texto legível do código intermediário.
+"""
+import struct
+
+from analisador_lexico import TabelaNomes
+from analisador_sintatico import (Visitante, NoDeclaracao, NoAtribuicao, NoRetorno, NoSe, NoEnquanto, NoPara,
+                                  NoBloco, NoExpressao, NoNumero, NoIdentificador, NoChamadaFuncao)
+from gerador_codigo import INSTRUCOES_FLOAT
+from otimizador_peephole import OtimizadorPeephole
+
+OPERACOES_BINARIAS = ('+', '-', '*', '/')
+
+class Temporario:
+    """Operando guardado em tempo de execução (nome: variável de origem, se houver)"""
+    __slots__ = ('numero', 'nome')
+
+    def __init__(self, numero, nome=None):
+        self.numero = numero
+        self.nome = nome
+
+    def __str__(self):
+        return f"{self.nome}.{self.numero}" if self.nome else f"t{self.numero}"
+
+class Instrucao:
+    """
+    destino = operação argumentos. Operações:
+        copia          destino = a
+        parametro      destino = parâmetro número alvo
+        + - * /        destino = a op b (tipo 'float': double, os dois operandos já são float)
+        neg            destino = -a
+        converte       destino = a convertido de int para float
+        chamada        destino = alvo(argumentos...)
+        salto          vai para o bloco alvo
+        desvio         vai para alvo[0] se a não é zero, senão para alvo[1]
+        retorno        retorna a
+    """
+    __slots__ = ('operacao', 'destino', 'argumentos', 'tipo', 'alvo')
+
+    def __init__(self, operacao, destino=None, argumentos=(), tipo=None, alvo=None):
+        self.operacao = operacao
+        self.destino = destino
+        self.argumentos = argumentos
+        self.tipo = tipo
+        self.alvo = alvo
+
+    def usos(self):
+        """Temporários lidos pela instrução"""
+        return [argumento for argumento in self.argumentos if type(argumento) is Temporario]
+
+    def __str__(self):
+        operacao = self.operacao
+        argumentos = [str(argumento) for argumento in self.argumentos]
+        if operacao == 'copia':
+            texto = argumentos[0]
+        elif operacao == 'parametro':
+            texto = f"parametro {self.alvo}"
+        elif operacao in OPERACOES_BINARIAS:
+            texto = f"{argumentos[0]} {operacao} {argumentos[1]}"
+        elif operacao == 'neg':
+            texto = f"-{argumentos[0]}"
+        elif operacao == 'converte':
+            texto = f"float {argumentos[0]}"
+        elif operacao == 'chamada':
+            texto = f"chamada {self.alvo}({', '.join(argumentos)})"
+        elif operacao == 'salto':
+            return f"salto {self.alvo.rotulo}"
+        elif operacao == 'desvio':
+            texto = f"desvio {argumentos[0]} ? {self.alvo[0].rotulo} : {self.alvo[1].rotulo}"
+        else:
+            texto = f"retorno {argumentos[0]}"
+        if self.tipo == 'float' and operacao not in ('copia', 'parametro', 'converte', 'chamada'):
+            texto += " [float]"
+        return f"{self.destino} = {texto}" if self.destino is not None else texto
+
+class BlocoBasico:
+    """Instruções em sequência; a última é o terminador (salto, desvio ou retorno)"""
+    __slots__ = ('rotulo', 'instrucoes', 'sucessores', 'predecessores')
+
+    def __init__(self, rotulo):
+        self.rotulo = rotulo
+        self.instrucoes = []
+        self.sucessores = []
+        self.predecessores = []
+
+    @property
+    def terminador(self):
+        return self.instrucoes[-1]
+
+    def __str__(self):
+        predecessores = ', '.join(bloco.rotulo for bloco in self.predecessores)
+        linhas = [f"{self.rotulo}:" + (f"  ; de {predecessores}" if predecessores else "")]
+        linhas.extend(f"    {instrucao}" for instrucao in self.instrucoes)
+        return '\n'.join(linhas)
+
+class FuncaoIntermediaria:
+    """CFG de uma função; blocos[0] é a entrada e a ordem da lista é a ordem de emissão"""
+    __slots__ = ('nome', 'parametros', 'blocos', 'temporarios')
+
+    def __init__(self, nome, parametros):
+        self.nome = nome
+        self.parametros = parametros
+        self.blocos = []
+        self.temporarios = 0
+
+    def novo_temporario(self, nome=None):
+        self.temporarios += 1
+        return Temporario(self.temporarios - 1, nome)
+
+    def ligar_blocos(self):
+        """Liga sucessores e predecessores pelos terminadores e remove os blocos inalcançáveis"""
+        for bloco in self.blocos:
+            terminador = bloco.terminador
+            if terminador.operacao == 'salto':
+                bloco.sucessores = [terminador.alvo]
+            elif terminador.operacao == 'desvio':
+                bloco.sucessores = list(dict.fromkeys(terminador.alvo))
+            else:
+                bloco.sucessores = []
+            bloco.predecessores = []
+
+        alcancados = {self.blocos[0]}
+        pilha = [self.blocos[0]]
+        while pilha:
+            for sucessor in pilha.pop().sucessores:
+                if sucessor not in alcancados:
+                    alcancados.add(sucessor)
+                    pilha.append(sucessor)
+        self.blocos = [bloco for bloco in self.blocos if bloco in alcancados]
+        for bloco in self.blocos:
+            for sucessor in bloco.sucessores:
+                sucessor.predecessores.append(bloco)
+
+    def vivos(self):
+        """
+        Análise de vivacidade (iterativa, de trás para frente no CFG).
+        Retorna {bloco: (vivos na entrada, vivos na saída)}
+        """
+        usos, definicoes = {}, {}
+        for bloco in self.blocos:
+            lidos, escritos = set(), set()
+            for instrucao in bloco.instrucoes:
+                lidos.update(temporario for temporario in instrucao.usos() if temporario not in escritos)
+                if instrucao.destino is not None:
+                    escritos.add(instrucao.destino)
+            usos[bloco], definicoes[bloco] = lidos, escritos
+
+        entrada = {bloco: set() for bloco in self.blocos}
+        saida = {bloco: set() for bloco in self.blocos}
+        mudou = True
+        while mudou:
+            mudou = False
+            for bloco in reversed(self.blocos):
+                vivos_saida = set()
+                for sucessor in bloco.sucessores:
+                    vivos_saida |= entrada[sucessor]
+                vivos_entrada = usos[bloco] | (vivos_saida - definicoes[bloco])
+                if vivos_entrada != entrada[bloco] or vivos_saida != saida[bloco]:
+                    entrada[bloco], saida[bloco] = vivos_entrada, vivos_saida
+                    mudou = True
+        return {bloco: (entrada[bloco], saida[bloco]) for bloco in self.blocos}
+
+    def __str__(self):
+        cabecalho = f"funcao {self.nome}({self.parametros} parâmetros):"
+        return '\n'.join([cabecalho] + [str(bloco) for bloco in self.blocos])
+
+class ProgramaIntermediario:
+    __slots__ = ('funcoes',)
+
+    def __init__(self, funcoes):
+        self.funcoes = funcoes
+
+    def __str__(self):
+        return '\n\n'.join(str(funcao) for funcao in self.funcoes) + '\n'
+
+class GeradorIntermediario(Visitante):
+    """Baixa a árvore (anotada ou não) para o código intermediário"""
+    DESPACHO = {
+        'comando': {
+            NoDeclaracao: 'baixar_declaracao',
+            NoAtribuicao: 'baixar_atribuicao',
+            NoRetorno: 'baixar_retorno',
+            NoSe: 'baixar_se',
+            NoEnquanto: 'baixar_enquanto',
+            NoPara: 'baixar_para',
+            NoBloco: 'baixar_bloco',
+            NoExpressao: 'baixar_expressao',
+            object: 'ignorar_comando',
+        },
+        # Passos da baixa de expressões: (nó, filhos já baixados, pilha, operandos)
+        'expressao': {
+            NoNumero: 'baixar_numero',
+            NoIdentificador: 'baixar_identificador',
+            NoChamadaFuncao: 'baixar_chamada_funcao',
+            NoExpressao: 'baixar_operacao',
+            object: 'baixar_desconhecido',
+        },
+    }
+
+    def __init__(self):
+        self.contador_label = 0
+        self.nomes = TabelaNomes()
+        self.anotacoes = None
+        self.funcao = None
+        self.bloco = None  # bloco em construção (None depois de um terminador)
+        self.variaveis = {}  # chave da variável -> Temporario
+        self.ligacoes_anteriores = []  # (chave, Temporario anterior ou None) de cada declaração, para desfazer
+
+    def chave(self, no):
+        """Chave da variável do nó: o Simbolo anotado, ou o id do nome na tabela de nomes"""
+        if self.anotacoes is not None:
+            return self.anotacoes.simbolos[no]
+        if no.id_nome is not None:
+            return no.id_nome
+        return self.nomes.internar(no.nome)
+
+    def tipo(self, no):
+        """Tipo anotado da expressão (None sem anotações: tudo é int)"""
+        if self.anotacoes is None:
+            return None
+        return self.anotacoes.tipos.get(no)
+
+    def gerar(self, arvore, anotacoes=None):
+        """Ponto de entrada: ProgramaIntermediario com uma FuncaoIntermediaria por função"""
+        self.anotacoes = anotacoes
+        if arvore.nomes is not None:
+            self.nomes = arvore.nomes
+        return ProgramaIntermediario([self.baixar_funcao(funcao) for funcao in arvore.funcoes])
+
+    def baixar_funcao(self, no):
+        self.funcao = FuncaoIntermediaria(no.nome, len(no.parametros))
+        self.variaveis = {}
+        self.ligacoes_anteriores = []
+        self.iniciar(self.novo_bloco("entrada"))
+        for i, param in enumerate(no.parametros):
+            temporario = self.variaveis[self.chave(param)] = self.funcao.novo_temporario(param.nome)
+            self.adicionar(Instrucao('parametro', temporario, alvo=i))
+        self.baixar_bloco(no.corpo)
+        self.terminar(Instrucao('retorno', argumentos=(0,)))  # retorno padrão
+        self.funcao.ligar_blocos()
+        return self.funcao
+
+    # Construção dos blocos
+
+    def novo_bloco(self, prefixo):
+        self.contador_label += 1
+        return BlocoBasico(f"{prefixo}_{self.contador_label}")
+
+    def iniciar(self, bloco):
+        """Passa a preencher o bloco, que entra na ordem de emissão"""
+        self.funcao.blocos.append(bloco)
+        self.bloco = bloco
+
+    def adicionar(self, instrucao):
+        if self.bloco is None:
+            self.iniciar(self.novo_bloco("inalcancavel"))  # código depois de um return; sai em ligar_blocos
+        self.bloco.instrucoes.append(instrucao)
+
+    def terminar(self, terminador):
+        if self.bloco is not None:
+            self.bloco.instrucoes.append(terminador)
+            self.bloco = None
+
+    def saltar(self, bloco):
+        self.terminar(Instrucao('salto', alvo=bloco))
+
+    def desviar(self, condicao, verdadeiro, falso):
+        """Desvio condicional; com condição constante vira salto (o outro lado some se ficar inalcançável)"""
+        operando = self.baixar_expressao(condicao)
+        if type(operando) is Temporario:
+            self.terminar(Instrucao('desvio', argumentos=(operando,), tipo=self.tipo(condicao), alvo=(verdadeiro, falso)))
+        else:
+            self.saltar(verdadeiro if operando else falso)  # 0.0 e -0.0 também são falsos
+
+    # Baixa dos comandos
+
+    def baixar_bloco(self, no):
+        marca = len(self.ligacoes_anteriores)
+        despacho = self.despacho_comando
+        for comando in no.comandos:
+            despacho[type(comando)](self, comando)
+        self.sair_escopo(marca)
+
+    def sair_escopo(self, marca):
+        """Desfaz as declarações feitas desde a marca: os nomes sombreados voltam"""
+        while len(self.ligacoes_anteriores) > marca:
+            chave, anterior = self.ligacoes_anteriores.pop()
+            if anterior is None:
+                del self.variaveis[chave]
+            else:
+                self.variaveis[chave] = anterior
+
+    def ignorar_comando(self, no):
+        """Expressões sem operador (número, identificador, chamada) usadas como comando não geram código"""
+
+    def baixar_declaracao(self, no):
+        chave = self.chave(no)
+        self.ligacoes_anteriores.append((chave, self.variaveis.get(chave)))
+        temporario = self.variaveis[chave] = self.funcao.novo_temporario(no.nome)
+        valor = self.baixar_expressao(no.valor) if no.valor else 0
+        self.adicionar(Instrucao('copia', temporario, (valor,)))
+
+    def baixar_atribuicao(self, no):
+        valor = self.baixar_expressao(no.valor)
+        self.adicionar(Instrucao('copia', self.variaveis[self.chave(no)], (valor,)))
+
+    def baixar_retorno(self, no):
+        valor = self.baixar_expressao(no.valor)
+        if self.bloco is None:
+            self.iniciar(self.novo_bloco("inalcancavel"))
+        self.terminar(Instrucao('retorno', argumentos=(valor,)))
+
+    def baixar_se(self, no):
+        bloco_se = self.novo_bloco("then")
+        bloco_senao = self.novo_bloco("else") if no.bloco_senao else None
+        bloco_fim = self.novo_bloco("endif")
+
+        self.desviar(no.condicao, bloco_se, bloco_senao or bloco_fim)
+        self.iniciar(bloco_se)
+        self.baixar_bloco(no.bloco_se)
+        self.saltar(bloco_fim)
+        if bloco_senao:
+            self.iniciar(bloco_senao)
+            self.baixar_bloco(no.bloco_senao)
+            self.saltar(bloco_fim)
+        self.iniciar(bloco_fim)
+
+    def baixar_enquanto(self, no):
+        self.baixar_laco("while", no.condicao, no.bloco, None)
+
+    def baixar_para(self, no):
+        # A inicialização fica no escopo do for, que envolve o laço todo
+        marca = len(self.ligacoes_anteriores)
+        self.despacho_comando[type(no.inicializacao)](self, no.inicializacao)
+        self.baixar_laco("for", no.condicao, no.bloco, no.incremento)
+        self.sair_escopo(marca)
+
+    def baixar_laco(self, prefixo, condicao, bloco, incremento):
+        bloco_inicio = self.novo_bloco(f"{prefixo}_start")
+        bloco_corpo = self.novo_bloco(f"{prefixo}_body")
+        bloco_fim = self.novo_bloco(f"{prefixo}_end")
+
+        self.saltar(bloco_inicio)
+        self.iniciar(bloco_inicio)
+        self.desviar(condicao, bloco_corpo, bloco_fim)
+        self.iniciar(bloco_corpo)
+        self.baixar_bloco(bloco)
+        if incremento is not None:
+            self.baixar_expressao(incremento)
+        self.saltar(bloco_inicio)
+        self.iniciar(bloco_fim)
+
+    # Baixa das expressões
+
+    def baixar_expressao(self, no):
+        """Baixa a expressão (pós-ordem com pilha explícita) e retorna o operando com o resultado"""
+        despacho = self.despacho_expressao
+        constantes = self.anotacoes.constantes if self.anotacoes is not None else None
+        operandos = []
+        pilha = [(no, 0)]
+        while pilha:
+            no, feitos = pilha.pop()
+            if constantes and feitos == 0 and no in constantes:
+                operandos.append(constantes[no])  # subárvore dobrada pelo OtimizadorConstantes
+                continue
+            despacho[type(no)](self, no, feitos, pilha, operandos)
+        return operandos.pop()
+
+    def baixar_numero(self, no, feitos, pilha, operandos):
+        valor = str(no.valor)
+        operandos.append(float(valor) if '.' in valor else int(valor))
+
+    def baixar_identificador(self, no, feitos, pilha, operandos):
+        # Expressões não alteram variáveis, então o próprio temporário da variável é o operando
+        chave = self.chave(no)
+        if chave not in self.variaveis:
+            raise Exception(f"Variável {no.nome} não encontrada")
+        operandos.append(self.variaveis[chave])
+
+    def baixar_chamada_funcao(self, no, feitos, pilha, operandos):
+        if feitos < len(no.argumentos):
+            pilha.append((no, feitos + 1))
+            pilha.append((no.argumentos[feitos], 0))
+            return
+
+        argumentos = tuple(operandos[len(operandos) - len(no.argumentos):])
+        del operandos[len(operandos) - len(no.argumentos):]
+        resultado = self.funcao.novo_temporario()
+        self.adicionar(Instrucao('chamada', resultado, argumentos, alvo=no.nome))
+        operandos.append(resultado)
+
+    def baixar_operacao(self, no, feitos, pilha, operandos):
+        filhos = (no.esquerda, no.direita) if no.direita else (no.esquerda,)
+        if feitos < len(filhos):
+            pilha.append((no, feitos + 1))
+            pilha.append((filhos[feitos], 0))
+            return
+
+        tipo = self.tipo(no)
+        if no.direita:
+            if no.operador not in OPERACOES_BINARIAS:
+                raise Exception(f"Operador {no.operador} não implementado")
+            direita, esquerda = operandos.pop(), operandos.pop()
+            if tipo == 'float':
+                esquerda = self.para_float(esquerda, no.esquerda)
+                direita = self.para_float(direita, no.direita)
+            resultado = self.funcao.novo_temporario()
+            self.adicionar(Instrucao(no.operador, resultado, (esquerda, direita), tipo))
+            operandos.append(resultado)
+        elif no.operador == '-':
+            resultado = self.funcao.novo_temporario()
+            self.adicionar(Instrucao('neg', resultado, (operandos.pop(),), tipo))
+            operandos.append(resultado)
+        elif no.operador != '+':
+            raise Exception(f"Operador unário {no.operador} não implementado")
+
+    def para_float(self, operando, no):
+        """Converte um operando int de uma operação float (constantes na hora, como o cvtsi2sd faria)"""
+        if self.tipo(no) == 'float':
+            return operando
+        if type(operando) is not Temporario:
+            return float(operando)
+        resultado = self.funcao.novo_temporario()
+        self.adicionar(Instrucao('converte', resultado, (operando,), 'float'))
+        return resultado
+
+    def baixar_desconhecido(self, no, feitos, pilha, operandos):
+        operandos.append(0)  # nó desconhecido não gera código
+
+
+# Emissão de NASM
+
+REGISTRADORES_PARAMETROS = ('rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9')
+INSTRUCOES_INTEIRAS = {'+': 'add', '-': 'sub', '*': 'imul'}
+
+def imediato(valor):
+    """Texto de uma constante como operando (float: os bits do double)"""
+    if isinstance(valor, float):
+        return f"0x{struct.unpack('<Q', struct.pack('<d', valor))[0]:x}"
+    return str(valor)
+
+def cabe_32_bits(operando):
+    """Se o imediato pode ser operando de instruções que só aceitam imm32 com sinal"""
+    return -(1 << 31) <= int(operando, 0) < 1 << 31
+
+def eh_imediato(operando):
+    return operando[0] in '-0123456789'
+
+def em_memoria(operando):
+    return operando.startswith('qword')
+
+class EmissorNASM:
+    """
+    Emite NASM a partir do código intermediário. alocar() decide onde fica
+    cada temporário; aqui todos ficam na pilha (subclasses podem usar
+    registradores). rax, rcx, rdx, xmm0 e xmm1 são rascunho da emissão.
+    Mesma interface de GeradorCodigo: gerar(arvore, anotacoes).
+    """
+    EMISSAO = {
+        'copia': 'emitir_copia',
+        'parametro': 'emitir_parametro',
+        '+': 'emitir_binaria',
+        '-': 'emitir_binaria',
+        '*': 'emitir_binaria',
+        '/': 'emitir_binaria',
+        'neg': 'emitir_neg',
+        'converte': 'emitir_converte',
+        'chamada': 'emitir_chamada',
+        'salto': 'emitir_salto',
+        'desvio': 'emitir_desvio',
+        'retorno': 'emitir_retorno',
+    }
+
+    def __init__(self, peephole=True):
+        self.codigo = []
+        self.contador_label = 0
+        self.peephole = OtimizadorPeephole() if peephole else None
+        self.locais = {}  # Temporario -> registrador ou endereço
+        self.proximo = None  # bloco emitido logo depois do atual
+        self.label_fim = None
+
+    def emit(self, instrucao):
+        """Adiciona uma instrução ao código"""
+        self.codigo.append(instrucao)
+
+    def gerar(self, arvore, anotacoes=None):
+        """Ponto de entrada a partir da árvore (anotacoes: AnalisadorSemantico.anotacoes)"""
+        return self.emitir(GeradorIntermediario().gerar(arvore, anotacoes))
+
+    def emitir(self, programa):
+        """Ponto de entrada a partir de um ProgramaIntermediario"""
+        self.emit("section .text")
+        self.emit("global _start")
+        self.emit("")
+        for funcao in programa.funcoes:
+            self.emitir_funcao(funcao)
+        self.emit("_start:")
+        self.emit("    call main")
+        self.emit("    mov rdi, rax")  # Código de saída = retorno de main
+        self.emit("    mov rax, 60")   # sys_exit
+        self.emit("    syscall")
+        if self.peephole:
+            self.codigo = self.peephole.otimizar(self.codigo)
+        return '\n'.join(self.codigo)
+
+    def alocar(self, funcao):
+        """
+        Onde fica cada temporário: (locais, registradores preservados usados,
+        bytes da área de temporários abaixo deles). Aqui: um slot de pilha cada
+        """
+        locais = {}
+        for bloco in funcao.blocos:
+            for instrucao in bloco.instrucoes:
+                if instrucao.destino is not None and instrucao.destino not in locais:
+                    locais[instrucao.destino] = f"qword [rbp-{8 * (len(locais) + 1)}]"
+        return locais, [], 8 * len(locais)
+
+    def emitir_funcao(self, funcao):
+        """Prólogo, blocos na ordem da lista e epílogo único"""
+        self.locais, preservados, espaco = self.alocar(funcao)
+        if (8 * len(preservados) + espaco) % 16:
+            espaco += 8  # rsp alinhado em 16 nas chamadas
+        self.contador_label += 1
+        self.label_fim = f"fim_{self.contador_label}"
+
+        self.emit(f"{funcao.nome}:")
+        self.emit("    push rbp")
+        self.emit("    mov rbp, rsp")
+        for registrador in preservados:
+            self.emit(f"    push {registrador}")
+        if espaco:
+            self.emit(f"    sub rsp, {espaco}")
+
+        blocos = funcao.blocos
+        for i, bloco in enumerate(blocos):
+            self.proximo = blocos[i + 1] if i + 1 < len(blocos) else None
+            if i:
+                self.emit(f"{bloco.rotulo}:")
+            for instrucao in bloco.instrucoes:
+                getattr(self, self.EMISSAO[instrucao.operacao])(instrucao)
+
+        self.emit(f"{self.label_fim}:")
+        if preservados:
+            self.emit(f"    lea rsp, [rbp-{8 * len(preservados)}]")
+            for registrador in reversed(preservados):
+                self.emit(f"    pop {registrador}")
+        else:
+            self.emit("    mov rsp, rbp")
+        self.emit("    pop rbp")
+        self.emit("    ret")
+        self.emit("")
+
+    def operando(self, valor):
+        """Registrador, endereço ou imediato do operando"""
+        if type(valor) is Temporario:
+            return self.locais[valor]
+        return imediato(valor)
+
+    def mover(self, destino, origem):
+        """mov que evita o mov de memória para memória e o imediato de 64 bits em memória"""
+        if destino == origem:
+            return
+        if em_memoria(destino) and (em_memoria(origem) or (eh_imediato(origem) and not cabe_32_bits(origem))):
+            self.emit(f"    mov rax, {origem}")
+            origem = 'rax'
+        self.emit(f"    mov {destino}, {origem}")
+
+    def emitir_copia(self, instrucao):
+        self.mover(self.operando(instrucao.destino), self.operando(instrucao.argumentos[0]))
+
+    def emitir_parametro(self, instrucao):
+        if instrucao.alvo < len(REGISTRADORES_PARAMETROS):
+            origem = REGISTRADORES_PARAMETROS[instrucao.alvo]
+        else:
+            # Do sétimo em diante, na pilha do chamador: acima do endereço de retorno e do rbp salvo
+            origem = f"qword [rbp+{16 + 8 * (instrucao.alvo - len(REGISTRADORES_PARAMETROS))}]"
+        self.mover(self.operando(instrucao.destino), origem)
+
+    def emitir_binaria(self, instrucao):
+        if instrucao.tipo == 'float':
+            self.emitir_binaria_float(instrucao)
+            return
+        destino = self.operando(instrucao.destino)
+        esquerda, direita = (self.operando(argumento) for argumento in instrucao.argumentos)
+        operador = instrucao.operacao
+        if eh_imediato(direita) and (operador == '/' or not cabe_32_bits(direita)):
+            self.emit(f"    mov rcx, {direita}")  # idiv não aceita imediato
+            direita = 'rcx'
+
+        if operador == '/':
+            self.mover('rax', esquerda)
+            self.emit("    cqo")  # estende rax para rdx:rax
+            self.emit(f"    idiv {direita}")
+            self.mover(destino, 'rax')
+        elif em_memoria(destino) or destino == direita:
+            self.mover('rax', esquerda)
+            self.emit(f"    {INSTRUCOES_INTEIRAS[operador]} rax, {direita}")
+            self.mover(destino, 'rax')
+        else:
+            self.mover(destino, esquerda)
+            self.emit(f"    {INSTRUCOES_INTEIRAS[operador]} {destino}, {direita}")
+
+    def carregar_xmm(self, registrador_xmm, rascunho, valor):
+        """movq do double em valor para o registrador xmm (imediato passa pelo rascunho)"""
+        valor = self.operando(valor)
+        if eh_imediato(valor):
+            self.emit(f"    mov {rascunho}, {valor}")
+            valor = rascunho
+        self.emit(f"    movq {registrador_xmm}, {valor}")
+
+    def emitir_binaria_float(self, instrucao):
+        esquerda, direita = instrucao.argumentos
+        self.carregar_xmm('xmm0', 'rax', esquerda)
+        self.carregar_xmm('xmm1', 'rcx', direita)
+        self.emit(f"    {INSTRUCOES_FLOAT[instrucao.operacao]} xmm0, xmm1")
+        self.emit(f"    movq {self.operando(instrucao.destino)}, xmm0")
+
+    def emitir_neg(self, instrucao):
+        destino = self.operando(instrucao.destino)
+        self.mover(destino, self.operando(instrucao.argumentos[0]))
+        if instrucao.tipo == 'float':
+            self.emit(f"    btc {destino}, 63")  # inverte o bit de sinal do double
+        else:
+            self.emit(f"    neg {destino}")
+
+    def emitir_converte(self, instrucao):
+        self.emit(f"    cvtsi2sd xmm0, {self.operando(instrucao.argumentos[0])}")
+        self.emit(f"    movq {self.operando(instrucao.destino)}, xmm0")
+
+    def emitir_chamada(self, instrucao):
+        # Do sétimo argumento em diante, empilhados do último para o primeiro; rsp
+        # está alinhado em 16 no corpo, então um número ímpar deles pede 8 bytes a mais
+        na_pilha = instrucao.argumentos[len(REGISTRADORES_PARAMETROS):]
+        espaco = 8 * (len(na_pilha) + len(na_pilha) % 2)
+        if len(na_pilha) % 2:
+            self.emit("    sub rsp, 8")
+        for argumento in reversed(na_pilha):
+            valor = self.operando(argumento)
+            if eh_imediato(valor) and not cabe_32_bits(valor):
+                self.emit(f"    mov rax, {valor}")  # push só aceita imm32
+                valor = 'rax'
+            self.emit(f"    push {valor}")
+        for registrador, argumento in zip(REGISTRADORES_PARAMETROS, instrucao.argumentos):
+            self.emit(f"    mov {registrador}, {self.operando(argumento)}")
+        self.emit(f"    call {instrucao.alvo}")
+        if espaco:
+            self.emit(f"    add rsp, {espaco}")
+        self.mover(self.operando(instrucao.destino), 'rax')
+
+    def emitir_salto(self, instrucao):
+        if instrucao.alvo is not self.proximo:
+            self.emit(f"    jmp {instrucao.alvo.rotulo}")
+
+    def emitir_desvio(self, instrucao):
+        valor = self.operando(instrucao.argumentos[0])
+        verdadeiro, falso = instrucao.alvo
+        if instrucao.tipo == 'float':
+            self.mover('rax', valor)
+            self.emit("    btr rax, 63")  # -0.0 também é falso
+            valor = 'rax'
+        if em_memoria(valor):
+            self.emit(f"    cmp {valor}, 0")
+        else:
+            self.emit(f"    test {valor}, {valor}")
+
+        if verdadeiro is self.proximo:
+            self.emit(f"    jz {falso.rotulo}")
+        elif falso is self.proximo:
+            self.emit(f"    jnz {verdadeiro.rotulo}")
+        else:
+            self.emit(f"    jz {falso.rotulo}")
+            self.emit(f"    jmp {verdadeiro.rotulo}")
+
+    def emitir_retorno(self, instrucao):
+        self.mover('rax', self.operando(instrucao.argumentos[0]))
+        if self.proximo is not None:
+            self.emit(f"    jmp {self.label_fim}")
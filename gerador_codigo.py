@@ -1,11 +1,70 @@
-class GeradorCodigo:
-    def __init__(self):
+import struct
+
+from analisador_lexico import TabelaNomes
+from otimizador_peephole import OtimizadorPeephole
+from analisador_sintatico import (Visitante, NoDeclaracao, NoAtribuicao, NoRetorno, NoSe, NoEnquanto, NoPara,
+                                  NoBloco, NoExpressao, NoNumero, NoIdentificador, NoChamadaFuncao)
+
+# Instruções SSE2 das operações binárias em ponto flutuante (double)
+INSTRUCOES_FLOAT = {'+': 'addsd', '-': 'subsd', '*': 'mulsd', '/': 'divsd'}
+
+class GeradorCodigo(Visitante):
+    DESPACHO = {
+        'comando': {
+            NoDeclaracao: 'gerar_declaracao',
+            NoAtribuicao: 'gerar_atribuicao',
+            NoRetorno: 'gerar_retorno',
+            NoSe: 'gerar_se',
+            NoEnquanto: 'gerar_enquanto',
+            NoPara: 'gerar_para',
+            NoBloco: 'gerar_bloco',
+            NoExpressao: 'gerar_expressao_descartada',
+            object: 'ignorar_comando',
+        },
+        # Passos do percurso de expressões: (nó, filhos já gerados, pilha)
+        'expressao': {
+            NoNumero: 'passo_numero',
+            NoIdentificador: 'passo_identificador',
+            NoChamadaFuncao: 'passo_chamada_funcao',
+            NoExpressao: 'passo_operacao',
+            object: 'ignorar_passo',
+        },
+    }
+    
+    def __init__(self, peephole=True):
         self.codigo = []
         self.contador_label = 0
-        self.pilha_registradores = []
-        self.variaveis_locais = {}
+        # Vivacidade dos registradores de argumento: os parâmetros vão para a pilha no prólogo,
+        # então só ficam vivos os argumentos já carregados de chamadas ainda por fazer
+        self.pilha_registradores = []  # registradores de argumento vivos, na ordem em que foram carregados
+        self.chamadas_pendentes = []  # por chamada em andamento: (registradores salvos, tamanho da pilha no início)
+        self.variaveis_locais = {}  # id do nome -> offset em relação a rbp
         self.offset_atual = 0
+        self.maior_offset = 0  # tamanho do quadro: os escopos disjuntos reusam os mesmos slots
+        self.escopos = []  # por bloco aberto: (offset_atual na entrada, tamanho de ligacoes_anteriores)
+        self.ligacoes_anteriores = []  # (chave, offset anterior ou None) de cada declaração, para desfazer
+        self.profundidade_pilha = 0  # valores da expressão atual empilhados acima do quadro
         self.funcao_atual = None
+        self.nomes = TabelaNomes()
+        self.anotacoes = None  # Anotacoes da análise semântica, se disponíveis
+        self.peephole = OtimizadorPeephole() if peephole else None  # contadores por regra em peephole.contadores
+    
+    def chave(self, no):
+        """
+        Chave da variável do nó: o Simbolo anotado pela análise semântica
+        (que já resolveu o escopo), ou o id do nome na tabela de nomes
+        """
+        if self.anotacoes is not None:
+            return self.anotacoes.simbolos[no]
+        if no.id_nome is not None:
+            return no.id_nome
+        return self.nomes.internar(no.nome)
+    
+    def tipo(self, no):
+        """Tipo anotado da expressão (None sem anotações: gera código inteiro)"""
+        if self.anotacoes is None:
+            return None
+        return self.anotacoes.tipos.get(no)
         
     def gerar_label(self, prefixo="label"):
         """Gera um label único"""
@@ -16,8 +75,11 @@ class GeradorCodigo:
         """Adiciona uma instrução ao código"""
         self.codigo.append(instrucao)
     
-    def gerar(self, arvore):
-        """Ponto de entrada para geração de código"""
+    def gerar(self, arvore, anotacoes=None):
+        """Ponto de entrada para geração de código (anotacoes: AnalisadorSemantico.anotacoes)"""
+        self.anotacoes = anotacoes
+        if arvore.nomes is not None:
+            self.nomes = arvore.nomes
         self.emit("section .text")
         self.emit("global _start")
         self.emit("")
@@ -32,6 +94,8 @@ class GeradorCodigo:
         self.emit("    mov rax, 60")   # sys_exit
         self.emit("    syscall")
         
+        if self.peephole:
+            self.otimizar_codigo()
         return '\n'.join(self.codigo)
     
     def gerar_programa(self, no):
@@ -44,6 +108,9 @@ class GeradorCodigo:
         self.funcao_atual = no
         self.variaveis_locais = {}
         self.offset_atual = 0
+        self.maior_offset = 0
+        self.escopos = []
+        self.ligacoes_anteriores = []
         
         # Label da função
         self.emit(f"{no.nome}:")
@@ -57,18 +124,23 @@ class GeradorCodigo:
         # Mapeia parâmetros
         registradores_params = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
         for i, param in enumerate(no.parametros):
+            self.offset_atual += 8
+            self.variaveis_locais[self.chave(param)] = -self.offset_atual
             if i < len(registradores_params):
-                self.offset_atual += 8
-                self.variaveis_locais[param.nome] = -self.offset_atual
                 # Move parâmetro para pilha
                 self.emit(f"    mov [rbp-{self.offset_atual}], {registradores_params[i]}")
+            else:
+                # Do sétimo em diante, copia da pilha do chamador (acima do endereço de retorno e do rbp salvo)
+                self.emit(f"    mov rax, [rbp+{16 + 8 * (i - len(registradores_params))}]")
+                self.emit(f"    mov [rbp-{self.offset_atual}], rax")
+        self.maior_offset = self.offset_atual
         
         # Gera código do corpo da função
         self.gerar_bloco(no.corpo)
         
-        # Ajusta espaço para variáveis locais
-        if self.offset_atual > 0:
-            self.codigo[espaco_placeholder] = f"    sub rsp, {self.offset_atual}"
+        # Ajusta espaço para variáveis locais (múltiplo de 16: rsp continua alinhado depois do prólogo)
+        if self.maior_offset > 0:
+            self.codigo[espaco_placeholder] = f"    sub rsp, {(self.maior_offset + 15) // 16 * 16}"
         
         # Retorno padrão (caso não haja return explícito)
         self.emit("    mov rax, 0")
@@ -79,53 +151,61 @@ class GeradorCodigo:
     
     def gerar_bloco(self, no):
         """Gera código para um bloco"""
+        self.entrar_escopo()
         for comando in no.comandos:
             self.gerar_comando(comando)
+        self.sair_escopo()
+    
+    def entrar_escopo(self):
+        """Abre um escopo: as variáveis declaradas nele ocupam slots a partir do offset atual"""
+        self.escopos.append((self.offset_atual, len(self.ligacoes_anteriores)))
+    
+    def sair_escopo(self):
+        """Fecha o escopo: os slots dele ficam livres para o próximo e os nomes sombreados voltam"""
+        self.offset_atual, marca = self.escopos.pop()
+        while len(self.ligacoes_anteriores) > marca:
+            chave, anterior = self.ligacoes_anteriores.pop()
+            if anterior is None:
+                del self.variaveis_locais[chave]
+            else:
+                self.variaveis_locais[chave] = anterior
     
     def gerar_comando(self, no):
-        """Gera código para um comando"""
-        from analisador_sintatico import (NoDeclaracao, NoAtribuicao, NoRetorno, 
-                                        NoSe, NoEnquanto, NoPara, NoBloco, NoExpressao)
-        
-        if isinstance(no, NoDeclaracao):
-            self.gerar_declaracao(no)
-        elif isinstance(no, NoAtribuicao):
-            self.gerar_atribuicao(no)
-        elif isinstance(no, NoRetorno):
-            self.gerar_retorno(no)
-        elif isinstance(no, NoSe):
-            self.gerar_se(no)
-        elif isinstance(no, NoEnquanto):
-            self.gerar_enquanto(no)
-        elif isinstance(no, NoPara):
-            self.gerar_para(no)
-        elif isinstance(no, NoBloco):
-            self.gerar_bloco(no)
-        elif isinstance(no, NoExpressao):
-            self.gerar_expressao(no)
-            # Remove resultado da pilha se não for usado
-            self.emit("    pop rax")
+        """Gera código para um comando (despacho pela classe do nó)"""
+        self.despacho_comando[type(no)](self, no)
+    
+    def gerar_expressao_descartada(self, no):
+        """Expressão usada como comando"""
+        self.gerar_expressao(no)
+        # Remove resultado da pilha se não for usado
+        self.emit("    pop rax")
+    
+    def ignorar_comando(self, no):
+        """Expressões sem operador (número, identificador, chamada) usadas como comando não geram código"""
     
     def gerar_declaracao(self, no):
         """Gera código para declaração de variável"""
         # Reserva espaço na pilha
         self.offset_atual += 8
-        self.variaveis_locais[no.nome] = -self.offset_atual
+        self.maior_offset = max(self.maior_offset, self.offset_atual)
+        chave = self.chave(no)
+        self.ligacoes_anteriores.append((chave, self.variaveis_locais.get(chave)))
+        self.variaveis_locais[chave] = -self.offset_atual
         
         # Se há inicialização
         if no.valor:
             self.gerar_expressao(no.valor)
             self.emit("    pop rax")
-            self.emit(f"    mov [rbp{self.variaveis_locais[no.nome]}], rax")
+            self.emit(f"    mov [rbp{self.variaveis_locais[chave]}], rax")
         else:
             # Inicializa com zero
-            self.emit(f"    mov qword [rbp{self.variaveis_locais[no.nome]}], 0")
+            self.emit(f"    mov qword [rbp{self.variaveis_locais[chave]}], 0")
     
     def gerar_atribuicao(self, no):
         """Gera código para atribuição"""
         self.gerar_expressao(no.valor)
         self.emit("    pop rax")
-        self.emit(f"    mov [rbp{self.variaveis_locais[no.nome]}], rax")
+        self.emit(f"    mov [rbp{self.variaveis_locais[self.chave(no)]}], rax")
     
     def gerar_retorno(self, no):
         """Gera código para return"""
@@ -141,10 +221,7 @@ class GeradorCodigo:
         label_fim = self.gerar_label("endif")
         
         # Gera condição
-        self.gerar_expressao(no.condicao)
-        self.emit("    pop rax")
-        self.emit("    cmp rax, 0")
-        self.emit(f"    je {label_else}")
+        self.gerar_condicao(no.condicao, label_else)
         
         # Bloco if
         self.gerar_bloco(no.bloco_se)
@@ -157,6 +234,15 @@ class GeradorCodigo:
         
         self.emit(f"{label_fim}:")
     
+    def gerar_condicao(self, condicao, label_falso):
+        """Avalia a condição e salta para label_falso se ela for zero"""
+        self.gerar_expressao(condicao)
+        self.emit("    pop rax")
+        if self.tipo(condicao) == 'float':
+            self.emit("    btr rax, 63")  # -0.0 também é falso
+        self.emit("    cmp rax, 0")
+        self.emit(f"    je {label_falso}")
+    
     def gerar_enquanto(self, no):
         """Gera código para while"""
         label_inicio = self.gerar_label("while_start")
@@ -165,10 +251,7 @@ class GeradorCodigo:
         self.emit(f"{label_inicio}:")
         
         # Gera condição
-        self.gerar_expressao(no.condicao)
-        self.emit("    pop rax")
-        self.emit("    cmp rax, 0")
-        self.emit(f"    je {label_fim}")
+        self.gerar_condicao(no.condicao, label_fim)
         
         # Corpo do loop
         self.gerar_bloco(no.bloco)
@@ -181,16 +264,14 @@ class GeradorCodigo:
         label_inicio = self.gerar_label("for_start")
         label_fim = self.gerar_label("for_end")
         
-        # Inicialização
+        # Inicialização (no escopo do for, que envolve o laço todo)
+        self.entrar_escopo()
         self.gerar_comando(no.inicializacao)
         
         self.emit(f"{label_inicio}:")
         
         # Condição
-        self.gerar_expressao(no.condicao)
-        self.emit("    pop rax")
-        self.emit("    cmp rax, 0")
-        self.emit(f"    je {label_fim}")
+        self.gerar_condicao(no.condicao, label_fim)
         
         # Corpo
         self.gerar_bloco(no.bloco)
@@ -201,117 +282,187 @@ class GeradorCodigo:
         
         self.emit(f"    jmp {label_inicio}")
         self.emit(f"{label_fim}:")
+        self.sair_escopo()
     
     def gerar_expressao(self, no):
-        """Gera código para expressão (resultado na pilha)"""
-        from analisador_sintatico import (NoExpressao, NoNumero, NoIdentificador, NoChamadaFuncao)
+        """Gera código para expressão (resultado na pilha), em pós-ordem com pilha explícita"""
+        despacho = self.despacho_expressao
+        constantes = self.anotacoes.constantes if self.anotacoes is not None else None
+        pilha = [(no, 0)]  # (nó, filhos já gerados)
+        self.profundidade_pilha = 0  # entre comandos não há nada empilhado
+        while pilha:
+            no, feitos = pilha.pop()
+            if constantes and feitos == 0 and no in constantes:
+                self.gerar_constante(constantes[no])  # subárvore dobrada pelo OtimizadorConstantes
+                continue
+            despacho[type(no)](self, no, feitos, pilha)
+    
+    def gerar_constante(self, valor):
+        """Empilha um valor conhecido em tempo de compilação (float: os bits do double)"""
+        self.profundidade_pilha += 1
+        if isinstance(valor, float):
+            self.emit(f"    mov rax, 0x{struct.unpack('<Q', struct.pack('<d', valor))[0]:x}")
+            self.emit("    push rax")
+        elif -(1 << 31) <= valor < 1 << 31:
+            self.emit(f"    push {valor}")
+        else:
+            self.emit(f"    mov rax, {valor}")  # push só aceita imediatos de 32 bits
+            self.emit("    push rax")
+    
+    def passo_numero(self, no, feitos, pilha):
+        # Carrega número na pilha (float: os bits do double)
+        if self.tipo(no) == 'float':
+            self.profundidade_pilha += 1
+            self.emit(f"    mov rax, __float64__({no.valor})")
+            self.emit("    push rax")
+        else:
+            self.gerar_constante(int(no.valor))  # fora de 32 bits, passa por rax como o literal dobrado
+    
+    def passo_identificador(self, no, feitos, pilha):
+        # Carrega variável na pilha
+        chave = self.chave(no)
+        if chave in self.variaveis_locais:
+            self.emit(f"    push qword [rbp{self.variaveis_locais[chave]}]")
+            self.profundidade_pilha += 1
+        else:
+            raise Exception(f"Variável {no.nome} não encontrada")
+    
+    def passo_chamada_funcao(self, no, feitos, pilha):
+        if feitos == 0:
+            self.gerar_inicio_chamada(no)
+        else:
+            self.gerar_argumento_chamada(no, feitos - 1)
         
-        if isinstance(no, NoNumero):
-            # Carrega número na pilha
-            self.emit(f"    push {no.valor}")
+        if feitos < len(no.argumentos):
+            pilha.append((no, feitos + 1))
+            pilha.append((no.argumentos[feitos], 0))
+        else:
+            self.gerar_fim_chamada(no)
+    
+    def passo_operacao(self, no, feitos, pilha):
+        filhos = (no.esquerda, no.direita) if no.direita else (no.esquerda,)
+        if feitos < len(filhos):
+            pilha.append((no, feitos + 1))
+            pilha.append((filhos[feitos], 0))
+        elif no.direita:
+            self.gerar_operacao_binaria(no)
+        else:
+            self.gerar_operacao_unaria(no)
+    
+    def ignorar_passo(self, no, feitos, pilha):
+        pass  # nó desconhecido não gera código
+    
+    def gerar_operacao_binaria(self, no):
+        """Combina os dois operandos do topo da pilha"""
+        if self.tipo(no) == 'float':
+            self.gerar_operacao_float(no)
+            return
+        
+        # Operandos estão na pilha
+        self.emit("    pop rbx")  # direita
+        self.emit("    pop rax")  # esquerda
+        self.profundidade_pilha -= 1  # dois saem, o resultado entra
+        
+        if no.operador == '+':
+            self.emit("    add rax, rbx")
+        elif no.operador == '-':
+            self.emit("    sub rax, rbx")
+        elif no.operador == '*':
+            self.emit("    imul rax, rbx")
+        elif no.operador == '/' and 'rdx' in self.pilha_registradores:
+            # idiv escreve em rdx, que guarda um argumento já carregado
+            self.emit("    push rdx")
+            self.emit("    cqo")
+            self.emit("    idiv rbx")
+            self.emit("    pop rdx")
+        elif no.operador == '/':
+            self.emit("    cqo")  # estende rax para rdx:rax
+            self.emit("    idiv rbx")
+        else:
+            raise Exception(f"Operador {no.operador} não implementado")
         
-        elif isinstance(no, NoIdentificador):
-            # Carrega variável na pilha
-            if no.nome in self.variaveis_locais:
-                self.emit(f"    push qword [rbp{self.variaveis_locais[no.nome]}]")
+        self.emit("    push rax")
+    
+    def gerar_operacao_float(self, no):
+        """Operação binária em double (SSE2); um operando int é convertido antes"""
+        if no.operador not in INSTRUCOES_FLOAT:
+            raise Exception(f"Operador {no.operador} não implementado")
+        
+        self.emit("    pop rbx")  # direita
+        self.emit("    pop rax")  # esquerda
+        self.profundidade_pilha -= 1
+        for registrador_xmm, registrador, operando in (('xmm0', 'rax', no.esquerda), ('xmm1', 'rbx', no.direita)):
+            if self.tipo(operando) == 'float':
+                self.emit(f"    movq {registrador_xmm}, {registrador}")
             else:
-                raise Exception(f"Variável {no.nome} não encontrada")
-        
-        elif isinstance(no, NoChamadaFuncao):
-            self.gerar_chamada_funcao(no)
-        
-        elif isinstance(no, NoExpressao):
-            if no.direita:  # Operação binária
-                self.gerar_expressao(no.esquerda)
-                self.gerar_expressao(no.direita)
-                
-                # Operandos estão na pilha
-                self.emit("    pop rbx")  # direita
-                self.emit("    pop rax")  # esquerda
-                
-                if no.operador == '+':
-                    self.emit("    add rax, rbx")
-                elif no.operador == '-':
-                    self.emit("    sub rax, rbx")
-                elif no.operador == '*':
-                    self.emit("    imul rax, rbx")
-                elif no.operador == '/':
-                    self.emit("    cqo")  # estende rax para rdx:rax
-                    self.emit("    idiv rbx")
-                else:
-                    raise Exception(f"Operador {no.operador} não implementado")
-                
-                self.emit("    push rax")
-            
-            else:  # Operação unária
-                self.gerar_expressao(no.esquerda)
-                self.emit("    pop rax")
-                
-                if no.operador == '-':
-                    self.emit("    neg rax")
-                elif no.operador == '+':
-                    pass  # Nada a fazer
-                else:
-                    raise Exception(f"Operador unário {no.operador} não implementado")
-                
-                self.emit("    push rax")
-    
-    def gerar_chamada_funcao(self, no):
-        """Gera código para chamada de função"""
-        registradores_params = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
-        
-        # Salva registradores que podem ser alterados
-        self.emit("    push rdi")
-        self.emit("    push rsi")
-        self.emit("    push rdx")
-        self.emit("    push rcx")
-        self.emit("    push r8")
-        self.emit("    push r9")
+                self.emit(f"    cvtsi2sd {registrador_xmm}, {registrador}")
+        self.emit(f"    {INSTRUCOES_FLOAT[no.operador]} xmm0, xmm1")
+        self.emit("    movq rax, xmm0")
+        self.emit("    push rax")
+    
+    def gerar_operacao_unaria(self, no):
+        """Aplica um operador unário ao topo da pilha"""
+        self.emit("    pop rax")
         
-        # Prepara argumentos
-        for i, arg in enumerate(no.argumentos):
-            if i < len(registradores_params):
-                self.gerar_expressao(arg)
-                self.emit(f"    pop {registradores_params[i]}")
-            else:
-                # Mais de 6 argumentos vão para pilha
-                self.gerar_expressao(arg)
+        if no.operador == '-' and self.tipo(no) == 'float':
+            self.emit("    btc rax, 63")  # inverte o bit de sinal do double
+        elif no.operador == '-':
+            self.emit("    neg rax")
+        elif no.operador == '+':
+            pass  # Nada a fazer
+        else:
+            raise Exception(f"Operador unário {no.operador} não implementado")
         
-        # Chama função
+        self.emit("    push rax")
+    
+    def gerar_inicio_chamada(self, no):
+        """Início de uma chamada de função, antes dos argumentos"""
+        # Salva só os registradores vivos: argumentos já carregados de chamadas externas a esta
+        # (um registrador recarregado por uma chamada interna aparece mais de uma vez na pilha)
+        salvos = list(dict.fromkeys(self.pilha_registradores))
+        for registrador in salvos:
+            self.emit(f"    push {registrador}")
+        self.profundidade_pilha += len(salvos)
+        self.chamadas_pendentes.append((salvos, len(self.pilha_registradores)))
+    
+    def gerar_argumento_chamada(self, no, i):
+        """Move o i-ésimo argumento, já calculado na pilha, para seu registrador"""
+        registradores_params = ['rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9']
+        if i < len(registradores_params):
+            self.emit(f"    pop {registradores_params[i]}")
+            self.pilha_registradores.append(registradores_params[i])
+            self.profundidade_pilha -= 1
+        # Do sétimo em diante ficam na pilha até gerar_fim_chamada
+    
+    def gerar_fim_chamada(self, no):
+        """Chama a função depois dos argumentos prontos e empilha o resultado"""
+        # Chama função com rsp alinhado em 16 (o quadro já é múltiplo de 16; falta a parte empilhada)
+        # e os argumentos desta chamada morrem aqui
+        na_pilha = max(len(no.argumentos) - 6, 0)
+        ajuste = (self.profundidade_pilha + na_pilha) % 2
+        if na_pilha:
+            # Os argumentos além do sexto ficaram empilhados na ordem do código, o último no topo, e a
+            # convenção quer o sétimo no topo: vão copiados em ordem inversa logo abaixo (com o ajuste por cima)
+            self.emit(f"    sub rsp, {8 * (na_pilha + ajuste)}")
+            for j in range(na_pilha):
+                self.emit(f"    mov rax, [rsp+{8 * (2 * na_pilha + ajuste - 1 - j)}]")
+                self.emit(f"    mov [rsp+{8 * j}], rax")
+        elif ajuste:
+            self.emit("    sub rsp, 8")
         self.emit(f"    call {no.nome}")
+        if na_pilha or ajuste:
+            self.emit(f"    add rsp, {8 * (2 * na_pilha + ajuste)}")
+        salvos, vivos_antes = self.chamadas_pendentes.pop()
+        self.profundidade_pilha += 1 - len(salvos) - na_pilha
+        del self.pilha_registradores[vivos_antes:]
         
         # Restaura registradores
-        self.emit("    pop r9")
-        self.emit("    pop r8")
-        self.emit("    pop rcx")
-        self.emit("    pop rdx")
-        self.emit("    pop rsi")
-        self.emit("    pop rdi")
+        for registrador in reversed(salvos):
+            self.emit(f"    pop {registrador}")
         
         # Resultado em rax, coloca na pilha
         self.emit("    push rax")
     
     def otimizar_codigo(self):
-        """Otimizações básicas do código gerado"""
-        # Remove push/pop consecutivos desnecessários
-        codigo_otimizado = []
-        i = 0
-        while i < len(self.codigo):
-            if (i + 1 < len(self.codigo) and 
-                self.codigo[i].strip().startswith('push') and 
-                self.codigo[i + 1].strip().startswith('pop')):
-                # Verifica se é push/pop do mesmo registrador
-                push_reg = self.codigo[i].strip().split()[-1]
-                pop_reg = self.codigo[i + 1].strip().split()[-1]
-                if push_reg != pop_reg:
-                    # Substitui push reg1; pop reg2 por mov reg2, reg1
-                    codigo_otimizado.append(f"    mov {pop_reg}, {push_reg}")
-                    i += 2
-                else:
-                    # Remove push/pop do mesmo registrador
-                    i += 2
-            else:
-                codigo_otimizado.append(self.codigo[i])
-                i += 1
-        
-        self.codigo = codigo_otimizado
\ No newline at end of file
+        """Passa o código gerado pelo otimizador peephole"""
+        self.codigo = self.peephole.otimizar(self.codigo)
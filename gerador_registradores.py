@@ -0,0 +1,92 @@
+"""
+Backend com alocação de registradores: os temporários do código
+intermediário de cada função são mapeados para os registradores do x86-64
+por varredura linear (linear scan), derramando na pilha só o que não couber.
+"""
+from bisect import bisect_right, insort
+
+from codigo_intermediario import EmissorNASM
+
+# rax, rcx e rdx ficam livres como rascunho (idiv, operandos em memória,
+# imediatos grandes) e os registradores de argumento só são escritos logo
+# antes do call, então nenhum deles entra na alocação
+REGISTRADORES_VOLATEIS = ('r10', 'r11')  # caller-saved: só intervalos que não atravessam chamadas
+REGISTRADORES_PRESERVADOS = ('rbx', 'r12', 'r13', 'r14', 'r15')  # callee-saved: salvos no prólogo se usados
+
+class GeradorRegistradores(EmissorNASM):
+    """EmissorNASM com os temporários em registradores; mesma interface de GeradorCodigo"""
+
+    def intervalos(self, funcao):
+        """
+        Intervalo de vida [início, fim] de cada temporário, em posições das
+        instruções na ordem de emissão; a vivacidade estende o intervalo
+        pelos blocos em que ele está vivo na entrada ou na saída.
+        Retorna (intervalos ordenados por início, posições das chamadas)
+        """
+        vivos = funcao.vivos()
+        inicio, fim = {}, {}
+        chamadas = []
+        # As posições só crescem no percurso: o primeiro toque é o início e o último, o fim
+        posicao = 0
+        for bloco in funcao.blocos:
+            vivos_entrada, vivos_saida = vivos[bloco]
+            for temporario in vivos_entrada:
+                inicio.setdefault(temporario, posicao)
+                fim[temporario] = posicao
+            for instrucao in bloco.instrucoes:
+                for temporario in instrucao.usos():
+                    inicio.setdefault(temporario, posicao)
+                    fim[temporario] = posicao
+                if instrucao.destino is not None:
+                    inicio.setdefault(instrucao.destino, posicao)
+                    fim[instrucao.destino] = posicao
+                if instrucao.operacao == 'chamada':
+                    chamadas.append(posicao)
+                posicao += 1
+            for temporario in vivos_saida:
+                fim[temporario] = posicao - 1
+        intervalos = sorted((inicio[temporario], fim[temporario], temporario.numero, temporario) for temporario in inicio)
+        return intervalos, chamadas
+
+    def alocar(self, funcao):
+        """
+        Varredura linear: percorre os intervalos por início, liberando os que já
+        terminaram. Sem registrador livre, derrama o intervalo (ativo ou o atual)
+        que termina por último. Quem atravessa uma chamada só recebe registrador
+        preservado
+        """
+        intervalos, chamadas = self.intervalos(funcao)
+        locais = {}
+        livres = set(REGISTRADORES_VOLATEIS + REGISTRADORES_PRESERVADOS)
+        ativos = []  # (fim, número, temporário), ordenada por fim
+        derramados = []
+
+        for inicio, fim, numero, temporario in intervalos:
+            while ativos and ativos[0][0] < inicio:
+                livres.add(locais[ativos.pop(0)[2]])
+
+            proxima_chamada = bisect_right(chamadas, inicio)
+            atravessa = proxima_chamada < len(chamadas) and chamadas[proxima_chamada] < fim
+            candidatos = REGISTRADORES_PRESERVADOS if atravessa else REGISTRADORES_VOLATEIS + REGISTRADORES_PRESERVADOS
+            registrador = next((r for r in candidatos if r in livres), None)
+            if registrador is not None:
+                livres.remove(registrador)
+                locais[temporario] = registrador
+                insort(ativos, (fim, numero, temporario))
+                continue
+
+            vitima = max((ativo for ativo in ativos if locais[ativo[2]] in candidatos), default=None)
+            if vitima is not None and vitima[0] > fim:
+                locais[temporario] = locais[vitima[2]]
+                derramados.append(vitima[2])
+                ativos.remove(vitima)
+                insort(ativos, (fim, numero, temporario))
+            else:
+                derramados.append(temporario)
+
+        preservados = [r for r in REGISTRADORES_PRESERVADOS if r in locais.values()]
+        # Área de derramamento logo abaixo dos preservados salvos no prólogo
+        base = 8 * len(preservados)
+        for i, temporario in enumerate(derramados):
+            locais[temporario] = f"qword [rbp-{base + 8 * (i + 1)}]"
+        return locais, preservados, 8 * len(derramados)
@@ -1,6 +1,8 @@
+import mmap
 import sys
 from analisador_lexico import AnalisadorLexico
 from analisador_sintatico import AnalisadorSintatico, imprimir_arvore
+from analisador_preditivo import AnalisadorPreditivo
 
 def formatar_tokens(tokens):
     """Formata e exibe os tokens de forma organizada"""
@@ -18,10 +20,20 @@ def main():
         print("Uso: python main_sintatico.py <arquivo_codigo>")
         print("Ou: python main_sintatico.py --entrada")
         print("Ou: python main_sintatico.py <arquivo_codigo> --tokens (para mostrar apenas tokens)")
+        print("Ou: python main_sintatico.py <arquivo_codigo> --mmap (lê o arquivo via mmap, sem decodificá-lo)")
+        print("Ou: python main_sintatico.py <arquivo_codigo> --iterativo (parser sem recursão, para aninhamento profundo)")
+        print("Ou: python main_sintatico.py <arquivo_codigo> --arena (árvore em arrays paralelos, menos memória)")
+        print("Ou: python main_sintatico.py <arquivo_codigo> --assinaturas (só lista as funções, sem analisar os corpos)")
+        print("Ou: python main_sintatico.py <arquivo_codigo> --preditivo (parser LL(1) dirigido por tabela)")
         return
 
     # Determina se deve mostrar apenas tokens
     apenas_tokens = '--tokens' in sys.argv
+    usar_mmap = '--mmap' in sys.argv
+    iterativo = '--iterativo' in sys.argv
+    arena = '--arena' in sys.argv
+    apenas_assinaturas = '--assinaturas' in sys.argv
+    preditivo = '--preditivo' in sys.argv
 
     # Cria os analisadores
     analisador_lexico = AnalisadorLexico()
@@ -33,8 +45,12 @@ def main():
         codigo_fonte = sys.stdin.read()
     else:
         try:
-            with open(sys.argv[1], 'r', encoding='utf-8') as arquivo:
-                codigo_fonte = arquivo.read()
+            if usar_mmap:
+                with open(sys.argv[1], 'rb') as arquivo:
+                    codigo_fonte = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                with open(sys.argv[1], 'r', encoding='utf-8') as arquivo:
+                    codigo_fonte = arquivo.read()
         except FileNotFoundError:
             print(f"Erro: Arquivo '{sys.argv[1]}' não encontrado.")
             return
@@ -42,12 +58,36 @@ def main():
             print(f"Erro ao ler o arquivo: {e}")
             return
 
+    try:
+        analisar_codigo(codigo_fonte, analisador_lexico, apenas_tokens=apenas_tokens, iterativo=iterativo,
+                        arena=arena, apenas_assinaturas=apenas_assinaturas, preditivo=preditivo)
+    finally:
+        # Com --mmap, os tokens e a árvore usam o mapeamento: ele só fecha depois da análise
+        if not isinstance(codigo_fonte, str):
+            codigo_fonte.close()
+
+def analisar_codigo(codigo_fonte, analisador_lexico, apenas_tokens=False, iterativo=False, arena=False,
+                    apenas_assinaturas=False, preditivo=False):
+    """Análises léxica e sintática do código lido por main (str ou o mmap do arquivo)"""
     # Análise léxica
     print("=== INICIANDO ANÁLISE LÉXICA ===")
     try:
-        tokens = analisador_lexico.tokenizar(codigo_fonte)
+        if isinstance(codigo_fonte, str):
+            tokens = analisador_lexico.tokenizar_buffer(codigo_fonte)
+        else:
+            tokens = analisador_lexico.tokenizar_bytes(codigo_fonte)
         print("✅ Análise léxica concluída com sucesso!")
         
+        # Consulta de assinaturas: modo esqueleto, sem tabela de tokens
+        if apenas_assinaturas:
+            arvore = AnalisadorSintatico(tokens, esqueleto=True).analisar()
+            if arvore:
+                print("\n=== FUNÇÕES ===")
+                for funcao in arvore.funcoes:
+                    parametros = ', '.join(f"{param.tipo} {param.nome}" for param in funcao.parametros)
+                    print(f"{funcao.tipo_retorno} {funcao.nome}({parametros})")
+            return
+        
         print("\n=== TOKENS GERADOS ===")
         formatar_tokens(tokens)
         
@@ -64,7 +104,10 @@ def main():
     print("=== INICIANDO ANÁLISE SINTÁTICA ===")
     
     try:
-        analisador_sintatico = AnalisadorSintatico(tokens)
+        if preditivo:
+            analisador_sintatico = AnalisadorPreditivo(tokens, arena=arena)
+        else:
+            analisador_sintatico = AnalisadorSintatico(tokens, iterativo=iterativo, arena=arena)
         arvore = analisador_sintatico.analisar()
         
         if arvore:
@@ -74,7 +117,11 @@ def main():
             
             # Estatísticas da análise
             print(f"\n=== ESTATÍSTICAS ===")
-            print(f"📄 Código analisado: {len(codigo_fonte.splitlines())} linhas")
+            if isinstance(codigo_fonte, str):
+                total_linhas = len(codigo_fonte.splitlines())
+            else:
+                total_linhas = len(tokens.indice_linhas) - (codigo_fonte[-1:] == b'\n')
+            print(f"📄 Código analisado: {total_linhas} linhas")
             print(f"🔤 Tokens processados: {len(tokens) - 1}")
             print(f"🌳 Análise sintática: Sucesso")
             
@@ -0,0 +1,232 @@
+"""Otimizações sobre a árvore anotada, entre a análise semântica e a geração de código"""
+import math
+
+from analisador_sintatico import (Visitante, NoDeclaracao, NoAtribuicao, NoRetorno, NoSe, NoEnquanto, NoPara,
+                                  NoBloco, NoExpressao, NoNumero, NoIdentificador, NoChamadaFuncao)
+
+def inteiro_64(valor):
+    """Inteiro com o estouro de 64 bits em complemento de dois, como nos registradores"""
+    valor &= (1 << 64) - 1
+    return valor - (1 << 64) if valor >> 63 else valor
+
+def operar(operador, esquerda, direita):
+    """
+    Resultado do operador binário como o código gerado o calcularia, ou None
+    se ele não deve ser dobrado (divisão por zero, estouro do idiv, float
+    não finito): aí o erro continua acontecendo em tempo de execução
+    """
+    if isinstance(esquerda, float) or isinstance(direita, float):
+        esquerda, direita = float(esquerda), float(direita)  # cvtsi2sd
+        if operador == '+':
+            resultado = esquerda + direita
+        elif operador == '-':
+            resultado = esquerda - direita
+        elif operador == '*':
+            resultado = esquerda * direita
+        elif operador == '/' and direita != 0.0:
+            resultado = esquerda / direita
+        else:
+            return None
+        return resultado if math.isfinite(resultado) else None
+
+    if operador == '+':
+        return inteiro_64(esquerda + direita)
+    if operador == '-':
+        return inteiro_64(esquerda - direita)
+    if operador == '*':
+        return inteiro_64(esquerda * direita)
+    if operador == '/' and direita != 0 and not (esquerda == -(1 << 63) and direita == -1):
+        quociente = abs(esquerda) // abs(direita)  # idiv trunca em direção a zero
+        return quociente if (esquerda < 0) == (direita < 0) else -quociente
+    return None
+
+def mesmo_valor(a, b):
+    """Igualdade de constantes que distingue int de float e 0.0 de -0.0"""
+    return type(a) is type(b) and a == b and math.copysign(1.0, a) == math.copysign(1.0, b)
+
+class OtimizadorConstantes(Visitante):
+    """
+    Dobra expressões constantes e propaga constantes por declarações e
+    atribuições em sequência. A árvore não muda (o que também serve para a
+    arena): o valor de cada expressão conhecida em tempo de compilação, que
+    não seja um literal, vai para anotacoes.constantes, e a geração de
+    código o emite como imediato em vez de calcular a subárvore.
+
+    O ambiente (Simbolo -> valor) vale até o próximo ponto de junção: depois
+    de um if fica só o que os dois caminhos concordam, e na cabeça de um
+    laço saem as variáveis atribuídas no corpo.
+    """
+    DESPACHO = {
+        'comando': {
+            NoDeclaracao: 'propagar_declaracao',
+            NoAtribuicao: 'propagar_atribuicao',
+            NoRetorno: 'propagar_retorno',
+            NoSe: 'propagar_se',
+            NoEnquanto: 'propagar_enquanto',
+            NoPara: 'propagar_para',
+            NoBloco: 'propagar_bloco',
+            NoExpressao: 'avaliar',
+            object: 'ignorar_comando',
+        },
+        # Passos da avaliação de expressões: (nó, filhos já avaliados, pilha, valores)
+        'expressao': {
+            NoNumero: 'valor_numero',
+            NoIdentificador: 'valor_identificador',
+            NoChamadaFuncao: 'valor_chamada_funcao',
+            NoExpressao: 'valor_operacao',
+            object: 'valor_desconhecido',
+        },
+    }
+
+    def __init__(self, anotacoes):
+        self.anotacoes = anotacoes
+        self.constantes = anotacoes.constantes
+        self.ambiente = {}  # Simbolo -> valor conhecido no ponto atual
+
+    def otimizar(self, arvore):
+        """Ponto de entrada: anota as constantes de todas as funções"""
+        for funcao in arvore.funcoes:
+            self.ambiente = {}  # parâmetros são desconhecidos
+            self.propagar_bloco(funcao.corpo)
+        return self.anotacoes
+
+    def propagar_bloco(self, no):
+        """Propaga pelos comandos do bloco, em ordem"""
+        despacho = self.despacho_comando
+        for comando in no.comandos:
+            despacho[type(comando)](self, comando)
+
+    def ignorar_comando(self, no):
+        """Expressões sem operador usadas como comando não geram código nem mudam variáveis"""
+
+    def definir(self, no, valor):
+        """A variável do nó passa a valer valor (None: desconhecido)"""
+        simbolo = self.anotacoes.simbolos[no]
+        if valor is None:
+            self.ambiente.pop(simbolo, None)
+        else:
+            self.ambiente[simbolo] = valor
+
+    def propagar_declaracao(self, no):
+        if no.valor:
+            self.definir(no, self.avaliar(no.valor))
+        else:
+            self.definir(no, 0.0 if no.tipo == 'float' else 0)  # a variável começa zerada
+
+    def propagar_atribuicao(self, no):
+        self.definir(no, self.avaliar(no.valor))
+
+    def propagar_retorno(self, no):
+        self.avaliar(no.valor)
+
+    def propagar_se(self, no):
+        self.avaliar(no.condicao)
+        antes = self.ambiente
+
+        self.ambiente = dict(antes)
+        self.propagar_bloco(no.bloco_se)
+        depois_se = self.ambiente
+
+        if no.bloco_senao:
+            self.ambiente = dict(antes)
+            self.propagar_bloco(no.bloco_senao)
+            depois_senao = self.ambiente
+        else:
+            depois_senao = antes
+
+        # Junção: só continua conhecido o que os dois caminhos concordam
+        self.ambiente = {simbolo: valor for simbolo, valor in depois_se.items()
+                         if simbolo in depois_senao and mesmo_valor(valor, depois_senao[simbolo])}
+
+    def propagar_enquanto(self, no):
+        self.entrar_laco(no.bloco)
+        self.avaliar(no.condicao)
+        self.propagar_corpo(no.bloco)
+
+    def propagar_para(self, no):
+        self.despacho_comando[type(no.inicializacao)](self, no.inicializacao)
+        self.entrar_laco(no.bloco)
+        self.avaliar(no.condicao)
+        self.avaliar(no.incremento)  # não atribui nada: vale o ambiente da cabeça do laço
+        self.propagar_corpo(no.bloco)
+
+    def entrar_laco(self, bloco):
+        """Cabeça do laço (junção com o fim do corpo): esquece as variáveis atribuídas no corpo"""
+        pilha = [bloco]
+        while pilha:
+            no = pilha.pop()
+            if isinstance(no, NoBloco):
+                pilha.extend(no.comandos)
+            elif isinstance(no, NoAtribuicao):
+                self.ambiente.pop(self.anotacoes.simbolos[no], None)
+            elif isinstance(no, NoSe):
+                pilha.append(no.bloco_se)
+                if no.bloco_senao:
+                    pilha.append(no.bloco_senao)
+            elif isinstance(no, (NoEnquanto, NoPara)):
+                pilha.append(no.bloco)
+                if isinstance(no, NoPara):
+                    pilha.append(no.inicializacao)
+
+    def propagar_corpo(self, bloco):
+        """Corpo do laço; na saída vale o ambiente da cabeça"""
+        cabeca = self.ambiente
+        self.ambiente = dict(cabeca)
+        self.propagar_bloco(bloco)
+        self.ambiente = cabeca
+
+    def avaliar(self, no):
+        """
+        Valor constante da expressão, ou None se ele só é conhecido em tempo de
+        execução; anota as subexpressões constantes (pós-ordem com pilha explícita)
+        """
+        despacho = self.despacho_expressao
+        valores = []
+        pilha = [(no, 0)]
+        while pilha:
+            no, feitos = pilha.pop()
+            despacho[type(no)](self, no, feitos, pilha, valores)
+        return valores.pop()
+
+    def valor_numero(self, no, feitos, pilha, valores):
+        valor = str(no.valor)
+        valores.append(float(valor) if '.' in valor else inteiro_64(int(valor)))
+
+    def valor_identificador(self, no, feitos, pilha, valores):
+        valor = self.ambiente.get(self.anotacoes.simbolos[no])
+        if valor is not None:
+            self.constantes[no] = valor
+        valores.append(valor)
+
+    def valor_chamada_funcao(self, no, feitos, pilha, valores):
+        # Os argumentos podem ser dobrados, mas o resultado da chamada é desconhecido
+        if feitos < len(no.argumentos):
+            pilha.append((no, feitos + 1))
+            pilha.append((no.argumentos[feitos], 0))
+        else:
+            del valores[len(valores) - len(no.argumentos):]
+            valores.append(None)
+
+    def valor_operacao(self, no, feitos, pilha, valores):
+        filhos = (no.esquerda, no.direita) if no.direita else (no.esquerda,)
+        if feitos < len(filhos):
+            pilha.append((no, feitos + 1))
+            pilha.append((filhos[feitos], 0))
+            return
+
+        if no.direita:
+            direita, esquerda = valores.pop(), valores.pop()
+            valor = None if esquerda is None or direita is None else operar(no.operador, esquerda, direita)
+        else:
+            valor = valores.pop()
+            if valor is not None and no.operador == '-':
+                valor = -valor if isinstance(valor, float) else inteiro_64(-valor)
+            elif no.operador != '+':
+                valor = None
+
+        if valor is not None:
+            self.constantes[no] = valor
+        valores.append(valor)
+
+    def valor_desconhecido(self, no, feitos, pilha, valores):
+        valores.append(None)
@@ -0,0 +1,215 @@
+"""
+Otimizador peephole: reescreve o assembly gerado olhando uma janela de
+poucas linhas por vez, com uma tabela de regras locais.
+"""
+
+REGISTRADORES_64 = frozenset(('rax', 'rbx', 'rcx', 'rdx', 'rsi', 'rdi', 'rbp', 'rsp',
+                              'r8', 'r9', 'r10', 'r11', 'r12', 'r13', 'r14', 'r15'))
+# Operações que deixam ZF de acordo com o resultado (imul não: lá ZF é indefinido)
+DEFINEM_ZF = frozenset(('add', 'sub', 'and', 'or', 'xor', 'neg', 'inc', 'dec'))
+SALTOS_ZF = frozenset(('je', 'jne', 'jz', 'jnz'))
+SALTOS = frozenset(('jmp', 'je', 'jne', 'jz', 'jnz', 'jl', 'jle', 'jg', 'jge', 'jb', 'jbe', 'ja', 'jae'))
+
+class LinhaAsm:
+    """
+    Linha do assembly já separada: rótulo ('nome:'), instrução (mnemônico e
+    operandos) ou outra coisa (diretiva, comentário, linha vazia), guardada
+    só como texto
+    """
+    __slots__ = ('texto', 'rotulo', 'mnemonico', 'operandos')
+
+    def __init__(self, texto, rotulo=None, mnemonico=None, operandos=()):
+        self.texto = texto
+        self.rotulo = rotulo
+        self.mnemonico = mnemonico
+        self.operandos = operandos
+
+def analisar_linha(texto):
+    linha = texto.strip()
+    if not linha or linha.startswith(';') or linha.startswith(('section ', 'global ')):
+        return LinhaAsm(texto)
+    if linha.endswith(':'):
+        return LinhaAsm(texto, rotulo=linha[:-1])
+    linha = linha.split(';', 1)[0].rstrip()
+    mnemonico, _, resto = linha.partition(' ')
+    operandos = tuple(operando.strip() for operando in resto.split(',')) if resto else ()
+    return LinhaAsm(texto, mnemonico=mnemonico, operandos=operandos)
+
+def instrucao(mnemonico, *operandos):
+    """Linha nova criada por uma regra"""
+    return LinhaAsm(f"    {mnemonico} {', '.join(operandos)}", mnemonico=mnemonico, operandos=operandos)
+
+def normalizar(operando):
+    """Forma comparável do operando ([rbp-8] e qword [rbp-8] são o mesmo endereço)"""
+    return operando.replace('qword', '').replace(' ', '')
+
+def em_memoria(operando):
+    return '[' in operando
+
+def menciona(operando, registrador):
+    """Se o operando lê o registrador (por texto: na dúvida, sim)"""
+    return registrador in operando
+
+# Regras: recebem a janela (as últimas linhas já emitidas, a mais nova no fim)
+# e, se casam com o fim dela, retornam (linhas consumidas do fim, substitutas)
+
+def regra_push_pop(janela):
+    """push X; pop X some; push X; pop Y vira mov Y, X"""
+    if len(janela) < 2 or janela[-2].mnemonico != 'push':
+        return None
+    origem, destino = janela[-2].operandos[0], janela[-1].operandos[0]
+    if 'rsp' in origem or 'rsp' in destino:
+        return None
+    if normalizar(origem) == normalizar(destino):
+        return 2, []
+    if em_memoria(origem) and em_memoria(destino):
+        return None
+    return 2, [instrucao('mov', destino, origem)]
+
+def regra_push_mov_pop(janela):
+    """push X; mov R2, Y; pop R vira mov R2, Y; mov R, X (se o mov não mexe em X)"""
+    if len(janela) < 3 or janela[-3].mnemonico != 'push' or janela[-2].mnemonico != 'mov':
+        return None
+    origem, destino = janela[-3].operandos[0], janela[-1].operandos[0]
+    meio = janela[-2]
+    if (destino not in REGISTRADORES_64 or meio.operandos[0] not in REGISTRADORES_64
+            or 'rsp' in origem or 'rsp' in meio.operandos[1] or destino == 'rsp' or meio.operandos[0] == 'rsp'
+            or menciona(origem, meio.operandos[0])):
+        return None
+    return 3, [meio, instrucao('mov', destino, origem)]
+
+def regra_mov_proprio(janela):
+    """mov R, R some"""
+    destino, origem = janela[-1].operandos
+    if destino == origem and destino in REGISTRADORES_64:
+        return 1, []
+    return None
+
+def regra_mov_inverso(janela):
+    """mov A, B; mov B, A: o segundo não muda nada"""
+    if len(janela) < 2 or janela[-2].mnemonico != 'mov':
+        return None
+    a, b = janela[-2].operandos
+    destino, origem = janela[-1].operandos
+    if (normalizar(destino) == normalizar(b) and normalizar(origem) == normalizar(a)
+            and not menciona(b, a) and not menciona(a, b)):
+        return 2, [janela[-2]]
+    return None
+
+def regra_mov_sobrescrito(janela):
+    """mov R, X seguido de uma escrita em R que não lê R: o primeiro mov é inútil"""
+    if len(janela) < 2 or janela[-2].mnemonico != 'mov':
+        return None
+    registrador = janela[-2].operandos[0]
+    ultima = janela[-1]
+    if registrador not in REGISTRADORES_64 or ultima.operandos[0] != registrador:
+        return None
+    if ultima.mnemonico == 'pop' or (ultima.mnemonico == 'mov' and not menciona(ultima.operandos[1], registrador)):
+        return 2, [ultima]
+    return None
+
+def regra_cmp_zero(janela):
+    """cmp R, 0 vira test R, R (mesmas flags, instrução menor)"""
+    registrador, valor = janela[-1].operandos
+    if valor == '0' and registrador in REGISTRADORES_64:
+        return 1, [instrucao('test', registrador, registrador)]
+    return None
+
+def regra_teste_redundante(janela):
+    """op R, ...; test R, R; jz/jnz: a operação já deixou ZF de acordo com R"""
+    if len(janela) < 3:
+        return None
+    operacao, teste = janela[-3], janela[-2]
+    if (operacao.mnemonico in DEFINEM_ZF and teste.mnemonico == 'test'
+            and teste.operandos[0] == teste.operandos[1] == operacao.operandos[0]):
+        return 3, [operacao, janela[-1]]
+    return None
+
+def regra_salto_proximo(janela):
+    """jmp/jcc L seguido (só por rótulos) de L: o salto cai no mesmo lugar"""
+    rotulo = janela[-1].rotulo
+    i = len(janela) - 2
+    while i >= 0 and janela[i].rotulo is not None:
+        i -= 1
+    if i >= 0 and janela[i].mnemonico in SALTOS and janela[i].operandos[0] == rotulo:
+        return len(janela) - i, janela[i + 1:]
+    return None
+
+def regra_codigo_morto(janela):
+    """Instrução logo depois de jmp ou ret (sem rótulo no meio) nunca executa"""
+    if len(janela) >= 2 and janela[-2].mnemonico in ('jmp', 'ret'):
+        return 1, []
+    return None
+
+# (nome, mnemônicos da linha mais nova que disparam a regra, regra);
+# ':' dispara em rótulos e None em qualquer instrução
+REGRAS = (
+    ('codigo_morto', None, regra_codigo_morto),
+    ('push_pop', ('pop',), regra_push_pop),
+    ('push_mov_pop', ('pop',), regra_push_mov_pop),
+    ('mov_proprio', ('mov',), regra_mov_proprio),
+    ('mov_inverso', ('mov',), regra_mov_inverso),
+    ('mov_sobrescrito', ('mov', 'pop'), regra_mov_sobrescrito),
+    ('cmp_zero', ('cmp',), regra_cmp_zero),
+    ('teste_redundante', tuple(SALTOS_ZF), regra_teste_redundante),
+    ('salto_proximo', (':',), regra_salto_proximo),
+)
+
+class OtimizadorPeephole:
+    """
+    Aplica as regras até o ponto fixo. As linhas entram uma a uma na saída;
+    a cada linha, as regras disparadas pelo mnemônico dela olham as últimas
+    `largura` linhas. Quando uma casa, as linhas consumidas saem e as
+    substitutas voltam para a entrada, para serem vistas junto das
+    anteriores; assim, ao fim de uma passada, nenhuma janela casa mais.
+    `contadores` acumula quantas vezes cada regra foi aplicada.
+    """
+    def __init__(self, largura=4, regras=REGRAS):
+        self.largura = largura
+        self.regras = regras
+        self.contadores = {nome: 0 for nome, _, _ in regras}
+        # Regras de cada gatilho, na ordem da tabela; gerais: as que valem para qualquer instrução
+        self.gerais = [(nome, regra) for nome, gatilhos, regra in regras if gatilhos is None]
+        self.por_gatilho = {}
+        for nome, gatilhos, regra in regras:
+            for gatilho in gatilhos or ():
+                if gatilho not in self.por_gatilho:
+                    self.por_gatilho[gatilho] = [(n, r) for n, g, r in regras
+                                                 if g is None and gatilho != ':' or g is not None and gatilho in g]
+
+    def otimizar(self, codigo):
+        """Recebe e retorna a lista de linhas do assembly"""
+        # Linhas iguais se repetem muito (push rax, pop rbx...): cada texto é analisado uma vez
+        # (as LinhaAsm não são alteradas pelas regras, então podem ser compartilhadas)
+        analisadas = {}
+        entrada = []
+        for texto in reversed(codigo):
+            linha = analisadas.get(texto)
+            if linha is None:
+                linha = analisadas[texto] = analisar_linha(texto)
+            entrada.append(linha)
+        saida = []
+        largura = self.largura
+        por_gatilho, gerais, contadores = self.por_gatilho, self.gerais, self.contadores
+        de_rotulo = por_gatilho.get(':', ())
+        proxima, emitir = entrada.pop, saida.append
+        while entrada:
+            linha = proxima()
+            emitir(linha)
+            if linha.mnemonico is not None:
+                regras = por_gatilho.get(linha.mnemonico, gerais)
+            elif linha.rotulo is not None:
+                regras = de_rotulo
+            else:
+                continue
+
+            janela = saida[-largura:]
+            for nome, regra in regras:
+                resultado = regra(janela)
+                if resultado is not None:
+                    consumidas, substitutas = resultado
+                    del saida[-consumidas:]
+                    entrada.extend(reversed(substitutas))
+                    contadores[nome] += 1
+                    break
+        return [linha.texto for linha in saida]
@@ -0,0 +1,74 @@
+"""
+Compila fontes da linguagem e roda o executável gerado, para os testes
+compararem códigos de saída. Precisa de Linux x86-64 com ld e com nasm ou
+o GNU as (o NASM gerado é traduzido para a sintaxe Intel do as); sem
+eles, os testes que executam código são pulados.
+"""
+import contextlib
+import io
+import platform
+import re
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import AnalisadorSintatico
+
+def compilar(fonte, gerador, anotar=True, otimizador=None):
+    """Assembly do fonte; anotar=False gera sem a análise semântica, otimizador recebe as anotações"""
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    assert arvore is not None
+    if not anotar:
+        return gerador.gerar(arvore)
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert semantico.analisar(arvore), semantico.erros
+    if otimizador is not None:
+        otimizador(semantico.anotacoes).otimizar(arvore)
+    return gerador.gerar(arvore, semantico.anotacoes)
+
+def montador():
+    if platform.system() != 'Linux' or platform.machine() != 'x86_64' or not shutil.which('ld'):
+        return None
+    return next((nome for nome in ('nasm', 'as') if shutil.which(nome)), None)
+
+def para_gas(codigo):
+    """Traduz o NASM gerado pelo compilador para o GNU as com .intel_syntax"""
+    linhas = ['.intel_syntax noprefix']
+    for linha in codigo.split('\n'):
+        instrucao = linha.split(';', 1)[0].rstrip()
+        partes = instrucao.split()
+        if not partes:
+            continue
+        if partes[0] == 'section':
+            linhas.append(partes[1])
+            continue
+        if partes[0] == 'global':
+            linhas.append(f".globl {partes[1]}")
+            continue
+        flutuante = re.search(r'__float64__\(([^)]*)\)', instrucao)
+        if flutuante:
+            bits = struct.unpack('<q', struct.pack('<d', float(flutuante.group(1))))[0]
+            instrucao = instrucao.replace(flutuante.group(0), str(bits)).replace('mov ', 'movabs ', 1)
+        linhas.append(re.sub(r'\bqword\s*\[', 'qword ptr [', instrucao))
+    return '\n'.join(linhas) + '\n'
+
+def executar(codigo, diretorio):
+    """Monta, liga e roda o assembly; retorna o código de saída (negativo se morto por um sinal)"""
+    programa = montador()
+    if programa is None:
+        pytest.skip("executar o código gerado precisa de Linux x86-64 com ld e nasm (ou as)")
+    objeto, executavel = diretorio / 'programa.o', diretorio / 'programa'
+    if programa == 'nasm':
+        (diretorio / 'programa.asm').write_text(codigo)
+        comando = ['nasm', '-f', 'elf64', '-o', str(objeto), str(diretorio / 'programa.asm')]
+    else:
+        (diretorio / 'programa.s').write_text(para_gas(codigo))
+        comando = ['as', '-o', str(objeto), str(diretorio / 'programa.s')]
+    subprocess.run(comando, check=True, capture_output=True)
+    subprocess.run(['ld', '-o', str(executavel), str(objeto)], check=True, capture_output=True)
+    return subprocess.run([str(executavel)], timeout=10).returncode
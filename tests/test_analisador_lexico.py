@@ -0,0 +1,214 @@
+import io
+import mmap
+import random
+
+import pytest
+
+from analisador_lexico import CODIGOS_TIPO, T_ID, AnalisadorLexico, JanelaTokens
+
+FONTE = """
+// Função de exemplo
+int soma(int a, int b) {
+    float taxa = 12.5;
+    /* comentário de bloco
+       com mais de uma linha */
+    while (a) {
+        a = a - 1; b = b * 2 / 3;
+    }
+    return a + b;
+}
+"""
+
+def resumo(tokens):
+    return [(token.tipo, token.valor, token.linha, token.coluna) for token in tokens]
+
+@pytest.mark.parametrize('tamanho_bloco', [1, 2, 3, 7, 64, 65536])
+def test_stream_igual_a_tokenizar(tamanho_bloco):
+    analisador = AnalisadorLexico()
+    esperado = resumo(analisador.tokenizar(FONTE))
+    obtido = resumo(analisador.tokenizar_stream(io.StringIO(FONTE), tamanho_bloco))
+    assert obtido == esperado
+
+@pytest.mark.parametrize('fonte', ['12.5', 'abc_1', 'a // fim', 'a /* b */ c', 'a / * b', 'x /* sem fim'])
+def test_stream_lexema_no_limite_do_bloco(fonte):
+    # Com blocos de 1 e 2 caracteres, todo lexema atravessa algum limite
+    analisador = AnalisadorLexico()
+    esperado = resumo(analisador.tokenizar(fonte))
+    for tamanho_bloco in (1, 2):
+        assert resumo(analisador.tokenizar_stream(io.StringIO(fonte), tamanho_bloco)) == esperado
+
+def test_stream_e_preguicoso():
+    # O primeiro token sai antes de o arquivo inteiro ser lido
+    arquivo = io.StringIO("int x;" + " " * 100000)
+    tokens = AnalisadorLexico().tokenizar_stream(arquivo, tamanho_bloco=16)
+    assert next(tokens).tipo == 'TIPO_INT'
+    assert arquivo.tell() < 100
+
+def test_buffer_igual_a_tokenizar():
+    analisador = AnalisadorLexico()
+    buffer = analisador.tokenizar_buffer(FONTE)
+    assert resumo(buffer) == resumo(analisador.tokenizar(FONTE))
+    assert [token.codigo for token in buffer] == [CODIGOS_TIPO[token.tipo] for token in buffer]
+    assert list(buffer.codigos) == [token.codigo for token in analisador.tokenizar(FONTE)]
+
+def test_buffer_indices():
+    buffer = AnalisadorLexico().tokenizar_buffer("int x;")
+    assert len(buffer) == 4
+    assert buffer[-1].tipo == 'EOF'
+    assert buffer[1].valor == 'x' and buffer[1].codigo == T_ID
+    with pytest.raises(IndexError):
+        buffer[4]
+
+@pytest.mark.parametrize('fonte', [FONTE, '12. 3.5 .5 a1_b _x', 'a//b\nc/*d*/e/ *f', 'x @ # $ ç é y', 'if else while for int float return iff', ''])
+def test_motor_tabela_igual_ao_regex(fonte):
+    regex, tabela = AnalisadorLexico(), AnalisadorLexico(motor='tabela')
+    assert resumo(tabela.tokenizar(fonte)) == resumo(regex.tokenizar(fonte))
+    assert resumo(tabela.tokenizar_buffer(fonte)) == resumo(regex.tokenizar_buffer(fonte))
+
+def test_motor_desconhecido():
+    with pytest.raises(ValueError):
+        AnalisadorLexico(motor='dfa')
+
+def arrays(buffer):
+    return list(buffer.codigos), list(buffer.inicios), list(buffer.fins), list(buffer.ids_nome)
+
+def verificar_edicao(analisador, fonte, inicio, removidos, inseridos):
+    """Retokeniza a edição e compara com tokenizar o texto novo do zero; retorna o buffer novo"""
+    buffer = analisador.tokenizar_buffer(fonte)
+    buffer.abertura_pendente  # calculada antes, como num editor que já retokenizou uma vez
+    novo = analisador.retokenizar(buffer, inicio, removidos, inseridos)
+    nova_fonte = fonte[:inicio] + inseridos + fonte[inicio + removidos:]
+    referencia = analisador.tokenizar_buffer(nova_fonte)
+    assert novo.fonte == nova_fonte
+    assert arrays(novo) == arrays(referencia)
+    assert novo.abertura_pendente == referencia.abertura_pendente
+    return novo
+
+@pytest.mark.parametrize('fonte, inicio, removidos, inseridos', [
+    ('x = 12;', 6, 0, '.5'),  # o número anterior cresce
+    ('ab = 1;', 2, 0, 'c'),  # o ID anterior cresce
+    ('a / b; /* x', 11, 0, ' */'),  # fecha o comentário: o '/*' deixa de ser divisão
+    ('a /* b */ c', 7, 2, ''),  # apaga o fechamento: volta a ser '/' '*'
+    ('a /* b /* c', 4, 1, ''),  # desfaz a abertura pendente: a próxima passa a ser a pendente
+    ('int x; // fim\nint y;', 7, 2, ''),  # comentário de linha vira divisões
+    ('int x;\nint y;\nint z;', 7, 3, 'float'),
+    ('', 0, 0, 'int main() { return 0; }'),
+    ('int main() { return 0; }', 0, 24, ''),
+])
+def test_retokenizar_igual_a_tokenizar(fonte, inicio, removidos, inseridos):
+    verificar_edicao(AnalisadorLexico(), fonte, inicio, removidos, inseridos)
+
+def test_retokenizar_edicoes_aleatorias():
+    pedacos = ['int', 'x', '12', '3.5', '12.', '/*a\nb*/', '// c\n', '/', '*', '\n', '  ',
+               '+', '=', '(', ')', '{', '}', ';', 'if', 'foo_1', '.', '*/', '/*', '5']
+    sorteio = random.Random(3)
+    analisador = AnalisadorLexico()
+    for _ in range(500):
+        fonte = ''.join(sorteio.choice(pedacos) + sorteio.choice(['', ' ', '\n']) for _ in range(sorteio.randint(0, 30)))
+        for _ in range(3):
+            inicio = sorteio.randint(0, len(fonte))
+            removidos = sorteio.randint(0, min(5, len(fonte) - inicio))
+            inseridos = ''.join(sorteio.choice(pedacos) for _ in range(sorteio.randint(0, 2)))
+            fonte = verificar_edicao(analisador, fonte, inicio, removidos, inseridos).fonte
+
+@pytest.mark.parametrize('fonte', ['int x = 1 / 2;', 'a / b; c /* d', 'x/*', '/ * /*', 'é /* ç'])
+def test_abertura_pendente_em_bytes(fonte):
+    # Buffers de bytes procuram pelos tokens (memoryview não tem find), com o mesmo resultado
+    analisador = AnalisadorLexico()
+    esperado = analisador.tokenizar_buffer(fonte).abertura_pendente
+    for dados in (fonte.encode(), bytearray(fonte.encode()), memoryview(fonte.encode())):
+        assert analisador.tokenizar_bytes(dados).abertura_pendente == esperado
+
+def test_paralelo_igual_ao_sequencial():
+    # Comentários de várias linhas espalhados, para que algum fique sobre um ponto de corte
+    fonte = (FONTE + "/* bloco\n\n\nlongo */ int z;\n") * 40
+    analisador = AnalisadorLexico()
+    esperado = resumo(analisador.tokenizar_buffer(fonte))
+    for processos in (2, 3):
+        assert resumo(analisador.tokenizar_paralelo(fonte, processos=processos, tamanho_minimo=0)) == esperado
+
+def test_pontos_de_corte_fora_de_comentarios():
+    fonte = ("a;\n/* x\ny\nz */\n" * 50)
+    analisador = AnalisadorLexico()
+    cortes = analisador._pontos_de_corte(fonte, 7)
+    assert cortes[0] == 0 and cortes[-1] == len(fonte)
+    for corte in cortes[1:-1]:
+        assert fonte[corte - 1] == '\n'
+        # O trecho antes do corte não termina dentro de um comentário aberto
+        assert fonte.count('/*', 0, corte) == fonte.count('*/', 0, corte)
+
+def posicao_esperada(fonte, offset):
+    return fonte.count('\n', 0, offset) + 1, offset - (fonte.rfind('\n', 0, offset) + 1)
+
+@pytest.mark.parametrize('fonte', [FONTE, 'a\n\n  b /* x\ny */ c // d\ne', 'x', '\n\n'])
+def test_linha_e_coluna(fonte):
+    analisador = AnalisadorLexico()
+    tokens = analisador.tokenizar(fonte)
+    for token in tokens[:-1]:
+        assert (token.linha, token.coluna) == posicao_esperada(fonte, token.inicio)
+    assert (tokens[-1].linha, tokens[-1].coluna) == (fonte.count('\n') + 1, 0)
+    assert resumo(analisador.tokenizar_buffer(fonte)) == resumo(tokens)
+
+def test_posicao_calculada_sob_demanda():
+    token = AnalisadorLexico().tokenizar("int\n  x;")[1]
+    assert token._linha is None
+    assert (token.linha, token.coluna) == (2, 2)
+
+def test_bytes_igual_a_str():
+    analisador = AnalisadorLexico()
+    assert resumo(analisador.tokenizar_bytes(FONTE.encode())) == resumo(analisador.tokenizar_buffer(FONTE))
+
+def test_bytes_com_utf8_em_comentarios():
+    # Offsets em bytes, mas colunas em caracteres, como no caminho de str
+    fonte = "// acentuação\nint é_x = 1; /* ç */ int y;"
+    analisador = AnalisadorLexico()
+    assert resumo(analisador.tokenizar_bytes(fonte.encode())) == resumo(analisador.tokenizar_buffer(fonte))
+
+def test_bytes_so_ascii():
+    # Limite documentado: dígitos fora do ASCII não casam \d nos padrões de bytes
+    analisador = AnalisadorLexico()
+    assert [token.valor for token in analisador.tokenizar_buffer("x = ٣4;")][2] == '٣4'
+    assert [token.valor for token in analisador.tokenizar_bytes("x = ٣4;".encode())][2] == '4'
+
+def test_retokenizar_recusa_bytes():
+    analisador = AnalisadorLexico()
+    buffer = analisador.tokenizar_bytes(b"int x = 1;")
+    with pytest.raises(ValueError):
+        analisador.retokenizar(buffer, 8, 1, '2')
+
+def test_bytes_de_mmap(tmp_path):
+    caminho = tmp_path / 'fonte.c'
+    caminho.write_bytes(FONTE.encode())
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+        tokens = AnalisadorLexico().tokenizar_bytes(dados)
+        assert resumo(tokens) == resumo(AnalisadorLexico().tokenizar_buffer(FONTE))
+        lexema = tokens.lexema(1)
+        assert isinstance(lexema, memoryview) and bytes(lexema) == b'soma'
+        lexema.release()
+
+def test_nomes_internados():
+    analisador = AnalisadorLexico()
+    tokens = analisador.tokenizar("int x = x + y; int y;")
+    ids = [token for token in tokens if token.tipo == 'ID']
+    assert [token.valor for token in ids] == ['x', 'x', 'y', 'y']
+    assert ids[0].id_nome == ids[1].id_nome != ids[2].id_nome == ids[3].id_nome
+    assert ids[0].valor is ids[1].valor
+    assert analisador.nomes.nomes == ['x', 'y']  # palavras reservadas não entram
+
+def test_nomes_compartilhados_entre_caminhos():
+    analisador = AnalisadorLexico()
+    lista = analisador.tokenizar("a b")
+    buffer = analisador.tokenizar_buffer("b c a")
+    assert [token.id_nome for token in buffer][:3] == [lista[1].id_nome, 2, lista[0].id_nome]
+    assert analisador.nomes.nome(2) == 'c' and len(analisador.nomes) == 3
+
+def test_janela_tokens():
+    tokens = AnalisadorLexico().tokenizar("a = 1;")
+    lidos = []
+    janela = JanelaTokens((lidos.append(token) or token for token in tokens), k=1)
+    assert janela.peek().valor == 'a' and janela.peek(1).tipo == 'OPERADOR_ATRIB'
+    assert len(lidos) == 2  # só o atual e o seguinte
+    with pytest.raises(IndexError):
+        janela.peek(2)
+    assert [janela.avancar().tipo for _ in range(5)] == ['OPERADOR_ATRIB', 'NUMERO', 'PONTO_VIRGULA', 'EOF', 'EOF']
+    assert JanelaTokens(iter(())).peek() is None
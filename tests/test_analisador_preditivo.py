@@ -0,0 +1,43 @@
+import pytest
+
+from analisador_lexico import CODIGOS_TIPO, T_EOF, AnalisadorLexico
+from analisador_preditivo import (AnalisadorPreditivo, conjuntos_first, conjuntos_follow, construir_tabela,
+                                  ler_gramatica)
+from analisador_sintatico import AnalisadorSintatico
+from test_analisador_sintatico import FONTE, texto
+
+def analisar(fonte, **opcoes):
+    return AnalisadorPreditivo(AnalisadorLexico().tokenizar_buffer(fonte), **opcoes).analisar()
+
+@pytest.mark.parametrize('fonte', [
+    FONTE,
+    "int main() { return a * b + c * d - e / (f - 1); }",
+    "float f(float x) { x = g(x, 2.5) + (x); g(1); (x) * 2; return x; } int main() { }",
+])
+def test_mesma_arvore_que_o_descendente_recursivo(fonte):
+    esperado = texto(AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar())
+    assert texto(analisar(fonte)) == esperado
+    assert texto(analisar(fonte, arena=True)) == esperado
+
+def test_erro_sintatico(capsys):
+    assert analisar("int main() { return 1 }") is None
+    saida = capsys.readouterr().out
+    assert "ERRO SINTÁTICO" in saida and "linha 1, coluna 22" in saida
+
+def test_first_e_follow():
+    gramatica = ler_gramatica("""
+programa -> lista
+lista -> ID resto | ε
+resto -> VIRGULA ID resto | ε
+""")
+    first = conjuntos_first(gramatica)
+    follow = conjuntos_follow(gramatica, first)
+    assert first['lista'] == {CODIGOS_TIPO['ID'], None}
+    assert first['resto'] == {CODIGOS_TIPO['VIRGULA'], None}
+    assert follow['resto'] == {T_EOF}
+
+def test_gramatica_que_nao_e_ll1():
+    gramatica = ler_gramatica("programa -> ID | ID NUMERO")
+    first = conjuntos_first(gramatica)
+    with pytest.raises(ValueError, match="não é LL\\(1\\)"):
+        construir_tabela(gramatica, first, conjuntos_follow(gramatica, first))
@@ -0,0 +1,134 @@
+import contextlib
+import io
+
+import pytest
+
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico, ErroSemantico, TabelaSimbolos
+from analisador_sintatico import AnalisadorSintatico
+
+def analisar(fonte):
+    """Retorna o AnalisadorSemantico depois de analisar o fonte (sem a saída impressa)"""
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        semantico.analisar(arvore)
+    return semantico
+
+def test_reporta_todos_os_erros_semanticos():
+    semantico = analisar("""
+int f(int a) {
+    int a = 1;
+    return b;
+}
+float g() { return 1; }
+int main() {
+    int x = f(1, 2);
+    int x = 2;
+    x = h(3);
+    float z = 1.5;
+    x = z;
+    return y;
+}
+""")
+    assert semantico.erros == [
+        "Símbolo 'a' já declarado no escopo atual",
+        "Variável 'b' não declarada",
+        "Tipo de retorno incompatível: esperado 'float', encontrado 'int'",
+        "Função 'f' espera 1 argumentos, mas 2 foram fornecidos",
+        "Símbolo 'x' já declarado no escopo atual",
+        "Função 'h' não declarada",
+        "Tipo incompatível na atribuição: esperado 'int', encontrado 'float'",
+        "Variável 'y' não declarada",
+    ]
+
+def test_sem_main():
+    assert analisar("int f() { return 0; }").erros == ["Função 'main' não encontrada"]
+
+def test_tabela_simbolos_sombreamento():
+    tabela = TabelaSimbolos()
+    externo = tabela.declarar_simbolo('x', 'int', 'variavel')
+    tabela.entrar_escopo()
+    interno = tabela.declarar_simbolo('x', 'float', 'variavel')
+    tabela.declarar_simbolo('y', 'int', 'variavel')
+    assert tabela.buscar_simbolo('x') is interno
+    assert set(tabela.obter_simbolos_escopo_atual()) == {'x', 'y'}
+    tabela.sair_escopo()
+    assert tabela.buscar_simbolo('x') is externo
+    assert tabela.buscar_simbolo('y') is None
+    assert tabela.obter_simbolos_escopo_atual() == {'x': externo}
+
+def test_tabela_simbolos_redeclaracao():
+    tabela = TabelaSimbolos()
+    tabela.entrar_escopo()
+    tabela.declarar_simbolo('x', 'int', 'variavel', chave=7)
+    with pytest.raises(ErroSemantico):
+        tabela.declarar_simbolo('x', 'float', 'variavel', chave=7)
+    tabela.entrar_escopo()
+    tabela.declarar_simbolo('x', 'float', 'variavel', chave=7)
+    assert tabela.buscar_simbolo(7).tipo == 'float'
+
+def test_tabela_simbolos_escopo_global_nao_fecha():
+    tabela = TabelaSimbolos()
+    simbolo = tabela.declarar_simbolo('main', 'int', 'funcao')
+    tabela.sair_escopo()
+    assert tabela.buscar_simbolo('main') is simbolo and tabela.escopo_atual == 0
+
+def test_sombreamento_em_blocos_aninhados():
+    semantico = analisar("""
+int main() {
+    int x = 1;
+    if (x) {
+        float x = 2.5;
+        x = x * 2.0;
+    }
+    x = x + 1;
+    return x;
+}
+""")
+    # Com o x interno ainda visível depois do bloco, o return acusaria float em função int
+    assert semantico.erros == []
+
+def test_anotacoes_de_tipos_simbolos_e_retorno():
+    fonte = """
+float metade(float v) { return v / 2; }
+int main() {
+    int n = 3;
+    float y = metade(n * 1.5) + n;
+    if (n) { return n; } else { return 0; }
+}
+"""
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert semantico.analisar(arvore)
+    anotacoes = semantico.anotacoes
+    metade, main = arvore.funcoes
+    declaracao_n, declaracao_y, se = main.corpo.comandos
+    soma = declaracao_y.valor
+    chamada, uso_n = soma.esquerda, soma.direita
+    
+    assert anotacoes.tipo(soma) == 'float'
+    assert anotacoes.tipo(chamada) == 'float'
+    assert anotacoes.tipo(chamada.argumentos[0]) == 'float'
+    assert anotacoes.tipo(uso_n) == 'int'
+    assert anotacoes.tipo(metade.corpo.comandos[0].valor) == 'float'
+    
+    # Cada uso aponta para o mesmo Simbolo criado na declaração
+    assert anotacoes.simbolos[uso_n] is anotacoes.simbolos[declaracao_n]
+    assert anotacoes.simbolos[chamada] is anotacoes.simbolos[metade]
+    assert anotacoes.simbolos[metade.parametros[0]].categoria == 'parametro'
+    
+    assert anotacoes.retorna[main.corpo] and anotacoes.retorna[se.bloco_se] and anotacoes.retorna[se.bloco_senao]
+    assert anotacoes.retorna[metade.corpo]
+
+def test_anotacoes_na_arena():
+    fonte = "int main() { float x = 1.5; int y = 2; return y; }"
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte), arena=True).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert semantico.analisar(arvore)
+    declaracao_x, declaracao_y, retorno = arvore.funcoes[0].corpo.comandos
+    assert semantico.anotacoes.tipo(retorno.valor) == 'int'
+    assert semantico.anotacoes.simbolos[retorno.valor] is semantico.anotacoes.simbolos[declaracao_y]
+    assert semantico.anotacoes.simbolos[declaracao_x].tipo == 'float'
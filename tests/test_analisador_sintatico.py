@@ -0,0 +1,198 @@
+import contextlib
+import io
+
+import pytest
+
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import (AnalisadorSintatico, ErroSintatico, NoAtribuicao, NoBloco, NoChamadaFuncao,
+                                  NoExpressao, NoFuncaoAdiada, NoIdentificador, NoRetorno, imprimir_arvore)
+from gerador_codigo import GeradorCodigo
+
+FONTE = """
+int soma(int a, int b) {
+    return a + b * 2 - (a - b) / 3;
+}
+int main() {
+    int x = 10;
+    float y = 2.5;
+    x = soma(x, 5);
+    soma(1, 2);
+    if (x) { x = x - 1; } else { while (x) { x = x - 1; } }
+    for (int i = 0; i; i - 1) { y = y * 2.0; }
+    return x;
+}
+"""
+
+def texto(arvore):
+    """Árvore impressa por imprimir_arvore, para comparar resultados de modos diferentes"""
+    saida = io.StringIO()
+    with contextlib.redirect_stdout(saida):
+        imprimir_arvore(arvore)
+    return saida.getvalue()
+
+def analisar(fonte, **opcoes):
+    return AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte), **opcoes).analisar()
+
+def test_buffer_e_lista_dao_a_mesma_arvore():
+    lexico = AnalisadorLexico()
+    esperado = texto(AnalisadorSintatico(lexico.tokenizar(FONTE)).analisar())
+    assert texto(AnalisadorSintatico(lexico.tokenizar_buffer(FONTE)).analisar()) == esperado
+    assert 'soma' in esperado and '2.5' in esperado
+
+def test_nos_recebem_nomes_internados():
+    tokens = AnalisadorLexico().tokenizar_buffer(FONTE)
+    arvore = AnalisadorSintatico(tokens).analisar()
+    assert arvore.nomes is tokens.nomes
+    soma, main = arvore.funcoes
+    assert soma.nome is arvore.nomes.nome(soma.id_nome)
+    declaracao = main.corpo.comandos[0]
+    atribuicao = main.corpo.comandos[2]
+    assert declaracao.id_nome == atribuicao.id_nome and declaracao.nome is atribuicao.nome
+    assert atribuicao.valor.id_nome == soma.id_nome
+
+def comandos(corpo):
+    arvore = analisar(f"int main() {{ {corpo} }}")
+    return arvore.funcoes[0].corpo.comandos
+
+def test_atribuicao_ou_expressao_pelo_proximo_token():
+    atribuicao, soma, chamada, nome = comandos("x = y + 1; x + 1; f(x); x;")
+    assert type(atribuicao) is NoAtribuicao and atribuicao.nome == 'x'
+    assert type(atribuicao.valor) is NoExpressao and atribuicao.valor.operador == '+'
+    assert type(soma) is NoExpressao and soma.operador == '+'
+    assert type(chamada) is NoChamadaFuncao and chamada.nome == 'f'
+    assert type(nome) is NoIdentificador
+
+def test_atribuicao_sem_valor_e_erro(capsys):
+    assert analisar("int main() { x = ; return 0; }") is None
+    assert "linha 1, coluna 17" in capsys.readouterr().out
+
+def agrupar(no):
+    """Expressão com os agrupamentos explícitos: a + b * c vira (a + (b * c))"""
+    if type(no) is NoExpressao:
+        if no.direita is None:
+            return f"({no.operador}{agrupar(no.esquerda)})"
+        return f"({agrupar(no.esquerda)} {no.operador} {agrupar(no.direita)})"
+    if type(no) is NoChamadaFuncao:
+        return f"{no.nome}({', '.join(agrupar(argumento) for argumento in no.argumentos)})"
+    return str(getattr(no, 'nome', None) or no.valor)
+
+def expressao(texto, **opcoes):
+    arvore = analisar(f"int main() {{ return {texto}; }}", **opcoes)
+    return agrupar(arvore.funcoes[0].corpo.comandos[0].valor)
+
+@pytest.mark.parametrize('texto, esperado', [
+    ('a - b - c', '((a - b) - c)'),
+    ('a / b * c', '((a / b) * c)'),
+    ('a + b * c', '(a + (b * c))'),
+    ('a * b + c * d - e', '(((a * b) + (c * d)) - e)'),
+    ('(a + b) * c', '((a + b) * c)'),
+    ('a * (b - (c + d)) / 2', '((a * (b - (c + d))) / 2)'),
+    ('f(a + 1, g(b) * 2) - 3', '(f((a + 1), (g(b) * 2)) - 3)'),
+    ('1.5 + x', '(1.5 + x)'),
+])
+def test_precedencia_e_associatividade(texto, esperado):
+    assert expressao(texto) == esperado
+
+def test_modo_iterativo_da_a_mesma_arvore():
+    assert texto(analisar(FONTE, iterativo=True)) == texto(analisar(FONTE))
+    for texto_expressao in ('a * b + c * d - e', 'f(a + 1, g(b) * 2) - 3', '(a - (b - c)) / d'):
+        assert expressao(texto_expressao, iterativo=True) == expressao(texto_expressao)
+
+def test_modo_iterativo_com_blocos_profundos():
+    profundidade = 5000
+    fonte = "int main() { int x = 1; " + "if (x) { " * profundidade + "x = 2;" + " }" * profundidade + " return x; }"
+    arvore = analisar(fonte, iterativo=True)
+    assert texto(arvore).count('SE\n') == profundidade
+
+def test_modo_iterativo_com_expressoes_profundas():
+    profundidade = 5000
+    fonte = "int main() { int x = 1; return " + "(" * profundidade + "x + 1" + ")" * profundidade + " * 2; }"
+    arvore = analisar(fonte, iterativo=True)
+    assert arvore is not None
+    # A análise semântica e a geração de código também percorrem expressões sem recursão
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert semantico.analisar(arvore)
+    codigo = GeradorCodigo().gerar(arvore, semantico.anotacoes)
+    assert 'imul' in codigo
+
+def test_nos_sem_dicionario():
+    arvore = analisar(FONTE)
+    for no in (arvore, arvore.funcoes[1], arvore.funcoes[1].corpo, arvore.funcoes[1].corpo.comandos[0]):
+        assert not hasattr(no, '__dict__')
+
+def test_modo_arena_da_a_mesma_arvore_e_o_mesmo_codigo():
+    objetos, arena = analisar(FONTE), analisar(FONTE, arena=True)
+    assert texto(arena) == texto(objetos)
+    codigos = []
+    for arvore in (objetos, arena):
+        semantico = AnalisadorSemantico()
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert semantico.analisar(arvore)
+        codigos.append(GeradorCodigo().gerar(arvore, semantico.anotacoes))
+    assert codigos[0] == codigos[1]
+
+def test_parser_sobre_iterador_de_tokens():
+    esperado = texto(analisar(FONTE))
+    lexico = AnalisadorLexico()
+    assert texto(AnalisadorSintatico(lexico.tokenizar_stream(io.StringIO(FONTE), 16)).analisar()) == esperado
+    assert texto(AnalisadorSintatico(iter(lexico.tokenizar(FONTE))).analisar()) == esperado
+    assert texto(AnalisadorSintatico(iter(lexico.tokenizar(FONTE)), iterativo=True).analisar()) == esperado
+
+def test_parser_sobre_iterador_reporta_erros(capsys):
+    tokens = AnalisadorLexico().tokenizar_stream(io.StringIO("int main() { x = ; }"))
+    assert AnalisadorSintatico(tokens).analisar() is None
+    assert "linha 1, coluna 17" in capsys.readouterr().out
+
+def test_modo_esqueleto_adia_os_corpos():
+    arvore = analisar(FONTE, esqueleto=True)
+    soma, main = arvore.funcoes
+    assert type(soma) is NoFuncaoAdiada and soma.corpo_analisado is None
+    assert [parametro.nome for parametro in soma.parametros] == ['a', 'b']
+    assert texto(arvore) == texto(analisar(FONTE))  # imprimir acessa e analisa os corpos
+    assert soma.corpo_analisado is not None
+
+def test_modo_esqueleto_erro_no_corpo_so_no_acesso():
+    arvore = analisar("int f() { return ; } int main() { return 0; }", esqueleto=True)
+    f, main = arvore.funcoes
+    assert type(main.corpo.comandos[0]) is NoRetorno
+    with pytest.raises(ErroSintatico, match="coluna 17"):
+        f.corpo
+
+def test_modo_esqueleto_chaves_desbalanceadas(capsys):
+    assert analisar("int f() { if (1) { return 1; } int main() { return 0; }", esqueleto=True) is None
+    assert "ERRO SINTÁTICO" in capsys.readouterr().out
+
+def test_modo_esqueleto_permite_trocar_o_corpo():
+    funcao = analisar(FONTE, esqueleto=True).funcoes[0]
+    corpo = NoBloco([])
+    funcao.corpo = corpo
+    assert funcao.corpo is corpo
+
+def test_modo_esqueleto_precisa_de_acesso_aleatorio():
+    lexico = AnalisadorLexico()
+    with pytest.raises(ValueError):
+        AnalisadorSintatico(iter(lexico.tokenizar(FONTE)), esqueleto=True)
+    with pytest.raises(ValueError):
+        AnalisadorSintatico(lexico.tokenizar_buffer(FONTE), esqueleto=True, arena=True)
+
+def test_reporta_todos_os_erros_sintaticos(capsys):
+    fonte = """int f(int a) {
+    int x = ;
+    a = a + ;
+    return a;
+}
+int main() {
+    int y = 1
+    y = 2;
+    if (y) { y = ; }
+    return y;
+}
+"""
+    analisador = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte))
+    assert analisador.analisar() is None
+    posicoes = [erro.split(':')[0] for erro in analisador.erros]
+    assert posicoes == ["Erro sintático na linha 2, coluna 12", "Erro sintático na linha 3, coluna 12",
+                        "Erro sintático na linha 8, coluna 4", "Erro sintático na linha 9, coluna 17"]
+    assert capsys.readouterr().out.count("ERRO SINTÁTICO") == 4
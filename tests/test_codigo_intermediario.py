@@ -0,0 +1,48 @@
+import pytest
+
+from codigo_intermediario import EmissorNASM
+from test_gerador_registradores import casos, comparar, intermediario
+
+@pytest.mark.parametrize('fonte, esperado, peephole, anotar', casos())
+def test_emissor_nasm_igual_ao_gerador_codigo(fonte, esperado, peephole, anotar, tmp_path):
+    comparar(EmissorNASM, fonte, esperado, peephole, anotar, tmp_path)
+
+def test_texto_do_codigo_intermediario():
+    assert str(intermediario("int soma(int a, int b) { return a + b * 2; }")) == """\
+funcao soma(2 parâmetros):
+entrada_1:
+    a.0 = parametro 0
+    b.1 = parametro 1
+    t2 = b.1 * 2
+    t3 = a.0 + t2
+    retorno t3
+"""
+
+def test_sombreamento_sem_anotacoes_usa_outro_temporario():
+    funcao = intermediario("int main() { int x = 1; if (x) { int x = 2; x = x + 5; } return x; }").funcoes[0]
+    entrada, then, endif = funcao.blocos
+    externo, interno = entrada.instrucoes[0].destino, then.instrucoes[0].destino
+    assert externo is not interno
+    assert then.instrucoes[-2].destino is interno
+    assert endif.terminador.argumentos == (externo,)
+
+def test_ligar_blocos_descarta_o_inalcancavel():
+    funcao = intermediario("int main() { if (0) { return 1; } while (2) { return 3; } return 4; int x = 5; return x; }").funcoes[0]
+    # Condições constantes viram saltos: o then e o que vem depois do laço infinito somem
+    assert [bloco.rotulo.rsplit('_', 1)[0] for bloco in funcao.blocos] == ['entrada', 'endif', 'while_start', 'while_body']
+    assert all(instrucao.operacao != 'desvio' for bloco in funcao.blocos for instrucao in bloco.instrucoes)
+    entrada, endif, inicio, corpo = funcao.blocos
+    assert entrada.sucessores == [endif] and endif.predecessores == [entrada]
+    assert inicio.sucessores == [corpo] and corpo.predecessores == [inicio]
+    assert corpo.terminador.operacao == 'retorno' and corpo.sucessores == []
+
+def test_vivacidade_no_laco():
+    funcao = intermediario("int main(int n) { int s = 0; while (n) { s = s + n; n = n - 1; } return s; }").funcoes[0]
+    entrada, inicio, corpo, fim = funcao.blocos
+    n, s = entrada.instrucoes[0].destino, entrada.instrucoes[1].destino
+    assert inicio.predecessores == [entrada, corpo]
+    vivos = funcao.vivos()
+    assert vivos[entrada] == (set(), {n, s})
+    assert vivos[inicio] == ({n, s}, {n, s})
+    assert vivos[corpo] == ({n, s}, {n, s})
+    assert vivos[fim] == ({s}, set())
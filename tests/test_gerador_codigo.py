@@ -0,0 +1,100 @@
+import pytest
+
+from execucao import compilar, executar
+from gerador_codigo import GeradorCodigo
+
+FLUTUANTES = """
+float metade(float v) { return v / 2.0; }
+int f(int a, int b) { int x = a * b; if (a) { int x = 100; x = x + 1; } return x - 1; }
+int main() {
+    float y = metade(9.0) + 1;
+    float z = 0.0 - y;
+    int r = f(3, 4);
+    if (z) { r = r + 10; }
+    if (0.0 * z) { r = r + 1000; }
+    while (r - 30) { r = r + 1; }
+    return r;
+}
+"""
+
+def test_anotacoes_geram_instrucoes_de_ponto_flutuante():
+    assert 'xmm0' in compilar(FLUTUANTES, GeradorCodigo())
+    assert 'xmm0' not in compilar("int main() { int x = 7 / 2; return x; }", GeradorCodigo())
+
+@pytest.mark.parametrize('fonte, esperado', [
+    (FLUTUANTES, 30),
+    ("int main() { return 7 / 2 * 3 + 1; }", 10),
+    ("int main() { float x = 7.0 / 2; int n = 7 / 2; if (x - n - 0.5) { return 1; } return 2; }", 2),
+])
+def test_execucao_com_anotacoes(fonte, esperado, tmp_path):
+    assert executar(compilar(fonte, GeradorCodigo()), tmp_path) == esperado
+
+REGISTRADORES_ARGUMENTOS = ('rdi', 'rsi', 'rdx', 'rcx', 'r8', 'r9')
+
+def salvos_nas_chamadas(codigo):
+    """Registradores de argumento empilhados (salvos em volta de uma chamada), na ordem"""
+    return [linha.split()[1] for linha in codigo.split('\n')
+            if linha.split()[:1] == ['push'] and linha.split()[1] in REGISTRADORES_ARGUMENTOS]
+
+CHAMADAS = "int g(int a, int b) { return a - b; } int f(int a, int b, int c) { return a * 100 + b * 10 + c; }"
+
+@pytest.mark.parametrize('fonte, salvos, esperado', [
+    ("int fat(int n) { if (n) { return n * fat(n - 1); } return 1; } int main() { return fat(5); }", [], 120),
+    # Só os argumentos já carregados da chamada externa estão vivos na interna
+    (CHAMADAS + " int main() { return f(1, 2, g(5, 4)); }", ['rdi', 'rsi'], 121),
+    (CHAMADAS + " int main() { return f(g(5, 4), 1, 2); }", [], 112),
+    (CHAMADAS + " int main() { return f(1, g(f(0, 0, 7), g(3, 1)), 2); }", ['rdi', 'rdi', 'rdi'], 152),
+])
+def test_salva_so_os_registradores_vivos(fonte, salvos, esperado, tmp_path):
+    for peephole in (False, True):
+        codigo = compilar(fonte, GeradorCodigo(peephole=peephole), anotar=False)
+        if not peephole:
+            assert salvos_nas_chamadas(codigo) == salvos
+        assert executar(codigo, tmp_path) == esperado
+
+def tamanho_do_quadro(codigo):
+    """Bytes reservados pelo sub rsp do prólogo de cada função"""
+    linhas = codigo.split('\n')
+    return [int(linhas[i + 1].split(',')[1]) if linhas[i + 1].startswith('    sub rsp') else 0
+            for i, linha in enumerate(linhas) if linha == '    mov rbp, rsp']
+
+@pytest.mark.parametrize('anotar', [True, False])
+def test_escopos_disjuntos_reusam_slots(anotar, tmp_path):
+    fonte = """
+int main() {
+    int a = 1;
+    if (a) { int b = 2; int c = 3; a = b + c; }
+    else { int d = 4; int e = 5; int f = 6; a = d + e + f; }
+    for (int i = 0; i; i) { int g = 1; }
+    return a;
+}
+"""
+    # a e o maior dos irmãos (d, e, f): 4 slots de 8 em vez de 8
+    codigo = compilar(fonte, GeradorCodigo(), anotar)
+    assert tamanho_do_quadro(codigo) == [32]
+    assert executar(codigo, tmp_path) == 5
+    # Quadro sempre múltiplo de 16
+    assert tamanho_do_quadro(compilar("int main() { int a = 3; return a; }", GeradorCodigo(), anotar)) == [16]
+
+def com_sonda_de_alinhamento(codigo):
+    """Depois de cada push rbp; mov rbp, rsp o rsp deve estar alinhado em 16; senão ud2 (SIGILL)"""
+    linhas = []
+    for linha in codigo.split('\n'):
+        linhas.append(linha)
+        if linha == '    mov rbp, rsp':
+            linhas += ['    test rsp, 15', f'    jz alinhado_{len(linhas)}', '    ud2', f'alinhado_{len(linhas)}:']
+    return '\n'.join(linhas)
+
+@pytest.mark.parametrize('fonte, esperado', [
+    (CHAMADAS + " int main() { int x = 1; return f(x, 2, g(5, 4)) + g(f(1, 2, 3), x); }", 243),
+    (CHAMADAS + " int main() { return 3 * (1 + f(1, 2 * g(4, 1), 1 + g(g(9, 3), f(0, 0, 1)))); }", 245),
+    ("int f(int a, int b, int c, int d, int e, int g, int h) { return a - b + c - d + e - g + h * 10; }"
+     " int main() { int x = 4; return f(1, 2, 3, 4, 5, 6, f(x, 0, 0, 0, 0, 0, 1)) + 1; }", 138),
+    ("int f(int a, int b, int c, int d, int e, int g, int h, int i) { return h - i; }"
+     " int main() { return 1 + f(1, 1, 1, 1, 1, 1, 9, f(1, 1, 1, 1, 1, 1, 7, 2)); }", 5),
+])
+def test_rsp_alinhado_nas_chamadas(fonte, esperado, tmp_path):
+    for peephole in (False, True):
+        for anotar in (True, False):
+            codigo = com_sonda_de_alinhamento(compilar(fonte, GeradorCodigo(peephole=peephole), anotar))
+            assert executar(codigo, tmp_path) == esperado
@@ -0,0 +1,119 @@
+import pytest
+
+from analisador_lexico import AnalisadorLexico
+from analisador_sintatico import AnalisadorSintatico
+from codigo_intermediario import GeradorIntermediario
+from execucao import compilar, executar
+from gerador_codigo import GeradorCodigo
+from gerador_registradores import REGISTRADORES_PRESERVADOS, REGISTRADORES_VOLATEIS, GeradorRegistradores
+
+def intermediario(fonte):
+    """ProgramaIntermediario do fonte, sem anotações"""
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    return GeradorIntermediario().gerar(arvore)
+
+def mais_vivos_que_registradores(com_chamadas):
+    """Catorze variáveis vivas ao mesmo tempo (com chamadas: todas atravessam uma)"""
+    nomes = 'abcdefghijklmn'
+    if com_chamadas:
+        declaracoes = ' '.join(f"int {nome} = z({i + 1});" for i, nome in enumerate(nomes))
+    else:
+        declaracoes = ' '.join(f"int {nome} = {i + 1} + q;" for i, nome in enumerate(nomes))
+    soma = ' + '.join(f"{nome} * {i + 1}" for i, nome in enumerate(nomes))
+    return f"int z(int q) {{ return q; }} int main() {{ int q = 1; {declaracoes} return ({soma}) / 5; }}"
+
+# (fonte, código de saída, se precisa das anotações: float só é gerado com elas)
+PROGRAMAS = [
+    ("int main() { return 7 / 2 * 3 + 1; }", 10, False),
+    ("int main() { int x = 1; if (x) { int x = 2; x = x + 5; } return x; }", 1, False),
+    ("int main() { int x = 100; if (x) { int x = 10; if (x) { int x = 5; x = x + 1; } x = x + 4; }"
+     " else { int x = 0; } return x + 15; }", 115, False),
+    ("int main() { int i = 40; int s = 0; for (int i = 0; 4 - i; i) { s = s + i; i = i + 1; } return i + s; }", 46, False),
+    ("int main() { int i = 0; int s = 0; while (10 - i) { s = s + i; i = i + 1; } return s; }", 45, False),
+    ("int fat(int n) { if (n) { return n * fat(n - 1); } return 1; } int main() { return fat(5); }", 120, False),
+    ("int f(int a, int b, int c, int d) { return a + b + c + d; } int main() { return f(1, 2, 3, 40 / 2); }", 26, False),
+    ("int f(int a, int b, int c, int d) { return a * 1000 + b * 100 + c * 10 + d; } int g(int x, int y) { return x - y; }"
+     " int main() { return f(1, g(f(1, 2, 3, 4), f(2, g(5, 1), 3, 9 / 3)), 3, 8 / 2); }", 174, False),
+    ("int g(int a, int b, int c) { return a / b + c; } int main() { return g(20, 3, 7); }", 13, False),
+    ("int f(int a, int b, int c, int d, int e, int g, int h, int i) { return a + 2 * b + 3 * c + 4 * d + 5 * e"
+     " + 6 * g + 7 * h + 8 * i; } int main() { return f(1, 1, 1, 1, 1, 1, 2, 3); }", 59, False),
+    ("int f(int a, int b, int c, int d, int e, int g, int h) { return a - b + c - d + e - g + h * 10; }"
+     " int main() { int x = 4; return f(1, 2, 3, 4, 5, 6, f(x, 0, 0, 0, 0, 0, 1)) + 1; }", 138, False),
+    ("int f(int a, int b, int c, int d, int e, int g, int h, int i, int j) { return h * 100 + i * 10 + j; }"
+     " int main() { int x = 2; return 3 + x * f(0, 0, 0, 0, 0, 0, 1, x, 9 / 3) / 11; }", 25, False),
+    ("float f(int a, int b, int c, int d, int e, int g, float h) { return h * 2.0; }"
+     " int main() { float r = f(1, 2, 3, 4, 5, 6, 2.5); if (r - 5.0) { return 1; } return 7; }", 7, True),
+    ("float metade(float v) { return v / 2.0; } int main() { float y = metade(9.0) + 1; int n = 7 / 2;"
+     " if (y - 5.5) { return 1; } return n; }", 3, True),
+    (mais_vivos_que_registradores(com_chamadas=True), 203, False),
+    (mais_vivos_que_registradores(com_chamadas=False), 224, False),
+]
+
+def casos():
+    """Cada programa com e sem peephole, e sem anotações quando não precisa delas"""
+    return [pytest.param(fonte, esperado, peephole, anotar, id=f"{esperado}-{peephole:d}{anotar:d}")
+            for fonte, esperado, so_anotado in PROGRAMAS
+            for peephole in (True, False)
+            for anotar in ((True,) if so_anotado else (True, False))]
+
+def comparar(gerador, fonte, esperado, peephole, anotar, diretorio):
+    """O backend dá o mesmo código de saída que o GeradorCodigo com as mesmas opções"""
+    referencia = executar(compilar(fonte, GeradorCodigo(peephole=peephole), anotar), diretorio)
+    resultado = executar(compilar(fonte, gerador(peephole=peephole), anotar), diretorio)
+    assert resultado == referencia == esperado
+
+@pytest.mark.parametrize('fonte, esperado, peephole, anotar', casos())
+def test_gerador_registradores_igual_ao_gerador_codigo(fonte, esperado, peephole, anotar, tmp_path):
+    comparar(GeradorRegistradores, fonte, esperado, peephole, anotar, tmp_path)
+
+def intervalos_por_nome(funcao):
+    intervalos, chamadas = GeradorRegistradores().intervalos(funcao)
+    return {str(temporario): (inicio, fim) for inicio, fim, _, temporario in intervalos}, chamadas
+
+def test_intervalos_em_linha_reta():
+    funcao = intermediario("int g(int v) { return v; } int f(int a, int b) { int c = a + b; int d = g(c); return c + d; }").funcoes[1]
+    intervalos, chamadas = intervalos_por_nome(funcao)
+    assert chamadas == [4]
+    assert intervalos == {'a.0': (0, 2), 'b.1': (1, 2), 't3': (2, 3), 'c.2': (3, 6), 't5': (4, 5), 'd.4': (5, 6), 't6': (6, 7)}
+
+def test_intervalos_estendidos_pelo_laco():
+    funcao = intermediario("int main(int n) { int s = 0; while (n) { s = s + n; n = n - 1; } return s; }").funcoes[0]
+    intervalos, chamadas = intervalos_por_nome(funcao)
+    # Vivos na saída do corpo (posição 8, o salto de volta): valem até o fim dele
+    assert chamadas == []
+    assert intervalos['n.0'] == (0, 8)
+    assert intervalos['s.1'] == (1, 9)
+
+def test_quem_atravessa_chamada_fica_em_preservado():
+    funcao = intermediario("int g(int v) { return v; } int f(int a, int b) { int c = a + b; int d = g(c); return c + d; }").funcoes[1]
+    locais, preservados, espaco = GeradorRegistradores().alocar(funcao)
+    registradores = {str(temporario): local for temporario, local in locais.items()}
+    assert registradores['c.2'] in REGISTRADORES_PRESERVADOS
+    assert registradores['a.0'] in REGISTRADORES_VOLATEIS
+    assert preservados == [r for r in REGISTRADORES_PRESERVADOS if r in registradores.values()]
+    assert espaco == 0
+
+@pytest.mark.parametrize('com_chamadas', [True, False])
+def test_derrama_so_sob_pressao(com_chamadas):
+    funcao = intermediario(mais_vivos_que_registradores(com_chamadas)).funcoes[1]
+    gerador = GeradorRegistradores()
+    locais, preservados, espaco = gerador.alocar(funcao)
+    intervalos, chamadas = gerador.intervalos(funcao)
+    derramados = [local for local in locais.values() if local.startswith('qword')]
+    assert espaco == 8 * len(derramados) > 0
+    assert preservados == list(REGISTRADORES_PRESERVADOS)
+    for inicio, fim, _, temporario in intervalos:
+        if any(inicio < chamada < fim for chamada in chamadas):
+            assert locais[temporario] not in REGISTRADORES_VOLATEIS
+    # Sem pressão, nada vai para a pilha
+    assert GeradorRegistradores().alocar(intermediario("int main() { int a = 1; int b = a + 2; return a * b; }").funcoes[0])[2] == 0
+
+def test_menos_acessos_a_memoria():
+    fonte = ("int soma(int a, int b) { int c = a + b; return c * 2 - a; }"
+             " int main() { int i = 0; int s = 0; while (10 - i) { s = s + soma(i, s); i = i + 1; } return s; }")
+    def acessos(codigo):
+        return sum('[' in linha or linha.split()[:1] in (['push'], ['pop']) for linha in codigo.split('\n'))
+    registradores = acessos(compilar(fonte, GeradorRegistradores()))
+    assert registradores < acessos(compilar(fonte, GeradorCodigo()))
+    # A máquina de pilha pura, sem o peephole, faz mais de quatro vezes mais acessos
+    assert 4 * registradores < acessos(compilar(fonte, GeradorCodigo(peephole=False)))
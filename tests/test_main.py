@@ -0,0 +1,21 @@
+import mmap
+
+import main
+
+FONTE = "int main() {\n    int x = 2;\n    return x * 3;\n}\n"
+
+def test_mmap_fecha_o_mapeamento(tmp_path, monkeypatch, capsys):
+    mapeamentos = []
+
+    class MapeamentoRegistrado(mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            mapeamentos.append(self)
+
+    caminho = tmp_path / 'fonte.c'
+    caminho.write_text(FONTE)
+    monkeypatch.setattr(main.mmap, 'mmap', MapeamentoRegistrado)
+    monkeypatch.setattr(main.sys, 'argv', ['main.py', str(caminho), '--mmap'])
+    main.main()
+
+    assert 'Análise sintática: Sucesso' in capsys.readouterr().out
+    assert len(mapeamentos) == 1 and mapeamentos[0].closed
@@ -0,0 +1,109 @@
+import contextlib
+import io
+
+import pytest
+
+from analisador_lexico import AnalisadorLexico
+from analisador_semantico import AnalisadorSemantico
+from analisador_sintatico import AnalisadorSintatico
+from execucao import compilar, executar
+from codigo_intermediario import EmissorNASM
+from gerador_codigo import GeradorCodigo
+from gerador_registradores import GeradorRegistradores
+from otimizador import OtimizadorConstantes, operar
+
+def otimizar(fonte):
+    """Retorna (árvore, constantes anotadas) depois da análise semântica e da propagação"""
+    arvore = AnalisadorSintatico(AnalisadorLexico().tokenizar_buffer(fonte)).analisar()
+    semantico = AnalisadorSemantico()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert semantico.analisar(arvore), semantico.erros
+    return arvore, OtimizadorConstantes(semantico.anotacoes).otimizar(arvore).constantes
+
+def instrucoes(codigo):
+    """Número de instruções no assembly (sem rótulos, diretivas e comentários)"""
+    total = 0
+    for linha in codigo.split('\n'):
+        linha = linha.split(';', 1)[0].strip()
+        if linha and not linha.endswith(':') and linha.split()[0] not in ('section', 'global'):
+            total += 1
+    return total
+
+def test_dobra_e_propaga_em_sequencia():
+    arvore, constantes = otimizar("""
+int soma(int a, int b) { return a + b; }
+float metade(float v) { return v / 2.0; }
+int main() {
+    int x = 5;
+    int y = 3;
+    x = x * 2 + y;
+    float z = x / 2.0;
+    float w = metade(z - 6.5);
+    return soma(x, y) + soma(2 * 3, y);
+}
+""")
+    soma, _, main = arvore.funcoes
+    _, _, atribuicao, declaracao_z, declaracao_w, retorno = main.corpo.comandos
+    assert constantes[atribuicao.valor] == 13
+    assert constantes[declaracao_z.valor] == 6.5
+    assert constantes[declaracao_w.valor.argumentos[0]] == 0.0
+    primeira, segunda = retorno.valor.esquerda, retorno.valor.direita
+    assert [constantes[argumento] for argumento in primeira.argumentos] == [13, 3]
+    assert [constantes[argumento] for argumento in segunda.argumentos] == [6, 3]
+    # O resultado de uma chamada e os parâmetros são desconhecidos
+    assert declaracao_w.valor not in constantes and retorno.valor not in constantes
+    assert soma.corpo.comandos[0].valor not in constantes
+
+def test_juncao_do_se_e_cabeca_do_laco():
+    arvore, constantes = otimizar("""
+int main(int n) {
+    int a = 1;
+    int b = 2;
+    int c = 3;
+    if (n) { a = 10; b = 20; } else { a = 10; }
+    int d = a + b + c;
+    while (n) { c = c + 1; n = n - 1; }
+    return a + c;
+}
+""")
+    comandos = arvore.funcoes[0].corpo.comandos
+    declaracao_d, retorno = comandos[4], comandos[6]
+    # a vale 10 nos dois caminhos; b depende do caminho
+    assert constantes[declaracao_d.valor.esquerda.esquerda] == 10
+    assert declaracao_d.valor.esquerda.direita not in constantes
+    assert constantes[declaracao_d.valor.direita] == 3
+    # c é atribuído no corpo do laço: desconhecido na cabeça e depois dele
+    assert constantes[retorno.valor.esquerda] == 10
+    assert retorno.valor.direita not in constantes
+
+def test_nao_dobra_o_que_falha_em_execucao():
+    assert operar('/', 1, 0) is None
+    assert operar('/', -(1 << 63), -1) is None
+    assert operar('/', 1.0, 0) is None
+    assert operar('*', 1e308, 10.0) is None
+    assert operar('/', -7, 2) == -3  # idiv trunca em direção a zero
+    assert operar('+', (1 << 63) - 1, 1) == -(1 << 63)
+    _, constantes = otimizar("int main() { int x = 0; return 1 / x; }")
+    assert 0 in constantes.values() and 1 not in constantes.values()
+
+PROGRAMAS = [
+    ("int soma(int a, int b) { return a + b; } int main() { int x = 5; int y = 3; return soma(x * 2, y + 1); }", 14),
+    ("int main() { int x = 5; int y = 3; x = x * y - 1; if (x - 14) { return 1; } return x + y; }", 17),
+    ("int main() { int i = 0; int s = 0; while (10 - i) { s = s + i * (4 - 3); i = i + 1; } return s; }", 45),
+    ("int main() { float f = 2.5 * 4; int n = 7 / 2 * 3; if (f - 10) { return 1; } return n - 0 / 2; }", 9),
+]
+
+@pytest.mark.parametrize('fonte, esperado', PROGRAMAS)
+def test_menos_instrucoes_e_mesmo_resultado(fonte, esperado, tmp_path):
+    original = compilar(fonte, GeradorCodigo())
+    otimizado = compilar(fonte, GeradorCodigo(), otimizador=OtimizadorConstantes)
+    assert instrucoes(otimizado) < instrucoes(original)
+    assert executar(original, tmp_path) == executar(otimizado, tmp_path) == esperado
+
+@pytest.mark.parametrize('gerador', [GeradorCodigo, EmissorNASM, GeradorRegistradores])
+@pytest.mark.parametrize('anotar, otimizador', [(False, None), (True, None), (True, OtimizadorConstantes)])
+def test_literal_fora_de_32_bits(gerador, anotar, otimizador, tmp_path):
+    # Com ou sem a dobra (sem anotações ela não roda), o literal grande passa por rax: push só aceita imediatos de 32 bits
+    fonte = "int main() { int a = 4000000000; return a / 1000000000 + 2147483648 / 1073741824; }"
+    for peephole in (False, True):
+        assert executar(compilar(fonte, gerador(peephole=peephole), anotar, otimizador), tmp_path) == 6
@@ -0,0 +1,60 @@
+import pytest
+
+from execucao import compilar
+from gerador_codigo import GeradorCodigo
+from otimizador_peephole import OtimizadorPeephole
+from test_gerador_registradores import PROGRAMAS
+
+def linhas(texto):
+    return [f"    {linha}" if not linha.endswith(':') else linha for linha in texto.split('; ')] if texto else []
+
+# (entrada, saída esperada, regra aplicada ou None); as linhas separadas por '; '
+REGRAS = [
+    ("push rax; pop rax", "", 'push_pop'),
+    ("push rax; pop rbx", "mov rbx, rax", 'push_pop'),
+    ("push qword [rbp-8]; pop rax", "mov rax, qword [rbp-8]", 'push_pop'),
+    ("push qword [rbp-8]; pop qword [rbp-16]", "push qword [rbp-8]; pop qword [rbp-16]", None),
+    ("push rax; mov rbx, 5; pop rcx", "mov rbx, 5; mov rcx, rax", 'push_mov_pop'),
+    ("push rax; mov rax, 5; pop rcx", "push rax; mov rax, 5; pop rcx", None),
+    ("mov rax, rax", "", 'mov_proprio'),
+    ("mov rax, rbx; mov rbx, rax", "mov rax, rbx", 'mov_inverso'),
+    ("mov rax, 1; mov rax, 2", "mov rax, 2", 'mov_sobrescrito'),
+    ("mov rax, 1; mov rax, rax", "mov rax, 1", 'mov_proprio'),
+    ("mov rax, 1; add rax, 2", "mov rax, 1; add rax, 2", None),
+    ("cmp rax, 0", "test rax, rax", 'cmp_zero'),
+    ("sub rax, rbx; test rax, rax; jz fim", "sub rax, rbx; jz fim", 'teste_redundante'),
+    ("imul rax, rbx; test rax, rax; jz fim", "imul rax, rbx; test rax, rax; jz fim", None),
+    ("jmp L; L:", "L:", 'salto_proximo'),
+    ("jz L; M:; L:", "M:; L:", 'salto_proximo'),
+    ("jz L; mov rax, 1; L:", "jz L; mov rax, 1; L:", None),
+    ("ret; mov rax, 1; L:; mov rax, 2", "ret; L:; mov rax, 2", 'codigo_morto'),
+]
+
+@pytest.mark.parametrize('entrada, esperado, regra', REGRAS)
+def test_regra(entrada, esperado, regra):
+    otimizador = OtimizadorPeephole()
+    assert otimizador.otimizar(linhas(entrada)) == linhas(esperado)
+    aplicadas = {nome: vezes for nome, vezes in otimizador.contadores.items() if vezes}
+    assert aplicadas == ({regra: 1} if regra else {})
+
+def test_ponto_fixo():
+    # Cada remoção expõe um novo par para as regras
+    otimizador = OtimizadorPeephole()
+    assert otimizador.otimizar(linhas("push rax; push rbx; mov rbx, rbx; pop rbx; pop rax")) == []
+    assert otimizador.contadores['push_pop'] == 2 and otimizador.contadores['mov_proprio'] == 1
+    assert otimizador.otimizar(linhas("sub rax, 1; cmp rax, 0; jnz L; jmp M; M:")) == linhas("sub rax, 1; jnz L; M:")
+
+def test_largura_da_janela():
+    entrada = linhas("push rax; mov rbx, 5; pop rcx")
+    assert OtimizadorPeephole(largura=2).otimizar(entrada) == entrada
+    assert OtimizadorPeephole(largura=3).otimizar(entrada) == linhas("mov rbx, 5; mov rcx, rax")
+
+def test_ligado_por_padrao_e_idempotente():
+    gerador = GeradorCodigo()
+    codigo = compilar(PROGRAMAS[5][0], gerador)
+    assert sum(gerador.peephole.contadores.values()) > 0
+    assert GeradorCodigo(peephole=False).peephole is None
+    assert '\n'.join(OtimizadorPeephole().otimizar(codigo.split('\n'))) == codigo
+    assert len(codigo.split('\n')) < len(compilar(PROGRAMAS[5][0], GeradorCodigo(peephole=False)).split('\n'))
+    # O resultado com e sem peephole é comparado em test_gerador_registradores (casos)
+
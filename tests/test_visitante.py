@@ -0,0 +1,52 @@
+import pytest
+
+from analisador_sintatico import (VISOES_ARENA, NoExpressao, NoFuncao, NoFuncaoAdiada, NoIdentificador, NoNumero,
+                                  Visitante)
+
+class Contador(Visitante):
+    DESPACHO = {
+        'expressao': {
+            NoNumero: 'visitar_numero',
+            NoExpressao: 'visitar_operacao',
+            object: 'visitar_outro',
+        },
+        'funcao': {
+            NoFuncao: 'visitar_funcao',
+        },
+    }
+
+    def visitar_numero(self, no):
+        return 'numero'
+
+    def visitar_operacao(self, no):
+        return 'operacao'
+
+    def visitar_outro(self, no):
+        return 'outro'
+
+    def visitar_funcao(self, no):
+        return 'funcao'
+
+def test_tabelas_montadas_na_subclasse():
+    assert Contador.despacho_expressao[NoNumero](Contador(), None) == 'numero'
+    assert Contador.despacho_expressao[NoExpressao](Contador(), None) == 'operacao'
+    assert not hasattr(Visitante, 'despacho_expressao')
+
+def test_classe_sem_entrada_usa_a_mais_proxima_na_mro():
+    despacho = Contador.despacho_expressao
+    assert despacho[NoIdentificador](Contador(), None) == 'outro'
+    assert Contador.despacho_funcao[NoFuncaoAdiada](Contador(), None) == 'funcao'
+    visao_numero = next(visao for visao in VISOES_ARENA if issubclass(visao, NoNumero))
+    assert visao_numero in despacho  # já resolvida na criação da subclasse
+    assert despacho[visao_numero](Contador(), None) == 'numero'
+
+def test_classe_sem_metodo():
+    with pytest.raises(TypeError, match="NoNumero"):
+        Contador.despacho_funcao[NoNumero]
+
+def test_subclasse_com_outro_despacho():
+    class SoNumeros(Contador):
+        DESPACHO = {'expressao': {NoNumero: 'visitar_outro'}}
+
+    assert SoNumeros.despacho_expressao[NoNumero](SoNumeros(), None) == 'outro'
+    assert Contador.despacho_expressao[NoNumero](Contador(), None) == 'numero'